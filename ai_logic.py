@@ -1,10 +1,21 @@
-import openai
 import json
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta, timezone
 import re
-from config import OPENAI_API_KEY, OPENAI_MODEL, TEMPERATURE, MAX_TOKENS, TOP_P, BAN_WORDS
+from config import (
+    TEMPERATURE, MAX_TOKENS, TOP_P, BAN_WORDS,
+    RAG_TOP_K_QA, RAG_TOP_K_NOTICES, RAG_MIN_SCORE, RAG_CONTEXT_TOKENS, LLM_CACHE_ENABLED
+)
 from database import DatabaseManager
+from qa_index import QAIndex, normalize_question
+from qa_artifact import load_artifact
+from prompt_context import estimate_tokens, pack_context, truncate_to_tokens
+from llm_cache import get_llm_cache
+from llm_gateway import get_llm_gateway
+from singleflight import SingleFlight
+
+# 날짜가 지나면 답이 달라지는 표현 (이런 질문의 OpenAI 답변은 캐시하지 않음)
+RELATIVE_DATE_WORDS = ("오늘", "내일", "어제", "모레", "글피", "이번 주", "이번주", "다음 주", "다음주")
 
 # 한국 시간대 설정 (UTC+9)
 KST = timezone(timedelta(hours=9))
@@ -39,34 +50,60 @@ def extract_link_from_text(text: str):
     return text, None
 
 class AILogic:
-    def __init__(self):
-        openai.api_key = OPENAI_API_KEY
-        self.db = DatabaseManager()
-        self.qa_data = None
+    def __init__(self, db_path: str = "school_data.db"):
+        self.db = DatabaseManager(db_path)
+        self.llm_cache = get_llm_cache(self.db.db_path) if LLM_CACHE_ENABLED else None
+        self.openai_flight = SingleFlight()
+        # (QA 목록, 질문 색인)을 한 번에 교체해 읽는 쪽이 서로 다른 버전을 섞어 보지 않도록 함
+        self._qa = (None, None)
         self._initialized = False
+    
+    @property
+    def qa_data(self) -> Optional[List[Dict]]:
+        return self._qa[0]
+    
+    @property
+    def qa_index(self) -> Optional[QAIndex]:
+        return self._qa[1]
         
     def _ensure_initialized(self):
         """필요할 때만 QA 데이터를 로드하는 지연 초기화"""
         if not self._initialized:
             self.load_qa_data()
             self._initialized = True
+    
+    def reload_qa_data(self):
+        """QA 데이터가 바뀌었을 때 다시 로드 (아직 로드 전이면 다음 사용 시 새 데이터를 읽음)"""
+        if self._initialized:
+            self.load_qa_data()
         
     def load_qa_data(self):
-        """QA 데이터 로드 (최적화된 버전)"""
+        """QA 데이터 로드 (컴파일된 빌드 파일 → JSON → DB 순으로 시도)"""
+        artifact = load_artifact()
+        if artifact:
+            self._qa = artifact
+            print(f"QA 빌드 파일 로드 완료: {len(artifact[0])}개 항목")
+            return
+        
         try:
             # JSON 파일에서 데이터 로드
             with open('school_dataset.json', 'r', encoding='utf-8') as f:
-                self.qa_data = json.load(f)
-                print(f"QA 데이터 로드 완료: {len(self.qa_data)}개 항목")
+                qa_data = json.load(f)
+                # JSON 항목에는 id가 없으므로 순번을 QA id로 사용 (통계 집계용)
+                for i, qa in enumerate(qa_data, 1):
+                    qa.setdefault('id', i)
+                print(f"QA 데이터 로드 완료: {len(qa_data)}개 항목")
         except Exception as e:
             print(f"JSON 파일 로드 실패: {e}")
             try:
                 # DB에서 데이터 로드 (fallback)
-                self.qa_data = self.db.get_qa_data()
-                print(f"DB에서 QA 데이터 로드 완료: {len(self.qa_data)}개 항목")
+                qa_data = self.db.get_qa_data()
+                print(f"DB에서 QA 데이터 로드 완료: {len(qa_data)}개 항목")
             except Exception as e2:
                 print(f"DB 로드도 실패: {e2}")
-                self.qa_data = []
+                qa_data = []
+        
+        self._qa = (qa_data, QAIndex.build([qa['question'] for qa in qa_data]))
     
     def is_banned_content(self, text: str) -> bool:
         """금지된 내용인지 확인 (학교 관련 문의는 예외)"""
@@ -525,6 +562,28 @@ class AILogic:
         
         return result
     
+    def search_notices_info(self, user_message: str) -> Optional[dict]:
+        """공지사항 검색 결과 응답 (관련도 순, 결과가 없으면 None)"""
+        notices = self.db.search_notices(user_message, limit=3)
+        if not notices:
+            return None
+        
+        result = "관련 공지사항입니다:\n\n"
+        for notice in notices:
+            title = notice['title'].split('\n')[0].strip()
+            result += f"📢 {title}\n"
+            if notice['content']:
+                result += f"   {notice['content'][:80].strip()}...\n"
+            date_match = re.search(r'\d{4}[.-]\d{2}[.-]\d{2}', notice['created_at'] or '')
+            if date_match:
+                result += f"   작성일: {date_match.group(0).replace('.', '-')}\n"
+            result += "\n"
+        
+        response = {"type": "text", "text": result.strip()}
+        if notices[0]['url']:
+            response["link"] = notices[0]['url']
+        return response
+    
     def get_quick_response(self, user_message: str) -> Optional[str]:
         """키워드 기반 빠른 응답 (성능 향상)"""
         user_message_lower = user_message.lower()
@@ -562,15 +621,16 @@ class AILogic:
         """메뉴 선택(1번, 2번 등)에 대한 답변을 AI 없이 엑셀에서 직접 가져오기"""
         self._ensure_initialized()
         
-        if not self.qa_data:
+        qa_data, qa_index = self._qa
+        if not qa_data:
             return None
         
-        # 정확한 질문 매칭
-        for qa_item in self.qa_data:
-            if qa_item['question'] == question:
-                answer = qa_item['answer']
-                # 일체형 답변 그대로 반환 (링크 분리하지 않음)
-                return {"type": "text", "text": answer}
+        # 정확한 질문 매칭 (정규화된 질문 색인으로 바로 조회)
+        index = qa_index.find_exact(question)
+        if index is not None:
+            answer = qa_data[index]['answer']
+            # 일체형 답변 그대로 반환 (링크 분리하지 않음)
+            return {"type": "text", "text": answer}
         
         return None
 
@@ -580,11 +640,19 @@ class AILogic:
         
         # 금지된 내용 확인
         if self.is_banned_content(user_message):
-            return False, {"type": "text", "text": "부적절한 내용이 포함되어 있습니다. 다른 질문을 해주세요."}
+            response = {"type": "text", "text": "부적절한 내용이 포함되어 있습니다. 다른 질문을 해주세요."}
+            self.db.save_conversation(user_id, user_message, response, intent="banned")
+            return False, response
         
-        # 와석초 관련 질문인지 판별
+        # 와석초 관련 질문인지 판별 (키워드가 없어도 학교 공지에 있는 내용이면 공지 검색 결과로 답변)
         if not self.is_school_related(user_message):
-            return False, {"type": "text", "text": "와석초등학교 관련 질문에만 답변할 수 있습니다."}
+            search_response = self.search_notices_info(user_message)
+            if search_response:
+                self.db.save_conversation(user_id, user_message, search_response, intent="notice_search")
+                return True, search_response
+            response = {"type": "text", "text": "와석초등학교 관련 질문에만 답변할 수 있습니다."}
+            self.db.save_conversation(user_id, user_message, response, intent="unrelated")
+            return False, response
         
         # 1. 식단 관련 질문 확인 (우선순위 높음)
         if any(keyword in user_message for keyword in ["급식", "식단", "밥", "점심", "메뉴"]):
@@ -594,16 +662,14 @@ class AILogic:
             # 날짜가 명시된 경우 (오늘, 내일, 어제, 모레, 구체적 날짜)
             if date:
                 response = self.get_meal_info(date)
-                # 급식 응답은 저장 생략 (타임아웃 방지)
-                # self.db.save_conversation(user_id, user_message, response)
+                self.db.save_conversation(user_id, user_message, response, intent="meal")
                 return True, {"type": "text", "text": response}  # 급식은 링크 없음
             
             # 날짜가 명시되지 않은 급식 관련 질문은 "오늘"로 간주하여 실시간 조회
             if any(keyword in user_message for keyword in ["오늘", "지금", "현재", "이번", "이번주"]):
                 today = get_kst_now().strftime("%Y-%m-%d")
                 response = self.get_meal_info(today)
-                # 급식 응답은 저장 생략 (타임아웃 방지)
-                # self.db.save_conversation(user_id, user_message, response)
+                self.db.save_conversation(user_id, user_message, response, intent="meal")
                 return True, {"type": "text", "text": response}  # 급식은 링크 없음
             
             # 그 외 급식 관련 질문은 QA 데이터베이스에서 답변
@@ -611,14 +677,18 @@ class AILogic:
             if qa_match:
                 answer = qa_match['answer']
                 # 급식은 링크 없음
-                # self.db.save_conversation(user_id, user_message, answer)
+                self.db.save_conversation(user_id, user_message, answer, intent="qa", qa_id=qa_match.get('id'))
                 return True, {"type": "text", "text": answer}
         
         # 2. 공지사항 관련 질문 확인
-        if any(keyword in user_message for keyword in ["공지", "알림", "소식", "뉴스"]):
+        if any(keyword in user_message for keyword in ["공지", "알림", "소식", "뉴스", "가정통신문"]):
+            # 검색어가 있으면 관련 공지 검색, 없으면 최신 공지
+            search_response = self.search_notices_info(user_message)
+            if search_response:
+                self.db.save_conversation(user_id, user_message, search_response, intent="notice_search")
+                return True, search_response
             response = self.get_notices_info()
-            # 공지사항 응답은 저장 생략 (타임아웃 방지)
-            # self.db.save_conversation(user_id, user_message, response)
+            self.db.save_conversation(user_id, user_message, response, intent="notice")
             return True, {"type": "text", "text": response}
         
         # 3. 유치원 관련 질문 특별 처리 (새로 추가)
@@ -628,7 +698,7 @@ class AILogic:
             # 유치원 운영시간 관련
             if any(keyword in user_message_lower for keyword in ["운영시간", "운영 시간", "시간", "몇시"]):
                 response = "교육과정 시간은 오전 9시~13시 30분까지\n방과후과정은 오전 8시~19시까지"
-                # self.db.save_conversation(user_id, user_message, response)
+                self.db.save_conversation(user_id, user_message, response, intent="kindergarten")
                 text, url = extract_link_from_text(response)
                 resp = {"type": "text", "text": text}
                 if url: resp["link"] = url
@@ -637,7 +707,7 @@ class AILogic:
             # 유치원 교육비 관련
             elif any(keyword in user_message_lower for keyword in ["교육비", "비용", "얼마", "돈"]):
                 response = "병설유치원은 입학비, 방과후과정비, 교육비, 현장학습비, 방과후특성화비 모두 무상으로 지원됩니다."
-                # self.db.save_conversation(user_id, user_message, response)
+                self.db.save_conversation(user_id, user_message, response, intent="kindergarten")
                 text, url = extract_link_from_text(response)
                 resp = {"type": "text", "text": text}
                 if url: resp["link"] = url
@@ -646,7 +716,7 @@ class AILogic:
             # 유치원 담임 선생님 연락처
             elif any(keyword in user_message_lower for keyword in ["담임", "연락처", "전화번호", "연락"]):
                 response = "바른반: 070-7525-7763\n슬기반 070-7525-7755\n꿈반 070-7525-7849\n자람반 070-7525-7560\n원무실 031-957-8715"
-                # self.db.save_conversation(user_id, user_message, response)
+                self.db.save_conversation(user_id, user_message, response, intent="kindergarten")
                 text, url = extract_link_from_text(response)
                 resp = {"type": "text", "text": text}
                 if url: resp["link"] = url
@@ -655,7 +725,7 @@ class AILogic:
             # 유치원 개학일
             elif "개학일" in user_message_lower:
                 response = "유치원 개학일은 학사일정에 따라 매년 조금씩 다를 수 있습니다. 보통 3월 초에 1학기 개학이, 8월 말~9월 초에 2학기 개학이 진행됩니다. 정확한 개학일은 원무실(031-957-8715)로 문의해주세요."
-                # self.db.save_conversation(user_id, user_message, response)
+                self.db.save_conversation(user_id, user_message, response, intent="kindergarten")
                 text, url = extract_link_from_text(response)
                 resp = {"type": "text", "text": text}
                 if url: resp["link"] = url
@@ -664,7 +734,7 @@ class AILogic:
             # 유치원 방학일
             elif "방학일" in user_message_lower or "방학" in user_message_lower:
                 response = "유치원 방학은 학사일정에 따라 매년 조금씩 다를 수 있습니다. 보통 7월 말~8월 초에 여름방학이, 12월 말~2월 말에 겨울방학이 진행됩니다. 정확한 방학일은 원무실(031-957-8715)로 문의해주세요."
-                # self.db.save_conversation(user_id, user_message, response)
+                self.db.save_conversation(user_id, user_message, response, intent="kindergarten")
                 text, url = extract_link_from_text(response)
                 resp = {"type": "text", "text": text}
                 if url: resp["link"] = url
@@ -673,7 +743,7 @@ class AILogic:
             # 유치원 졸업식
             elif "졸업식" in user_message_lower:
                 response = "유치원 졸업식은 보통 2월 말에 진행됩니다. 정확한 일정은 학사일정을 참고해주시거나 원무실(031-957-8715)로 문의해주세요."
-                # self.db.save_conversation(user_id, user_message, response)
+                self.db.save_conversation(user_id, user_message, response, intent="kindergarten")
                 text, url = extract_link_from_text(response)
                 resp = {"type": "text", "text": text}
                 if url: resp["link"] = url
@@ -682,7 +752,7 @@ class AILogic:
             # 유치원 행사일
             elif "행사일" in user_message_lower or "행사" in user_message_lower:
                 response = "유치원에서는 다양한 행사가 진행됩니다. 입학식, 졸업식, 현장학습, 학부모 참여수업 등이 있으며, 정확한 일정은 학사일정을 참고해주시거나 원무실(031-957-8715)로 문의해주세요."
-                # self.db.save_conversation(user_id, user_message, response)
+                self.db.save_conversation(user_id, user_message, response, intent="kindergarten")
                 text, url = extract_link_from_text(response)
                 resp = {"type": "text", "text": text}
                 if url: resp["link"] = url
@@ -695,7 +765,7 @@ class AILogic:
             # 초등학교 개학일
             if "개학일" in user_message_lower:
                 response = "개학일은 학사일정에 따라 매년 조금씩 다를 수 있습니다. 보통 3월 초에 1학기 개학이, 8월 말~9월 초에 2학기 개학이 진행됩니다. 정확한 개학일은 교무실(031-957-8715)로 문의해주세요. 개학일에는 학생들의 건강상태를 확인하고 안전한 학교생활을 위한 안내가 이루어집니다. 더 궁금하신 점이 있으시면 언제든 말씀해주세요!"
-                # self.db.save_conversation(user_id, user_message, response)
+                self.db.save_conversation(user_id, user_message, response, intent="elementary")
                 text, url = extract_link_from_text(response)
                 resp = {"type": "text", "text": text}
                 if url: resp["link"] = url
@@ -704,7 +774,7 @@ class AILogic:
             # 초등학교 방학일
             elif "방학일" in user_message_lower or "방학" in user_message_lower:
                 response = "방학은 학사일정에 따라 매년 조금씩 다를 수 있습니다. 보통 7월 말~8월 초에 여름방학이, 12월 말~2월 말에 겨울방학이 진행됩니다. 정확한 방학일은 교무실(031-957-8715)로 문의해주세요."
-                # self.db.save_conversation(user_id, user_message, response)
+                self.db.save_conversation(user_id, user_message, response, intent="elementary")
                 text, url = extract_link_from_text(response)
                 resp = {"type": "text", "text": text}
                 if url: resp["link"] = url
@@ -713,7 +783,7 @@ class AILogic:
             # 초등학교 시험일
             elif "시험일" in user_message_lower or "시험" in user_message_lower:
                 response = "시험일은 학년별로 다르며, 보통 1학기 중간고사(5월), 1학기 기말고사(7월), 2학기 중간고사(10월), 2학기 기말고사(12월)에 진행됩니다. 정확한 시험일은 담임선생님께 문의해주세요."
-                # self.db.save_conversation(user_id, user_message, response)
+                self.db.save_conversation(user_id, user_message, response, intent="elementary")
                 text, url = extract_link_from_text(response)
                 resp = {"type": "text", "text": text}
                 if url: resp["link"] = url
@@ -722,7 +792,7 @@ class AILogic:
             # 초등학교 행사일
             elif "행사일" in user_message_lower or "행사" in user_message_lower:
                 response = "초등학교에서는 다양한 행사가 진행됩니다. 입학식, 졸업식, 체육대회, 학예회, 현장학습 등이 있으며, 정확한 일정은 학사일정을 참고해주시거나 교무실(031-957-8715)로 문의해주세요."
-                # self.db.save_conversation(user_id, user_message, response)
+                self.db.save_conversation(user_id, user_message, response, intent="elementary")
                 text, url = extract_link_from_text(response)
                 resp = {"type": "text", "text": text}
                 if url: resp["link"] = url
@@ -765,8 +835,7 @@ class AILogic:
         # 부분 매칭으로 간단한 응답 찾기 (우선순위 높게 처리)
         for keyword, response in simple_responses.items():
             if keyword in user_message:
-                # 간단한 응답은 저장 생략 (타임아웃 방지)
-                # self.db.save_conversation(user_id, user_message, response)
+                self.db.save_conversation(user_id, user_message, response, intent="simple")
                 text, url = extract_link_from_text(response)
                 resp = {"type": "text", "text": text}
                 if url: resp["link"] = url
@@ -790,45 +859,100 @@ class AILogic:
             if qa_match.get('additional_answer'):
                     response["text"] += f"\n\n추가 정보:\n{qa_match['additional_answer']}"
             
-            # 중요한 QA 응답만 저장 (타임아웃 방지)
-            try:
-                self.db.save_conversation(user_id, user_message, response)
-            except:
-                pass  # 저장 실패해도 응답은 계속
+            self.db.save_conversation(user_id, user_message, response, intent="qa", qa_id=qa_match.get('id'))
             return True, response
         
-        # 7. OpenAI를 통한 응답 (마지막 수단, 타임아웃 방지를 위해 간단하게)
+        # 7. "OO 안내" 형태의 질문은 공지사항에서 검색
+        if "안내" in user_message:
+            search_response = self.search_notices_info(user_message)
+            if search_response:
+                self.db.save_conversation(user_id, user_message, search_response, intent="notice_search")
+                return True, search_response
+        
+        # 8. OpenAI를 통한 응답 (마지막 수단, 관련 학교 자료를 찾아 함께 전달)
         return self.call_openai_api(user_message, user_id)
     
+    def retrieve_context(self, user_message: str, budget: int = RAG_CONTEXT_TOKENS) -> Tuple[str, int]:
+        """질문과 관련된 QA/공지를 로컬 색인에서 찾아 토큰 예산 안에 담은 참고 자료
+
+        반환: (참고 자료 문자열, 담은 자료 수)
+        """
+        self._ensure_initialized()
+        qa_data, qa_index = self._qa
+        items = []
+        if qa_data:
+            for index, _score in qa_index.search(user_message, k=RAG_TOP_K_QA, min_score=RAG_MIN_SCORE):
+                qa = qa_data[index]
+                items.append(f"[자주 묻는 질문] {qa['question']}\n답변: {qa['answer']}")
+        
+        # 긴 공지 본문 하나가 예산을 모두 차지하지 않도록 항목별로도 제한
+        item_budget = max(budget // 2, 1)
+        for notice in self.db.search_notices(user_message, limit=RAG_TOP_K_NOTICES):
+            title = notice['title'].split('\n')[0].strip()
+            text = f"[공지사항] {title} ({notice['created_at'] or '날짜 없음'})"
+            if notice['content']:
+                text += f"\n{notice['content'].strip()}"
+            items.append(truncate_to_tokens(text, item_budget))
+        
+        return pack_context(items, budget)
+    
+    def build_rag_messages(self, user_message: str) -> Tuple[List[Dict], int]:
+        """시스템 프롬프트 + 검색한 학교 자료 + 질문으로 OpenAI 메시지 구성"""
+        context, count = self.retrieve_context(user_message)
+        system_prompt = self.get_system_prompt()
+        if context:
+            system_prompt += f"\n\n학교 데이터베이스 정보:\n{context}"
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_message[:500]}
+        ]
+        return messages, count
+    
     def call_openai_api(self, user_message: str, user_id: str) -> Tuple[bool, str]:
-        """OpenAI API 호출 (타임아웃 방지 최적화)"""
-        try:
-            # 매우 간단한 프롬프트 사용
-            simple_prompt = f"와석초등학교 관련 질문: {user_message[:50]}"
-            
-            response = openai.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=[{"role": "user", "content": simple_prompt}],
-                temperature=0.5,
-                max_tokens=50,  # 토큰 수 더 줄임
-                top_p=1.0,
-                timeout=5  # 5초 타임아웃 설정
-            )
-            
-            ai_response = response.choices[0].message.content.strip()
+        """OpenAI API 호출 (로컬 색인에서 찾은 QA/공지를 참고 자료로 함께 전달)
+        
+        같은/비슷한 질문에 대한 답변이 캐시에 있으면 API를 호출하지 않고,
+        같은 질문의 호출이 이미 진행 중이면 그 답변을 기다려 함께 쓴다.
+        """
+        use_cache = self.llm_cache is not None and not any(word in user_message for word in RELATIVE_DATE_WORDS)
+        if use_cache:
+            cached = self.llm_cache.get(user_message)
+            if cached is not None:
+                self.db.save_conversation(user_id, user_message, cached, intent="openai_cache")
+                return True, cached
+        
+        def generate() -> str:
+            messages, context_count = self.build_rag_messages(user_message)
             
-            # 응답이 너무 길면 자르기
-            if len(ai_response) > 100:
-                ai_response = ai_response[:100] + "..."
+            # 공유 게이트웨이로 스트리밍 호출 (카카오 말풍선 길이나 충분한 길이의 문장 끝에서 중단,
+            # OpenAI 장애로 차단기가 열려 있으면 기다리지 않고 바로 기본 답변)
+            ai_response, stop_reason = get_llm_gateway().complete(
+                messages,
+                temperature=TEMPERATURE,
+                max_tokens=MAX_TOKENS,
+                top_p=TOP_P
+            )
+            if not ai_response:
+                raise ValueError("빈 응답")
             
-            # 데이터베이스 저장은 비동기로 처리하거나 생략
-            # self.db.save_conversation(user_id, user_message, ai_response)
+            print(f"OpenAI 응답 (참고 자료 {context_count}개, {len(ai_response)}자, {stop_reason})")
+            if use_cache:
+                tokens = sum(estimate_tokens(message['content']) for message in messages) + estimate_tokens(ai_response)
+                self.llm_cache.put(user_message, ai_response, tokens)
+            return ai_response
+        
+        try:
+            # 같은 질문이 동시에 여러 번 들어오면 먼저 시작된 호출의 답변을 함께 사용
+            ai_response, shared = self.openai_flight.do(normalize_question(user_message) or user_message, generate)
+            self.db.save_conversation(user_id, user_message, ai_response,
+                                      intent="openai_shared" if shared else "openai")
             return True, ai_response
             
         except Exception as e:
             print(f"OpenAI 처리 중 오류: {e}")
             # 타임아웃이나 오류 시 즉시 기본 응답 반환
             fallback_response = "죄송합니다. 해당 질문에 대한 답변을 찾을 수 없습니다. 다른 질문을 해주세요."
+            self.db.save_conversation(user_id, user_message, fallback_response, intent="fallback")
             return False, fallback_response
     
     def add_image_to_response(self, response: str, qa_match: Dict) -> dict:
@@ -4,12 +4,24 @@ import traceback
 import sys
 import os
 import subprocess
+import threading
 from datetime import datetime, timezone, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
-from config import PORT, DEBUG, KAKAO_BOT_TOKEN
+from config import PORT, DEBUG, KAKAO_BOT_TOKEN, GIT_PUSH_TIMEOUT
 from ai_logic import AILogic
 from database import DatabaseManager
+from retention import run_retention
+from stats import get_stats as usage_stats
+from conversation_logger import get_conversation_logger
+from crawl_jobs import CrawlJobManager
+from incremental_notice_crawler import run_crawl
+from changelog import apply_changelogs, changelog_dir_for
+from data_version import DataVersionWatcher
+from llm_cache import get_llm_cache
+from llm_stream import KAKAO_TEXT_LIMIT
+from llm_gateway import get_llm_gateway
+from qa_artifact import ARTIFACT_PATH, DATASET_PATH
 
 # 한국 시간대 설정 (UTC+9)
 KST = timezone(timedelta(hours=9))
@@ -42,39 +54,71 @@ def get_db():
         db = DatabaseManager()
     return db
 
-def run_crawler():
-    """크롤러 실행 함수"""
-    try:
-        print("🔄 자동 크롤링 시작...")
-        result = subprocess.run(['python', 'incremental_notice_crawler.py'], 
-                              capture_output=True, text=True, timeout=300)
-        print(f"크롤링 결과: {result.stdout}")
-        if result.stderr:
-            print(f"크롤링 오류: {result.stderr}")
-        
-        # 크롤링 후 GitHub에 자동 커밋
-        commit_to_github()
-        
-    except Exception as e:
-        print(f"크롤링 실행 오류: {e}")
+# 시작 시 저장소에 쌓인 변경 기록(changelog)을 DB에 반영한 뒤 스냅샷 로드 (첫 요청 지연 방지)
+try:
+    apply_changelogs()
+except Exception as e:
+    print(f"변경 기록 반영 오류: {e}")
+get_db()
+
+def reload_ai_qa_data():
+    """QA 데이터셋 파일이 바뀌면 AI 로직의 QA 목록/색인 교체 (백그라운드, 교체 전까지 이전 QA 사용)"""
+    if ai_logic is not None:
+        threading.Thread(target=ai_logic.reload_qa_data, name="qa-reload", daemon=True).start()
+
+# 다른 워커/크롤러가 바꾼 데이터를 요청 처리 중에 주기적으로 확인 (재시작 없이 캐시 갱신)
+# 확인은 가볍게 요청 스레드에서 하고, 스냅샷 재구성은 백그라운드에서 한 뒤 교체
+data_watcher = DataVersionWatcher(get_db().db_path, files={'qa': (DATASET_PATH, ARTIFACT_PATH)})
+data_watcher.subscribe(('meals', 'notices', 'qa'), get_db().refresh_snapshot_in_background)
+data_watcher.subscribe(('qa',), reload_ai_qa_data)
+
+@app.before_request
+def check_data_version():
+    data_watcher.poll()
+
+def run_crawler(progress=None):
+    """크롤러 실행 함수 (크롤링 작업 스레드에서 실행)"""
+    progress = progress or (lambda stage, **info: None)
+    result = run_crawl(progress)
+    
+    # 새 급식/공지 데이터로 스냅샷 교체 (다른 워커는 data_version을 확인해 각자 교체)
+    progress('refresh_snapshot', **result)
+    data_watcher.poll(force=True)
+    
+    # 크롤링 후 GitHub에 자동 커밋
+    progress('commit', **result)
+    commit_to_github()
+    return result
+
+# 크롤링은 전용 스레드 하나에서만 실행 (웹 요청 스레드를 막지 않음)
+crawl_jobs = CrawlJobManager(run_crawler)
+
+def scheduled_crawl():
+    """스케줄러용 크롤링 작업 등록"""
+    job = crawl_jobs.submit('scheduled')
+    print(f"🔄 자동 크롤링 작업 등록: {job.id}")
 
 def commit_to_github():
-    """GitHub에 자동 커밋"""
+    """변경 기록(changelog) 폴더만 GitHub에 자동 커밋 (DB 파일 등 다른 파일은 올리지 않음)"""
     try:
         print("📝 GitHub 자동 커밋 시작...")
+        changelog_dir = os.path.relpath(changelog_dir_for(get_db().db_path))
+        if not os.path.isdir(changelog_dir):
+            print("📝 변경 기록이 없어 커밋을 건너뜁니다.")
+            return
         
-        # Git 상태 확인
-        subprocess.run(['git', 'add', '.'], check=True)
+        subprocess.run(['git', 'add', '--', changelog_dir], check=True, timeout=GIT_PUSH_TIMEOUT)
         
-        # 변경사항이 있는지 확인
-        result = subprocess.run(['git', 'status', '--porcelain'], 
-                              capture_output=True, text=True)
+        # 변경 기록 폴더에 커밋할 내용이 있는지 확인
+        result = subprocess.run(['git', 'diff', '--cached', '--quiet', '--', changelog_dir],
+                                timeout=GIT_PUSH_TIMEOUT)
         
-        if result.stdout.strip():
-            # 변경사항이 있으면 커밋
+        if result.returncode:
+            # 다른 곳에 스테이징된 파일이 있어도 변경 기록만 커밋
             commit_message = f"자동 크롤링 업데이트 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-            subprocess.run(['git', 'commit', '-m', commit_message], check=True)
-            subprocess.run(['git', 'push'], check=True)
+            subprocess.run(['git', 'commit', '-m', commit_message, '--', changelog_dir],
+                           check=True, timeout=GIT_PUSH_TIMEOUT)
+            subprocess.run(['git', 'push'], check=True, timeout=GIT_PUSH_TIMEOUT)
             print(f"✅ GitHub 커밋 완료: {commit_message}")
         else:
             print("📝 변경사항이 없어 커밋을 건너뜁니다.")
@@ -82,17 +126,45 @@ def commit_to_github():
     except Exception as e:
         print(f"GitHub 커밋 오류: {e}")
 
+def run_conversation_retention():
+    """대화 기록 롤업/아카이브 실행 함수"""
+    try:
+        print("🗄️ 대화 기록 정리 시작...")
+        get_db().flush_conversations()
+        run_retention(get_db().db_path)
+    except Exception as e:
+        print(f"대화 기록 정리 오류: {e}")
+
+_scheduler_configured = False
+
 def setup_scheduler():
-    """스케줄러 설정"""
+    """스케줄러 설정 (모듈 로드 시 한 번만 등록)"""
+    global _scheduler_configured
+    if _scheduler_configured:
+        return
+    _scheduler_configured = True
     # 매일 오전 6시(한국 시간)에 크롤링 실행
     scheduler.add_job(
-        func=run_crawler,
+        func=scheduled_crawl,
         trigger=CronTrigger(hour=6, minute=0, timezone=KST),
         id='daily_crawler',
         name='매일 자동 크롤링',
         replace_existing=True
     )
     print("⏰ 자동 크롤링 스케줄러 설정 완료 (매일 오전 6시 KST)")
+    
+    # 매일 오전 3시 30분(한국 시간)에 대화 기록 롤업/아카이브
+    scheduler.add_job(
+        func=run_conversation_retention,
+        trigger=CronTrigger(hour=3, minute=30, timezone=KST),
+        id='daily_retention',
+        name='매일 대화 기록 정리',
+        replace_existing=True
+    )
+    print("⏰ 대화 기록 정리 스케줄러 설정 완료 (매일 오전 3시 30분 KST)")
+
+# gunicorn(app:app)으로 실행할 때도 작업이 등록되도록 import 시점에 설정
+setup_scheduler()
 
 def exception_handler(exception):
     """예외 처리 함수"""
@@ -194,8 +266,8 @@ def create_kakao_response(message, quick_replies=None, link=None):
         message = "안녕하세요! 와석초등학교 챗봇입니다."
     
     # 메시지 길이 제한 (카카오톡 제한)
-    if len(message) > 1000:
-        message = message[:997] + "..."
+    if len(message) > KAKAO_TEXT_LIMIT:
+        message = message[:KAKAO_TEXT_LIMIT - 3] + "..."
     
     response = {
         "version": "2.0",
@@ -545,6 +617,7 @@ def webhook():
                             text = response.get("text", str(response))
                         else:
                             text = "죄송합니다. 해당 질문에 대한 답변을 찾을 수 없습니다."
+                        get_db().save_conversation(user_id, user_message, text, intent="menu")
                 else:
                     # 자유 질문인 경우 AI 사용 (급식은 실시간 크롤링 유지)
                     success, response = ai_logic.process_message(user_message, user_id)
@@ -667,40 +740,58 @@ def health_check():
 
 @app.route('/stats', methods=['GET'])
 def get_stats():
-    """통계 정보 엔드포인트"""
+    """통계 정보 엔드포인트 (?from=YYYY-MM-DD&to=YYYY-MM-DD, 기본 최근 7일)"""
     try:
-        # QA 데이터 개수
-        qa_count = len(db.get_qa_data())
-        
-        # 최근 대화 히스토리 개수 (테스트용)
-        test_history = db.get_conversation_history("test_user", limit=10)
-        
-        return jsonify({
-            "qa_data_count": qa_count,
-            "recent_conversations": len(test_history),
+        today = get_kst_now().date()
+        date_to = request.args.get('to', today.isoformat())
+        date_from = request.args.get('from', (today - timedelta(days=6)).isoformat())
+        for value in (date_from, date_to):
+            datetime.strptime(value, "%Y-%m-%d")
+        
+        database = get_db()
+        stats = usage_stats(database.db_path, date_from, date_to)
+        stats.update({
+            "qa_data_count": database.get_qa_count(),
+            "conversation_queue": get_conversation_logger(database.db_path).stats(),
+            "data_versions": data_watcher.current(),
+            "llm_cache": get_llm_cache(database.db_path).stats(),
+            "llm_gateway": get_llm_gateway().stats(),
+            "llm_coalescing": get_ai_logic().openai_flight.stats(),
             "server_status": "running",
             "timestamp": get_kst_now().isoformat()
         })
+        return jsonify(stats)
         
+    except ValueError:
+        return jsonify({"error": "날짜 형식은 YYYY-MM-DD 입니다."}), 400
     except Exception as e:
         exception_handler(e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/crawl', methods=['POST'])
 def manual_crawl():
-    """수동 크롤링 실행 엔드포인트"""
+    """수동 크롤링 작업 등록 엔드포인트 (즉시 작업 id 반환, 진행 상황은 /crawl/<id>)"""
     try:
         print("🔄 수동 크롤링 요청 받음")
-        run_crawler()
+        job = crawl_jobs.submit('manual')
         return jsonify({
-            "status": "success",
-            "message": "크롤링이 성공적으로 실행되었습니다.",
-            "timestamp": datetime.now().isoformat()
-        })
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": f"/crawl/{job.id}",
+            "timestamp": get_kst_now().isoformat()
+        }), 202
     except Exception as e:
         exception_handler(e)
         return jsonify({"error": str(e)}), 500
 
+@app.route('/crawl/<job_id>', methods=['GET'])
+def crawl_status(job_id):
+    """크롤링 작업 상태 확인 엔드포인트"""
+    job = crawl_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "작업을 찾을 수 없습니다."}), 404
+    return jsonify(job)
+
 @app.route('/scheduler/status', methods=['GET'])
 def scheduler_status():
     """스케줄러 상태 확인 엔드포인트"""
@@ -728,7 +819,4 @@ if __name__ == '__main__':
     print(f"와석초등학교 챗봇 서버 시작 - 포트: {PORT}")
     print(f"디버그 모드: {DEBUG}")
     
-    # 스케줄러 설정
-    setup_scheduler()
-    
     app.run(host='0.0.0.0', port=PORT, debug=DEBUG) 
\ No newline at end of file
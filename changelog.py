@@ -0,0 +1,182 @@
+import argparse
+import glob
+import gzip
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+from config import CHANGELOG_DIR
+from database import DatabaseManager
+
+# 파일 이름이 시각으로 시작하므로 이름순 정렬 = 생성 순서
+FILE_PATTERN = "*.jsonl.gz"
+TABLES = ("notices", "meals")
+
+
+def changelog_dir_for(db_path: str, changelog_dir: str = CHANGELOG_DIR) -> str:
+    """DB 파일 기준 변경 기록 폴더 (상대 경로면 DB 파일 옆)"""
+    if os.path.isabs(changelog_dir):
+        return changelog_dir
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), changelog_dir)
+
+
+def _timestamp(moment: Optional[datetime] = None) -> str:
+    return (moment or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _mark_applied(db_path: str, file_name: str, records: int):
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        with conn:
+            conn.execute("""
+                INSERT INTO changelog_applied (file, records, applied_at) VALUES (?, ?, ?)
+                ON CONFLICT(file) DO UPDATE SET records = excluded.records, applied_at = excluded.applied_at
+            """, (file_name, records, datetime.now(timezone.utc).isoformat()))
+    finally:
+        conn.close()
+
+
+class ChangelogWriter:
+    """크롤링 1회분의 변경 기록 파일 (추가/변경된 공지·급식만 jsonl.gz로 이어 쓰기)
+
+    저장 배치마다 gzip 멤버를 하나씩 덧붙이므로 중간에 중단되어도 이미 쓴 기록은 남는다.
+    이 DB에는 이미 반영된 내용이므로 쓰는 즉시 적용 완료로 표시한다.
+    """
+
+    def __init__(self, db_path: str, changelog_dir: Optional[str] = None, kind: str = "crawl",
+                 started: Optional[datetime] = None):
+        self.db_path = db_path
+        self.changelog_dir = changelog_dir or changelog_dir_for(db_path)
+        self.file_name = f"{_timestamp(started)}_{kind}.jsonl.gz"
+        self.path = os.path.join(self.changelog_dir, self.file_name)
+        self.records = 0
+
+    def append(self, table: str, changes: List[Dict]) -> int:
+        """ingest_*(changes=...)가 모은 변경 목록을 기록 (기록한 수 반환)"""
+        if not changes:
+            return 0
+        os.makedirs(self.changelog_dir, exist_ok=True)
+        recorded_at = datetime.now(timezone.utc).isoformat()
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            for change in changes:
+                f.write(json.dumps({
+                    "table": table, "op": change["op"], "row": change["row"], "at": recorded_at
+                }, ensure_ascii=False, sort_keys=True) + "\n")
+        self.records += len(changes)
+        _mark_applied(self.db_path, self.file_name, self.records)
+        return len(changes)
+
+
+def changelog_files(changelog_dir: str) -> List[str]:
+    """변경 기록 파일 이름 목록 (오래된 순)"""
+    return sorted(os.path.basename(path) for path in glob.glob(os.path.join(changelog_dir, FILE_PATTERN)))
+
+
+def read_changelog(path: str) -> Iterator[Dict]:
+    """변경 기록 파일의 레코드 (마지막 줄이 잘린 경우 그 줄만 건너뜀)"""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"변경 기록 줄 해석 실패: {path}")
+    except (EOFError, OSError) as e:
+        # 쓰는 도중 중단된 파일은 온전한 앞부분까지만 사용
+        print(f"변경 기록 파일 끝이 손상됨: {path} ({e})")
+
+
+def _applied_files(db_path: str) -> set:
+    conn = sqlite3.connect(db_path)
+    try:
+        return {row[0] for row in conn.execute("SELECT file FROM changelog_applied")}
+    finally:
+        conn.close()
+
+
+def apply_changelogs(db_path: str = "school_data.db", changelog_dir: Optional[str] = None,
+                     rebuild: bool = False) -> Dict[str, int]:
+    """변경 기록 파일을 순서대로 DB에 반영 (이미 반영한 파일은 건너뜀)
+
+    rebuild=True이면 공지/급식을 비우고 모든 파일을 처음부터 다시 적용한다.
+    (기준 데이터가 필요하면 먼저 write_baseline으로 전체 내용을 기록해 둔다)
+    """
+    changelog_dir = changelog_dir or changelog_dir_for(db_path)
+    db = DatabaseManager(db_path, use_snapshot=False)
+    if rebuild:
+        conn = sqlite3.connect(db_path, timeout=30)
+        try:
+            with conn:
+                conn.execute("DELETE FROM notices")
+                conn.execute("DELETE FROM meals")
+                conn.execute("DELETE FROM changelog_applied")
+        finally:
+            conn.close()
+
+    applied = _applied_files(db_path)
+    totals = {"files": 0, "notices": 0, "meals": 0}
+    for file_name in changelog_files(changelog_dir):
+        if file_name in applied:
+            continue
+        rows: Dict[str, List[Dict]] = {table: [] for table in TABLES}
+        records = 0
+        for record in read_changelog(os.path.join(changelog_dir, file_name)):
+            if record.get("table") in rows:
+                rows[record["table"]].append(record["row"])
+                records += 1
+        # 같은 키가 여러 번 나오면 뒤의 기록이 이김 (ingest가 키별로 마지막 값을 사용)
+        notices = db.ingest_notices(rows["notices"]) if rows["notices"] else {"inserted": 0, "updated": 0}
+        meals = db.ingest_meals(rows["meals"]) if rows["meals"] else {"inserted": 0, "updated": 0}
+        _mark_applied(db_path, file_name, records)
+        totals["files"] += 1
+        totals["notices"] += notices["inserted"] + notices["updated"]
+        totals["meals"] += meals["inserted"] + meals["updated"]
+
+    if totals["files"]:
+        print(f"변경 기록 반영 완료: 파일 {totals['files']}개, "
+              f"공지 {totals['notices']}개, 급식 {totals['meals']}개")
+    return totals
+
+
+def write_baseline(db_path: str = "school_data.db", changelog_dir: Optional[str] = None) -> Optional[str]:
+    """현재 DB의 공지/급식 전체를 기준 변경 기록으로 저장 (rebuild 시작점)"""
+    writer = ChangelogWriter(db_path, changelog_dir, kind="baseline")
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        notices = [dict(row) for row in conn.execute(
+            "SELECT ntt_sn, title, content, url, created_at, tags, category FROM notices "
+            "WHERE ntt_sn IS NOT NULL ORDER BY ntt_sn")]
+        meals = []
+        for row in conn.execute("SELECT date, meal_type, menu, image_url, allergens FROM meals ORDER BY date, meal_type"):
+            meal = dict(row)
+            meal["allergens"] = json.loads(meal["allergens"]) if meal["allergens"] else None
+            meals.append(meal)
+    finally:
+        conn.close()
+
+    writer.append("notices", [{"op": "insert", "row": row} for row in notices])
+    writer.append("meals", [{"op": "insert", "row": row} for row in meals])
+    if not writer.records:
+        return None
+    print(f"기준 변경 기록 저장: {writer.path} ({writer.records}개)")
+    return writer.path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="공지/급식 변경 기록(changelog) 반영 도구")
+    parser.add_argument("--db", default="school_data.db")
+    parser.add_argument("--dir", dest="changelog_dir", help="변경 기록 폴더 (기본: DB 옆 CHANGELOG_DIR)")
+    parser.add_argument("--rebuild", action="store_true", help="공지/급식을 비우고 모든 변경 기록으로 다시 만듦")
+    parser.add_argument("--baseline", action="store_true", help="현재 DB 전체를 기준 변경 기록으로 저장")
+    args = parser.parse_args()
+
+    if args.baseline:
+        write_baseline(args.db, args.changelog_dir)
+    else:
+        print(apply_changelogs(args.db, args.changelog_dir, rebuild=args.rebuild))
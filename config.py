@@ -6,6 +6,8 @@ load_dotenv()
 # OpenAI 설정
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-3.5-turbo")
+# OpenAI 호환 서버 주소 (비우면 OpenAI 기본값, 테스트/벤치마크에서는 openai_stub_server.py 주소)
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL") or None
 
 # 카카오톡 설정
 KAKAO_API_KEY = os.environ.get("KAKAO_API_KEY")
@@ -17,8 +19,69 @@ DEBUG = os.environ.get("DEBUG", "True").lower() == "true"
 
 # AI 설정
 TEMPERATURE = float(os.environ.get("TEMPERATURE", 0.7))
-MAX_TOKENS = int(os.environ.get("MAX_TOKENS", 150))
+# 상한만 정하고 실제 길이는 스트리밍 조기 중단(LLM_STREAM_MIN_CHARS, 카카오 1000자)으로 조절
+MAX_TOKENS = int(os.environ.get("MAX_TOKENS", 600))
 TOP_P = float(os.environ.get("TOP_P", 1.0))
 
+# OpenAI 답변에 넣을 학교 자료 (QA/공지 검색 상위 k개, 추정 토큰 예산)
+RAG_TOP_K_QA = int(os.environ.get("RAG_TOP_K_QA", 4))
+RAG_TOP_K_NOTICES = int(os.environ.get("RAG_TOP_K_NOTICES", 3))
+RAG_MIN_SCORE = float(os.environ.get("RAG_MIN_SCORE", 0.2))
+RAG_CONTEXT_TOKENS = int(os.environ.get("RAG_CONTEXT_TOKENS", 700))
+
+# OpenAI 게이트웨이 (동시 호출 수, 전체 제한 시간(지나면 받은 데까지 답변), 대기열 대기 시간, 연속 실패 시 차단 설정)
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", 4))
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", 5))
+LLM_QUEUE_TIMEOUT = float(os.environ.get("LLM_QUEUE_TIMEOUT", 0.5))
+LLM_BREAKER_FAILURES = int(os.environ.get("LLM_BREAKER_FAILURES", 3))
+LLM_BREAKER_RESET_SECONDS = float(os.environ.get("LLM_BREAKER_RESET_SECONDS", 30))
+
+# OpenAI 스트리밍 답변을 이 글자 수 이후 첫 문장 끝에서 멈춤 (카카오 1000자 제한 안에서)
+LLM_STREAM_MIN_CHARS = int(os.environ.get("LLM_STREAM_MIN_CHARS", 300))
+
+# OpenAI 답변 캐시 (보관 기간, 최대 항목 수, 비슷한 질문으로 볼 n-gram 유사도)
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "True").lower() == "true"
+LLM_CACHE_TTL_SECONDS = float(os.environ.get("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", 2000))
+LLM_CACHE_SIMILARITY = float(os.environ.get("LLM_CACHE_SIMILARITY", 0.85))
+
+# 같은 질문이 동시에 들어오면 OpenAI 호출 하나를 함께 기다림 (질문별 최대 대기 수, 대기 시간)
+LLM_COALESCE_MAX_WAITERS = int(os.environ.get("LLM_COALESCE_MAX_WAITERS", 50))
+LLM_COALESCE_TIMEOUT = float(os.environ.get("LLM_COALESCE_TIMEOUT", LLM_TIMEOUT + LLM_QUEUE_TIMEOUT + 1))
+
+# 참조 데이터(QA/급식/공지) 인메모리 스냅샷 사용 여부
+USE_SNAPSHOT = os.environ.get("USE_SNAPSHOT", "True").lower() == "true"
+
+# 크롤러가 바꾼 데이터(급식/공지/QA)를 웹 프로세스가 확인하는 주기 (초)
+DATA_VERSION_POLL_SECONDS = float(os.environ.get("DATA_VERSION_POLL_SECONDS", 5))
+
+# 대화 기록 저장 설정 (write-behind)
+CONVERSATION_FLUSH_SIZE = int(os.environ.get("CONVERSATION_FLUSH_SIZE", 50))
+CONVERSATION_FLUSH_INTERVAL_MS = int(os.environ.get("CONVERSATION_FLUSH_INTERVAL_MS", 2000))
+CONVERSATION_QUEUE_MAX = int(os.environ.get("CONVERSATION_QUEUE_MAX", 10000))
+
+# 대화 기록 보관 설정 (롤업/아카이브)
+CONVERSATION_RETENTION_DAYS = int(os.environ.get("CONVERSATION_RETENTION_DAYS", 90))
+# 아카이브 폴더 (상대 경로면 DB 파일 옆, 사용자 원문이 담기므로 .gitignore에 포함)
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR", "archive")
+VACUUM_PAGES = int(os.environ.get("VACUUM_PAGES", 500))
+
+# 학교 홈페이지 크롤링 설정
+SCHOOL_BASE_URL = os.environ.get("SCHOOL_BASE_URL", "https://pajuwaseok-e.goepj.kr/pajuwaseok-e")
+CRAWL_TIMEOUT = float(os.environ.get("CRAWL_TIMEOUT", 10))
+CRAWL_CONCURRENCY = int(os.environ.get("CRAWL_CONCURRENCY", 8))
+CRAWL_RATE_PER_HOST = float(os.environ.get("CRAWL_RATE_PER_HOST", 10))
+CRAWL_BATCH_SIZE = int(os.environ.get("CRAWL_BATCH_SIZE", 50))
+# 응답 속도에 따라 호스트별 초당 요청 수를 MIN~MAX 사이에서 조절
+CRAWL_MIN_RATE_PER_HOST = float(os.environ.get("CRAWL_MIN_RATE_PER_HOST", 0.5))
+CRAWL_MAX_RATE_PER_HOST = float(os.environ.get("CRAWL_MAX_RATE_PER_HOST", 20))
+CRAWL_TARGET_LATENCY = float(os.environ.get("CRAWL_TARGET_LATENCY", 1.0))
+CRAWL_MAX_RETRIES = int(os.environ.get("CRAWL_MAX_RETRIES", 3))
+CRAWL_BACKOFF_BASE = float(os.environ.get("CRAWL_BACKOFF_BASE", 0.5))
+CRAWL_DEADLINE_SECONDS = float(os.environ.get("CRAWL_DEADLINE_SECONDS", 240))
+# 크롤링마다 추가/변경된 공지·급식만 기록하는 폴더 (상대 경로면 DB 파일 옆, 이 폴더만 GitHub에 커밋)
+CHANGELOG_DIR = os.environ.get("CHANGELOG_DIR", "changelog")
+GIT_PUSH_TIMEOUT = float(os.environ.get("GIT_PUSH_TIMEOUT", 60))
+
 # 금지 단어 목록
 BAN_WORDS = ["욕설", "비속어", "폭력", "자살", "살인", "테러"] 
\ No newline at end of file
@@ -0,0 +1,153 @@
+import atexit
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from stats import rollup_pending
+from config import CONVERSATION_FLUSH_SIZE, CONVERSATION_FLUSH_INTERVAL_MS, CONVERSATION_QUEUE_MAX
+
+# (user_id, message, response, intent, qa_id, timestamp)
+ConversationRecord = Tuple[str, str, str, Optional[str], Optional[int], str]
+
+
+class ConversationLogger:
+    """대화 기록 write-behind 큐
+
+    요청 스레드는 메모리 큐에 기록만 추가하고, 백그라운드 스레드가
+    N건 또는 M밀리초마다 executemany 한 번(단일 트랜잭션)으로 저장한다.
+    """
+
+    def __init__(self, db_path: str = "school_data.db",
+                 flush_size: int = CONVERSATION_FLUSH_SIZE,
+                 flush_interval_ms: int = CONVERSATION_FLUSH_INTERVAL_MS,
+                 max_pending: int = CONVERSATION_QUEUE_MAX):
+        self.db_path = db_path
+        self.flush_size = max(1, flush_size)
+        self.flush_interval = max(0, flush_interval_ms) / 1000.0
+        self.max_pending = max_pending
+        self._pending: List[ConversationRecord] = []
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.written = 0
+        self.dropped = 0
+
+    def log(self, user_id: str, message: str, response_text: str,
+            intent: Optional[str] = None, qa_id: Optional[int] = None):
+        """대화 기록을 큐에 추가 (DB 접근 없음)"""
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        record = (user_id, message, response_text, intent, qa_id, timestamp)
+
+        with self._cond:
+            if self._closed:
+                # 종료 이후에 들어온 기록은 즉시 동기 저장
+                self._write([record])
+                return
+            if len(self._pending) >= self.max_pending:
+                # 큐가 가득 차면 가장 오래된 기록을 버려 메모리 사용량을 제한
+                self._pending.pop(0)
+                self.dropped += 1
+            self._pending.append(record)
+            self._ensure_thread()
+            if len(self._pending) >= self.flush_size:
+                self._cond.notify()
+
+    def _ensure_thread(self):
+        """백그라운드 저장 스레드 시작 (fork 이후 첫 기록 시점에 시작)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="conversation-logger", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """N건이 모이거나 M밀리초가 지나면 모아서 저장"""
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._pending) < self.flush_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch, self._pending = self._pending, []
+                closed = self._closed
+
+            if batch:
+                self._write(batch)
+            if closed:
+                return
+
+    def _write(self, batch: List[ConversationRecord]):
+        """배치를 한 트랜잭션으로 저장 (통계 집계도 같은 트랜잭션에서 갱신)"""
+        with self._write_lock:
+            try:
+                conn = sqlite3.connect(self.db_path, timeout=10)
+                try:
+                    with conn:
+                        cursor = conn.cursor()
+                        cursor.execute('BEGIN IMMEDIATE')
+                        cursor.executemany(
+                            'INSERT INTO conversation_history (user_id, message, response, intent, qa_id, timestamp) '
+                            'VALUES (?, ?, ?, ?, ?, ?)',
+                            batch
+                        )
+                        rollup_pending(cursor)
+                    self.written += len(batch)
+                finally:
+                    conn.close()
+            except Exception as e:
+                self.dropped += len(batch)
+                print(f"대화 기록 일괄 저장 오류 ({len(batch)}건): {e}")
+
+    def flush(self):
+        """대기 중인 기록을 즉시 저장"""
+        with self._cond:
+            batch, self._pending = self._pending, []
+        if batch:
+            self._write(batch)
+
+    def close(self, timeout: float = 5.0):
+        """남은 기록을 모두 저장하고 스레드 종료"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> Dict:
+        """큐 상태"""
+        with self._cond:
+            pending = len(self._pending)
+        return {"pending": pending, "written": self.written, "dropped": self.dropped}
+
+
+_loggers: Dict[str, ConversationLogger] = {}
+_loggers_lock = threading.Lock()
+
+
+def get_conversation_logger(db_path: str = "school_data.db") -> ConversationLogger:
+    """DB 파일별 공유 로거 반환"""
+    with _loggers_lock:
+        logger = _loggers.get(db_path)
+        if logger is None:
+            logger = ConversationLogger(db_path)
+            _loggers[db_path] = logger
+        return logger
+
+
+def shutdown_loggers():
+    """프로세스 종료 시 모든 로거의 남은 기록 저장"""
+    with _loggers_lock:
+        loggers = list(_loggers.values())
+    for logger in loggers:
+        logger.close()
+
+
+atexit.register(shutdown_loggers)
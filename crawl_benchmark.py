@@ -0,0 +1,127 @@
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Callable, Dict, Optional
+
+import incremental_notice_crawler
+from config import CRAWL_CONCURRENCY, CRAWL_RATE_PER_HOST
+from crawl_replay_server import start_replay_server
+from crawl_scheduler import CrawlScheduler
+from school_crawler import CrawlState, SchoolCrawler
+
+
+def _row_counts(db_path: str) -> Dict[str, int]:
+    conn = sqlite3.connect(db_path)
+    try:
+        return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in ("notices", "meals")}
+    finally:
+        conn.close()
+
+
+def _measure(name: str, server, db_path: str, crawler: SchoolCrawler, func: Callable[[], object]) -> Dict:
+    """한 단계를 실행하고 시간/요청 수/저장 행 수 측정"""
+    before_rows = _row_counts(db_path)
+    before_requests = server.counts["requests"]
+    before_crawler = crawler.request_count
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    after_rows = _row_counts(db_path)
+    requests_served = server.counts["requests"] - before_requests
+    return {
+        "phase": name,
+        "seconds": round(elapsed, 3),
+        "requests": requests_served,
+        "pages_per_second": round(requests_served / elapsed, 1) if elapsed else 0.0,
+        "crawler_requests": crawler.request_count - before_crawler,
+        "rows_ingested": {table: after_rows[table] - before_rows[table] for table in after_rows},
+    }
+
+
+def run_benchmark(synthetic: int = 200, latency_ms: float = 20, jitter_ms: float = 10, error_rate: float = 0.0,
+                  concurrency: int = CRAWL_CONCURRENCY, rate: float = CRAWL_RATE_PER_HOST,
+                  meal_from: str = "2025-06-29", meal_to: str = "2025-07-26",
+                  db_path: Optional[str] = None) -> Dict:
+    """재현 서버에 대해 백필 → 증분(변경 없음) → 급식 기간 수집 순서로 크롤링하고 결과 반환"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = db_path or os.path.join(tmp_dir, "benchmark.db")
+        server = start_replay_server(synthetic=synthetic, latency_ms=latency_ms, jitter_ms=jitter_ms,
+                                     error_rate=error_rate, seed=0)
+
+        def new_crawler():
+            return SchoolCrawler(base_url=server.base_url, concurrency=concurrency, state=CrawlState(db_path),
+                                 scheduler=CrawlScheduler(rate=rate, backoff_base=0.05))
+
+        phases = []
+        # 크롤러 모듈의 DB/변경 기록 대상은 끝난 뒤 원래대로 되돌림 (임시 폴더는 곧 삭제됨)
+        previous = (incremental_notice_crawler._db, incremental_notice_crawler._changelog)
+        try:
+            incremental_notice_crawler.use_database(db_path)
+            crawler = new_crawler()
+            phases.append(_measure("notices_backfill", server, db_path, crawler, lambda: (
+                incremental_notice_crawler.crawl_incremental_notices(
+                    max_new_notices=100000, max_pages=1000, crawler=crawler, backfill=True)
+            )))
+
+            crawler = new_crawler()
+            phases.append(_measure("incremental_noop", server, db_path, crawler, lambda: (
+                incremental_notice_crawler.run_crawl(crawler=crawler)
+            )))
+
+            crawler = new_crawler()
+            phases.append(_measure("meals_range", server, db_path, crawler, lambda: (
+                incremental_notice_crawler.crawl_meals_range(meal_from, meal_to, crawler=crawler)
+            )))
+            retries = crawler.scheduler.retries
+        finally:
+            incremental_notice_crawler._db, incremental_notice_crawler._changelog = previous
+            server.shutdown()
+            server.server_close()
+
+        return {
+            "settings": {
+                "synthetic_notices": synthetic, "latency_ms": latency_ms, "jitter_ms": jitter_ms,
+                "error_rate": error_rate, "concurrency": concurrency, "rate_per_host": rate,
+            },
+            "phases": phases,
+            "server": dict(server.counts),
+            "final_rows": _row_counts(db_path),
+            "retries_last_phase": retries,
+        }
+
+
+def print_report(result: Dict):
+    settings = result["settings"]
+    print("\n📊 크롤링 벤치마크 결과")
+    print(f"설정: 가상 공지 {settings['synthetic_notices']}개, 지연 {settings['latency_ms']}ms"
+          f"(+{settings['jitter_ms']}ms), 오류율 {settings['error_rate']:.0%}, "
+          f"동시 요청 {settings['concurrency']}, 호스트 초당 {settings['rate_per_host']}회")
+    print(f"{'단계':<18}{'시간(s)':>9}{'요청':>7}{'페이지/s':>10}{'공지':>7}{'급식':>7}")
+    for phase in result["phases"]:
+        rows = phase["rows_ingested"]
+        print(f"{phase['phase']:<18}{phase['seconds']:>9.2f}{phase['requests']:>7}"
+              f"{phase['pages_per_second']:>10.1f}{rows['notices']:>7}{rows['meals']:>7}")
+    print(f"서버: {result['server']}")
+    print(f"최종 행 수: {result['final_rows']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="재현 서버를 이용한 크롤러 벤치마크")
+    parser.add_argument("--synthetic", type=int, default=200, help="가상 공지 수")
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=CRAWL_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=CRAWL_RATE_PER_HOST, help="호스트별 시작 초당 요청 수 (0: 제한 없음)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    result = run_benchmark(synthetic=args.synthetic, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                           error_rate=args.error_rate, concurrency=args.concurrency, rate=args.rate)
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print_report(result)
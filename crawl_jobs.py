@@ -0,0 +1,125 @@
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+from typing import Callable, Dict, List, Optional
+
+KST = timezone(timedelta(hours=9))
+
+# 완료된 작업은 최근 것만 보관
+MAX_JOB_HISTORY = 20
+
+
+class CrawlJob:
+    """크롤링 작업 하나의 상태 (queued → running → succeeded/failed)"""
+
+    def __init__(self, trigger: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.trigger = trigger
+        self.status = "queued"
+        self.created_at = datetime.now(KST).isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.progress: Dict = {}
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.future = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "trigger": self.trigger,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": dict(self.progress),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class CrawlJobManager:
+    """크롤링을 전용 스레드에서 실행하고 진행 상황/결과를 보관
+
+    target(progress)는 progress(stage, **info)로 진행 상황을 알리고 결과 dict를 반환한다.
+    작업은 한 번에 하나만 실행되며, 실행 중에 다시 요청하면 기존 작업을 돌려준다.
+    """
+
+    def __init__(self, target: Callable[[Callable], Dict], max_history: int = MAX_JOB_HISTORY):
+        self.target = target
+        self.max_history = max_history
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="crawl-job")
+        self._jobs: "OrderedDict[str, CrawlJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, trigger: str = "manual") -> CrawlJob:
+        """작업 등록 (이미 대기/실행 중인 작업이 있으면 그 작업 반환)"""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.active:
+                    return job
+            job = CrawlJob(trigger)
+            self._jobs[job.id] = job
+            self._trim()
+            job.future = self._executor.submit(self._run, job)
+            return job
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_history)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: CrawlJob):
+        def progress(stage: str, **info):
+            with self._lock:
+                job.progress.update(info, stage=stage)
+
+        with self._lock:
+            job.status = "running"
+            job.started_at = datetime.now(KST).isoformat()
+        print(f"🔄 크롤링 작업 시작: {job.id} ({job.trigger})")
+        try:
+            result = self.target(progress)
+            with self._lock:
+                job.result = result
+                job.status = "succeeded"
+            print(f"✅ 크롤링 작업 완료: {job.id} {result}")
+        except Exception as e:
+            traceback.print_exc()
+            with self._lock:
+                job.error = str(e)
+                job.status = "failed"
+            print(f"크롤링 작업 실패: {job.id} {e}")
+        finally:
+            with self._lock:
+                job.finished_at = datetime.now(KST).isoformat()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """작업 상태 (없으면 None)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def list(self) -> List[Dict]:
+        """최근 작업 목록 (최신순)"""
+        with self._lock:
+            return [job.to_dict() for job in reversed(self._jobs.values())]
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict]:
+        """작업이 끝날 때까지 대기 후 상태 반환"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        job.future.result(timeout)
+        return self.get(job_id)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
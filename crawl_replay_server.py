@@ -0,0 +1,231 @@
+import argparse
+import glob
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from incremental_notice_crawler import week_start
+from school_crawler import parse_date, parse_meal_week
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "crawler")
+SITE_PREFIX = "/pajuwaseok-e"
+NOTICES_PER_PAGE = 10
+
+LIST_PAGE = """<!DOCTYPE html>
+<html lang="ko">
+<head><meta charset="UTF-8"><title>공지사항 | 와석초등학교</title></head>
+<body>
+<div class="bbs_ListA">
+<table>
+<thead><tr><th scope="col">번호</th><th scope="col">제목</th><th scope="col">작성자</th><th scope="col">등록일</th><th scope="col">조회수</th></tr></thead>
+<tbody>
+{rows}
+</tbody>
+</table>
+</div>
+</body>
+</html>
+"""
+LIST_ROW = """<tr>
+<td>{number}</td>
+<td class="ta_l"><a href="#" class="nttInfoBtn" data-id="{ntt_sn}" onclick="return false;">{title}</a></td>
+<td>교무실</td>
+<td>{date}</td>
+<td>{views}</td>
+</tr>"""
+EMPTY_ROW = '<tr><td colspan="5" class="nodata">등록된 게시물이 없습니다.</td></tr>'
+DETAIL_PAGE = """<!DOCTYPE html>
+<html lang="ko">
+<head><meta charset="UTF-8"><title>공지사항 | 와석초등학교</title></head>
+<body>
+<div class="bbs_ViewA">
+<h3 class="bbsV_tit">{title}</h3>
+<ul class="bbsV_data"><li><span>등록일</span>{date}</li></ul>
+<div class="bbsV_cont">
+<p>{title} 관련 안내입니다.</p>
+<p>자세한 내용은 붙임 파일을 확인해 주시기 바랍니다.</p>
+</div>
+</div>
+</body>
+</html>
+"""
+
+
+class ReplayData:
+    """저장된 학교 홈페이지 페이지 (fixtures/crawler)를 요청 파라미터로 찾아 줌
+
+    synthetic > 0이면 저장된 공지 뒤에 같은 형식의 가상 공지를 이어 붙여
+    수백 건 규모의 백필도 재현할 수 있다.
+    """
+
+    def __init__(self, fixture_dir: str = FIXTURE_DIR, synthetic: int = 0):
+        self.fixture_dir = fixture_dir
+        self.list_pages: Dict[int, bytes] = {}
+        self.details: Dict[int, bytes] = {}
+        self.meal_weeks: Dict[str, bytes] = {}
+        self.empty_list = LIST_PAGE.format(rows=EMPTY_ROW).encode("utf-8")
+
+        for path in glob.glob(os.path.join(fixture_dir, "notice_list_page*.html")):
+            page = int(re.search(r"page(\d+)", path).group(1))
+            self.list_pages[page] = self._read(path)
+        for path in glob.glob(os.path.join(fixture_dir, "notice_detail_*.html")):
+            ntt_sn = int(re.search(r"detail_(\d+)", path).group(1))
+            self.details[ntt_sn] = self._read(path)
+        for path in glob.glob(os.path.join(fixture_dir, "meal_week_*.html")):
+            content = self._read(path)
+            meals, _ = parse_meal_week(content)
+            # 식단표에 나온 날짜가 속한 주(일요일)로 찾음
+            for week in {week_start(meal["date"]) for meal in meals}:
+                self.meal_weeks[week] = content
+
+        if synthetic:
+            self._add_synthetic_notices(synthetic)
+
+    @staticmethod
+    def _read(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _add_synthetic_notices(self, count: int):
+        """저장된 목록 마지막 페이지 뒤에 가상 공지 페이지 추가 (번호/날짜는 과거 방향)"""
+        first_page = max(self.list_pages, default=0) + 1
+        ntt_sn = min(self.details, default=1300000) - 1000
+        day = datetime(2025, 6, 1)
+        rows: List[str] = []
+        page = first_page
+        for i in range(count):
+            title = f"가상 공지사항 {i + 1}호 안내"
+            date = day.strftime("%Y.%m.%d")
+            rows.append(LIST_ROW.format(number=count - i, ntt_sn=ntt_sn, title=title, date=date, views=i % 97))
+            self.details[ntt_sn] = DETAIL_PAGE.format(title=title, date=date.replace(".", "-")).encode("utf-8")
+            ntt_sn -= 1
+            if i % 3 == 2:
+                day -= timedelta(days=1)
+            if len(rows) == NOTICES_PER_PAGE:
+                self.list_pages[page] = LIST_PAGE.format(rows="\n".join(rows)).encode("utf-8")
+                rows, page = [], page + 1
+        if rows:
+            self.list_pages[page] = LIST_PAGE.format(rows="\n".join(rows)).encode("utf-8")
+
+    def find(self, path: str, query: Dict[str, str]) -> Optional[bytes]:
+        """요청 경로/파라미터에 해당하는 페이지 (없으면 None → 404)"""
+        if path.endswith("/na/ntt/selectNttList.do"):
+            page = int(query.get("currPage") or 1)
+            return self.list_pages.get(page, self.empty_list)
+        if path.endswith("/na/ntt/selectNttInfo.do"):
+            ntt_sn = query.get("nttSn") or ""
+            return self.details.get(int(ntt_sn)) if ntt_sn.isdigit() else None
+        if path.endswith("/ad/fm/foodmenu/selectFoodMenuView.do"):
+            date = parse_date(query.get("schDt")) or max(self.meal_weeks, default="")
+            return self.meal_weeks.get(week_start(date), self.empty_list) if date else self.empty_list
+        return None
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """지연/오류를 주입할 수 있는 재현용 HTTP 서버"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], data: ReplayData, latency_ms: float = 0,
+                 jitter_ms: float = 0, error_rate: float = 0.0, seed: Optional[int] = None):
+        super().__init__(address, ReplayHandler)
+        self.data = data
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "errors_injected": 0, "not_modified": 0}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{SITE_PREFIX}"
+
+    def count(self, key: str):
+        with self.lock:
+            self.counts[key] += 1
+
+    def start(self) -> threading.Thread:
+        """백그라운드 스레드에서 실행"""
+        thread = threading.Thread(target=self.serve_forever, name="crawl-replay", daemon=True)
+        thread.start()
+        return thread
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    server: ReplayServer
+
+    def do_GET(self):
+        server = self.server
+        server.count("requests")
+        with server.lock:
+            delay = server.latency_ms + server.random.uniform(0, server.jitter_ms)
+            inject_error = server.random.random() < server.error_rate
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        if inject_error:
+            server.count("errors_injected")
+            self._send(503, b"Service Unavailable")
+            return
+
+        parsed = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        content = server.data.find(parsed.path, query)
+        if content is None:
+            self._send(404, b"Not Found")
+            return
+
+        etag = '"' + hashlib.sha1(content).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            server.count("not_modified")
+            self._send(304, b"", etag)
+            return
+        self._send(200, content, etag)
+
+    def _send(self, status: int, body: bytes, etag: Optional[str] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 벤치마크 출력이 묻히지 않도록 요청 로그는 생략
+        pass
+
+
+def start_replay_server(host: str = "127.0.0.1", port: int = 0, synthetic: int = 0, **options) -> ReplayServer:
+    """재현 서버를 백그라운드로 시작 (port=0이면 빈 포트 자동 선택)"""
+    server = ReplayServer((host, port), ReplayData(synthetic=synthetic), **options)
+    server.start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="학교 홈페이지 재현 서버 (크롤러 테스트/벤치마크용)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0, help="응답마다 추가할 지연 (ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="지연에 더할 무작위 범위 (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503으로 응답할 비율 (0~1)")
+    parser.add_argument("--synthetic", type=int, default=0, help="추가로 만들 가상 공지 수")
+    args = parser.parse_args()
+
+    server = ReplayServer((args.host, args.port), ReplayData(synthetic=args.synthetic),
+                          latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+    print(f"재현 서버 시작: {server.base_url} (SCHOOL_BASE_URL로 지정해 크롤러 실행)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
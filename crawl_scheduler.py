@@ -0,0 +1,143 @@
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import requests
+
+from config import (
+    CRAWL_RATE_PER_HOST, CRAWL_MIN_RATE_PER_HOST, CRAWL_MAX_RATE_PER_HOST, CRAWL_TARGET_LATENCY,
+    CRAWL_MAX_RETRIES, CRAWL_BACKOFF_BASE, CRAWL_DEADLINE_SECONDS
+)
+
+# 재시도할 HTTP 상태 (서버 과부하/일시 오류)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class CrawlDeadlineExceeded(Exception):
+    """전체 크롤링 제한 시간 초과 (체크포인트가 남아 다음 실행에서 이어감)"""
+
+
+class AdaptiveTokenBucket:
+    """호스트별 토큰 버킷 (응답 시간/오류에 따라 초당 요청 수를 조절)
+
+    응답이 목표 시간보다 빠르면 rate를 조금씩 올리고(+1/s), 오류나 느린 응답이면
+    절반으로 줄인다(AIMD). rate가 0이면 제한 없음.
+    """
+
+    def __init__(self, rate: float, min_rate: float = CRAWL_MIN_RATE_PER_HOST,
+                 max_rate: float = CRAWL_MAX_RATE_PER_HOST, target_latency: float = CRAWL_TARGET_LATENCY,
+                 burst: Optional[float] = None):
+        self.rate = rate
+        self.min_rate = min(min_rate, rate) if rate > 0 else 0.0
+        self.max_rate = max(max_rate, rate)
+        self.target_latency = target_latency
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, deadline: Optional[float] = None):
+        """토큰 하나를 얻을 때까지 대기 (deadline을 넘기면 CrawlDeadlineExceeded)"""
+        while True:
+            with self._lock:
+                if self.rate <= 0:
+                    return
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                raise CrawlDeadlineExceeded("크롤링 제한 시간 초과")
+            time.sleep(wait)
+
+    def record(self, latency: float, ok: bool):
+        """요청 결과를 반영해 rate 조절"""
+        with self._lock:
+            if self.rate <= 0:
+                return
+            if not ok or latency > self.target_latency * 2:
+                self.rate = max(self.min_rate, self.rate / 2)
+            elif latency < self.target_latency:
+                self.rate = min(self.max_rate, self.rate + 1)
+            self.burst = max(1.0, self.rate)
+            self.tokens = min(self.tokens, self.burst)
+
+
+class CrawlScheduler:
+    """크롤러 요청 스케줄러 (호스트별 토큰 버킷 + 지수 백오프 재시도 + 전체 제한 시간)"""
+
+    def __init__(self, rate: float = CRAWL_RATE_PER_HOST, max_retries: int = CRAWL_MAX_RETRIES,
+                 backoff_base: float = CRAWL_BACKOFF_BASE,
+                 deadline_seconds: Optional[float] = CRAWL_DEADLINE_SECONDS, **bucket_options):
+        self.rate = rate
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.deadline = time.monotonic() + deadline_seconds if deadline_seconds else None
+        self.bucket_options = bucket_options
+        self._buckets: Dict[str, AdaptiveTokenBucket] = {}
+        self._lock = threading.Lock()
+        self.retries = 0
+
+    def bucket(self, host: str) -> AdaptiveTokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = AdaptiveTokenBucket(self.rate, **self.bucket_options)
+                self._buckets[host] = bucket
+            return bucket
+
+    def check_deadline(self):
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise CrawlDeadlineExceeded("크롤링 제한 시간 초과")
+
+    def _backoff(self, attempt: int, response=None) -> float:
+        """재시도 대기 시간 (Retry-After가 있으면 우선, 없으면 base*2^n + 지터)"""
+        retry_after = (getattr(response, "headers", None) or {}).get("Retry-After")
+        if retry_after and str(retry_after).isdigit():
+            return float(retry_after)
+        return self.backoff_base * (2 ** attempt) + random.uniform(0, self.backoff_base)
+
+    def request(self, host: str, send: Callable[[], "requests.Response"]):
+        """send()를 호스트 속도 제한에 맞춰 실행하고 5xx/429/타임아웃이면 재시도
+
+        재시도 후에도 실패하면 마지막 응답(오류 상태)을 반환하거나 마지막 예외를 다시 발생시킨다.
+        """
+        bucket = self.bucket(host)
+        for attempt in range(self.max_retries + 1):
+            self.check_deadline()
+            bucket.acquire(self.deadline)
+            started = time.monotonic()
+            response, error = None, None
+            try:
+                response = send()
+            except (requests.Timeout, requests.ConnectionError) as e:
+                error = e
+            latency = time.monotonic() - started
+            ok = error is None and response.status_code not in RETRY_STATUS
+            bucket.record(latency, ok)
+            if ok or attempt == self.max_retries:
+                break
+
+            delay = self._backoff(attempt, response)
+            if self.deadline is not None and time.monotonic() + delay >= self.deadline:
+                break
+            with self._lock:
+                self.retries += 1
+            time.sleep(delay)
+
+        if error is not None:
+            raise error
+        return response
+
+    def stats(self) -> Dict:
+        """호스트별 현재 rate와 재시도 횟수"""
+        with self._lock:
+            rates = {host: round(bucket.rate, 2) for host, bucket in self._buckets.items()}
+        return {"rates": rates, "retries": self.retries}
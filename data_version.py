@@ -0,0 +1,95 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+from config import DATA_VERSION_POLL_SECONDS
+
+
+def bump_data_version(cursor, *names: str):
+    """데이터가 바뀐 테이블의 버전 증가 (쓰기 트랜잭션 안에서 호출해 변경과 함께 커밋)"""
+    updated_at = datetime.now(timezone.utc).isoformat()
+    cursor.executemany('''
+        INSERT INTO data_version (name, version, updated_at) VALUES (?, 1, ?)
+        ON CONFLICT(name) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at
+    ''', [(name, updated_at) for name in names])
+
+
+def get_data_versions(db_path: str) -> Dict[str, int]:
+    """테이블별 데이터 버전 (한 번도 바뀌지 않은 테이블은 없음)"""
+    conn = sqlite3.connect(db_path, timeout=5)
+    try:
+        return {name: version for name, version in conn.execute('SELECT name, version FROM data_version')}
+    except sqlite3.OperationalError:
+        # 아직 테이블이 없는 DB (init_database 전)
+        return {}
+    finally:
+        conn.close()
+
+
+class DataVersionWatcher:
+    """다른 프로세스(크롤러/동기화)가 바꾼 데이터를 감지해 캐시를 새로 고침
+
+    DB의 data_version 행과 감시 파일(QA 데이터셋 등)의 수정 시각을 최대
+    interval초마다 한 번 확인하고, 바뀐 이름에 등록된 콜백만 호출한다.
+    확인은 한 스레드만 하며 나머지 요청은 기다리지 않고 현재 캐시를 그대로 쓴다.
+    """
+
+    def __init__(self, db_path: str, interval: float = DATA_VERSION_POLL_SECONDS,
+                 files: Optional[Dict[str, Iterable[str]]] = None):
+        self.db_path = db_path
+        self.interval = interval
+        self.files = {name: tuple(paths) for name, paths in (files or {}).items()}
+        self._callbacks: Dict[str, List[Callable[[], None]]] = {}
+        self._seen = self.current()
+        self._next_check = time.monotonic() + interval
+        self._lock = threading.Lock()
+        self.refresh_count = 0
+
+    def subscribe(self, names: Iterable[str], callback: Callable[[], None]):
+        """names 중 하나라도 바뀌면 callback 호출 (한 번의 확인에서 콜백은 한 번만)"""
+        for name in names:
+            self._callbacks.setdefault(name, []).append(callback)
+
+    def current(self) -> Dict[str, int]:
+        versions = dict(get_data_versions(self.db_path))
+        for name, paths in self.files.items():
+            mtimes = [os.stat(path).st_mtime_ns for path in paths if os.path.exists(path)]
+            versions[f"file:{name}"] = max(mtimes, default=0)
+        return versions
+
+    def poll(self, force: bool = False) -> List[str]:
+        """바뀐 데이터 이름 목록 (확인 주기가 아니거나 다른 스레드가 확인 중이면 빈 목록)"""
+        if not force and time.monotonic() < self._next_check:
+            return []
+        if not self._lock.acquire(blocking=force):
+            return []
+        try:
+            self._next_check = time.monotonic() + self.interval
+            versions = self.current()
+            changed = sorted(key for key in set(versions) | set(self._seen)
+                             if versions.get(key) != self._seen.get(key))
+            if not changed:
+                return []
+
+            names = {key[5:] if key.startswith("file:") else key for key in changed}
+            callbacks = []
+            for name in sorted(names):
+                for callback in self._callbacks.get(name, []):
+                    if callback not in callbacks:
+                        callbacks.append(callback)
+            print(f"🔄 데이터 변경 감지: {', '.join(sorted(names))}")
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    # 실패하면 버전을 기억하지 않아 다음 확인에서 다시 시도
+                    print(f"캐시 새로 고침 오류: {e}")
+                    return sorted(names)
+            self._seen = versions
+            self.refresh_count += 1
+            return sorted(names)
+        finally:
+            self._lock.release()
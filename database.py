@@ -1,7 +1,12 @@
 import sqlite3
 import json
+import re
+import threading
 from datetime import datetime, timezone, timedelta
 from typing import List, Dict, Optional
+from config import USE_SNAPSHOT
+from conversation_logger import get_conversation_logger
+from data_version import bump_data_version
 
 # 한국 시간대 설정 (UTC+9) - 표시용만
 KST = timezone(timedelta(hours=9))
@@ -10,10 +15,223 @@ def get_kst_now():
     """현재 한국 시간 반환 (표시용)"""
     return datetime.now(KST)
 
+# 공지사항 검색 시 검색어에서 제외할 단어
+NOTICE_SEARCH_STOPWORDS = {
+    '공지', '공지사항', '알림', '소식', '뉴스', '안내', '관련', '알려줘', '알려주세요',
+    '찾아줘', '찾아주세요', '있어', '있나요', '언제', '어디', '뭐야', '가정통신문'
+}
+
+# 검색어 끝에 붙은 조사 (트라이그램은 부분 문자열 매칭이므로 조사를 떼어야 함)
+NOTICE_SEARCH_JOSA = ('으로', '에서', '에게', '은', '는', '이', '가', '을', '를', '에', '의', '도', '로', '과', '와', '랑')
+
+def extract_notice_search_terms(query: str) -> List[str]:
+    """공지사항 검색어 추출 (불용어/조사 제거)"""
+    terms = []
+    for word in re.findall(r'[가-힣A-Za-z0-9]+', query):
+        if word in NOTICE_SEARCH_STOPWORDS:
+            continue
+        for josa in NOTICE_SEARCH_JOSA:
+            if word.endswith(josa) and len(word) - len(josa) >= 2:
+                word = word[:-len(josa)]
+                break
+        if len(word) >= 2 and word not in NOTICE_SEARCH_STOPWORDS and word not in terms:
+            terms.append(word)
+    return terms
+
+def _chunks(items: List, size: int):
+    """IN (...) 쿼리용으로 목록을 나눔 (SQLite 변수 개수 제한)"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def parse_ntt_sn(url: Optional[str]) -> Optional[int]:
+    """공지사항 상세 URL에서 게시물 번호(nttSn) 추출"""
+    match = re.search(r'nttSn=(\d+)', url or '')
+    return int(match.group(1)) if match else None
+
+def notice_row_to_dict(row) -> Dict:
+    """notices 행을 dict로 변환"""
+    return {
+        'id': row[0],
+        'title': row[1],
+        'content': row[2],
+        'url': row[3],
+        'created_at': row[4],
+        'tags': row[5],
+        'category': row[6]
+    }
+
+def query_notice_search(cursor, query: str, limit: int, fts_enabled: bool) -> List[Dict]:
+    """공지사항 검색 쿼리 실행 (디스크 DB/스냅샷 공용)"""
+    terms = extract_notice_search_terms(query)
+    if not terms:
+        return []
+
+    # trigram은 3글자 이상만 색인되므로 2글자 검색어는 LIKE로 처리
+    fts_terms = [t for t in terms if len(t) >= 3]
+
+    if fts_enabled and fts_terms:
+        match = ' OR '.join('"' + t.replace('"', '""') + '"' for t in fts_terms)
+        cursor.execute('''
+            SELECT n.id, n.title, n.content, n.url, n.created_at, n.tags, n.category
+            FROM notices_fts
+            JOIN notices n ON n.id = notices_fts.rowid
+            WHERE notices_fts MATCH ?
+            ORDER BY bm25(notices_fts, 10.0, 1.0)
+            LIMIT ?
+        ''', (match, limit))
+    else:
+        conditions = ' OR '.join(['title LIKE ?'] * len(terms))
+        cursor.execute(
+            f'SELECT id, title, content, url, created_at, tags, category FROM notices '
+            f'WHERE {conditions} ORDER BY created_at DESC LIMIT ?',
+            [f'%{t}%' for t in terms] + [limit]
+        )
+
+    return [notice_row_to_dict(row) for row in cursor.fetchall()]
+
+class ReferenceSnapshot:
+    """qa_data/meals/notices 읽기 전용 스냅샷
+
+    크롤러나 데이터 동기화가 끝났을 때만 바뀌는 테이블을 메모리에 올려두고
+    모든 조회를 여기서 처리한다. 만들어진 뒤에는 바뀌지 않으므로(새 스냅샷으로
+    통째로 교체) 읽는 쪽은 잠금 없이 항상 일관된 버전을 본다.
+    """
+
+    def __init__(self, db_path: str, version: int):
+        self.db_path = db_path
+        self.version = version
+        self.loaded_at = get_kst_now()
+
+        disk = sqlite3.connect(db_path)
+        try:
+            cursor = disk.cursor()
+            # 세 테이블을 같은 읽기 트랜잭션에서 읽어 서로 일관된 상태로 적재
+            cursor.execute('BEGIN')
+            cursor.execute('SELECT id, category, question, answer, link, created_at FROM qa_data')
+            qa_rows = cursor.fetchall()
+            cursor.execute('SELECT date, meal_type, menu FROM meals')
+            meal_rows = cursor.fetchall()
+            cursor.execute('SELECT id, title, content, url, created_at, tags, category FROM notices')
+            notice_rows = cursor.fetchall()
+            disk.rollback()
+        finally:
+            disk.close()
+
+        self.qa_data = tuple(
+            {
+                'id': row[0],
+                'category': row[1],
+                'question': row[2],
+                'answer': row[3],
+                'link': row[4],
+                'created_at': row[5]
+            }
+            for row in qa_rows
+        )
+        self.meals = {(row[0], row[1]): row[2] for row in meal_rows}
+        self.notices = tuple(
+            notice_row_to_dict(row)
+            for row in sorted(notice_rows, key=lambda r: r[4] or '', reverse=True)
+        )
+
+        # 공지 검색용 인메모리 DB (SQLite serialized 모드라 스레드 간 공유 가능)
+        self._search_conn = sqlite3.connect(':memory:', check_same_thread=False)
+        self._search_conn.execute('''
+            CREATE TABLE notices (
+                id INTEGER PRIMARY KEY, title TEXT, content TEXT, url TEXT,
+                created_at TEXT, tags TEXT, category TEXT
+            )
+        ''')
+        self._search_conn.executemany('INSERT INTO notices VALUES (?, ?, ?, ?, ?, ?, ?)', notice_rows)
+        try:
+            self._search_conn.execute(
+                "CREATE VIRTUAL TABLE notices_fts USING fts5("
+                "title, content, content='notices', content_rowid='id', tokenize='trigram')"
+            )
+            self._search_conn.execute("INSERT INTO notices_fts(notices_fts) VALUES ('rebuild')")
+            self.fts_enabled = True
+        except sqlite3.OperationalError:
+            self.fts_enabled = False
+        self._search_conn.commit()
+
+    def get_qa_data(self, category: Optional[str] = None) -> List[Dict]:
+        if category:
+            return [qa for qa in self.qa_data if qa['category'] == category]
+        return list(self.qa_data)
+
+    def get_meal_info(self, date: str, meal_type: str = '중식') -> Optional[str]:
+        return self.meals.get((date, meal_type))
+
+    def get_latest_notices(self, limit: int = 5) -> List[Dict]:
+        return list(self.notices[:limit])
+
+    def search_notices(self, query: str, limit: int = 5) -> List[Dict]:
+        return query_notice_search(self._search_conn.cursor(), query, limit, self.fts_enabled)
+
+_snapshots: Dict[str, ReferenceSnapshot] = {}
+_snapshot_build_lock = threading.Lock()
+
+def get_snapshot(db_path: str = "school_data.db") -> ReferenceSnapshot:
+    """현재 스냅샷 반환 (없으면 생성)"""
+    snapshot = _snapshots.get(db_path)
+    if snapshot is None:
+        with _snapshot_build_lock:
+            snapshot = _snapshots.get(db_path)
+            if snapshot is None:
+                snapshot = ReferenceSnapshot(db_path, version=1)
+                _snapshots[db_path] = snapshot
+    return snapshot
+
+def refresh_snapshot(db_path: str = "school_data.db") -> ReferenceSnapshot:
+    """새 스냅샷을 만든 뒤 원자적으로 교체 (읽는 중인 요청은 이전 버전을 계속 사용)"""
+    with _snapshot_build_lock:
+        previous = _snapshots.get(db_path)
+        snapshot = ReferenceSnapshot(db_path, version=previous.version + 1 if previous else 1)
+        _snapshots[db_path] = snapshot
+    print(f"참조 데이터 스냅샷 교체 완료: v{snapshot.version} "
+          f"(QA {len(snapshot.qa_data)}, 급식 {len(snapshot.meals)}, 공지 {len(snapshot.notices)})")
+    return snapshot
+
+_refresh_running = set()
+_refresh_pending = set()
+_refresh_lock = threading.Lock()
+
+def _refresh_snapshot_worker(db_path: str):
+    while True:
+        try:
+            refresh_snapshot(db_path)
+        except Exception as e:
+            print(f"참조 데이터 스냅샷 갱신 오류: {e}")
+        with _refresh_lock:
+            # 만드는 도중 다시 요청이 왔으면 그 사이 바뀐 데이터까지 한 번 더 반영
+            if db_path not in _refresh_pending:
+                _refresh_running.discard(db_path)
+                return
+            _refresh_pending.discard(db_path)
+
+def refresh_snapshot_in_background(db_path: str = "school_data.db") -> Optional[threading.Thread]:
+    """백그라운드 스레드에서 스냅샷을 새로 만들어 교체 (교체 전까지 요청은 이전 스냅샷 사용)
+
+    이미 만드는 중이면 새 스레드를 띄우지 않고, 끝난 뒤 한 번만 더 만든다.
+    반환: 새로 시작한 스레드 (이미 실행 중이면 None)
+    """
+    with _refresh_lock:
+        if db_path in _refresh_running:
+            _refresh_pending.add(db_path)
+            return None
+        _refresh_running.add(db_path)
+    thread = threading.Thread(target=_refresh_snapshot_worker, args=(db_path,),
+                              name="snapshot-refresh", daemon=True)
+    thread.start()
+    return thread
+
 class DatabaseManager:
-    def __init__(self, db_path: str = "school_data.db"):
+    def __init__(self, db_path: str = "school_data.db", use_snapshot: bool = USE_SNAPSHOT):
         self.db_path = db_path
+        self.use_snapshot = use_snapshot
         self.init_database()
+        if self.use_snapshot:
+            get_snapshot(self.db_path)
     
     def init_database(self):
         """데이터베이스 초기화 및 테이블 생성"""
@@ -39,9 +257,13 @@ class DatabaseManager:
                 user_id TEXT NOT NULL,
                 message TEXT NOT NULL,
                 response TEXT NOT NULL,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                intent TEXT,
+                qa_id INTEGER
             )
         ''')
+        # 기존 DB에는 intent/qa_id 컬럼이 없으므로 추가
+        self._ensure_columns(cursor, 'conversation_history', {'intent': 'TEXT', 'qa_id': 'INTEGER'})
         
         # 식단 테이블
         cursor.execute('''
@@ -67,11 +289,187 @@ class DatabaseManager:
             )
         ''')
         
+        # 크롤러 일괄 UPSERT용 고유 키 (공지: 게시판 nttSn, 급식: 날짜+식사 종류)
+        self._ensure_columns(cursor, 'notices', {'ntt_sn': 'INTEGER'})
+        # 메뉴별 알레르기 유발 식품 번호 (JSON: [{"dish": ..., "codes": [...]}])
+        self._ensure_columns(cursor, 'meals', {'allergens': 'TEXT'})
+        self._ensure_unique_keys(cursor)
+        
+        # 공지사항 전문 검색 인덱스 (FTS5, 한국어용 trigram 토크나이저)
+        self.fts_enabled = self._init_notice_fts(cursor)
+        
+        # 일별 집계 테이블 (대화 기록 롤업/통계용, metric: intent/qa/unmatched/users/crawl)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS daily_stats (
+                day TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                key TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, metric, key)
+            )
+        ''')
+        
+        # 일별 방문 사용자 (기간별 순 사용자 수 집계용)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS daily_users (
+                day TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                PRIMARY KEY (day, user_id)
+            ) WITHOUT ROWID
+        ''')
+        
+        # 롤업 진행 상태 (마지막으로 집계한 대화 id 등)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS rollup_state (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        ''')
+        
+        # 크롤링 페이지별 검증값 (조건부 요청/내용 해시로 변경 없는 페이지 건너뛰기)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS crawl_state (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                item_count INTEGER,
+                checked_at TEXT
+            )
+        ''')
+        
+        # 중단된 크롤링을 이어가기 위한 진행 위치 (방문한 목록 페이지, 대기/저장 완료 항목)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS crawl_checkpoint (
+                name TEXT PRIMARY KEY,
+                pages_visited INTEGER NOT NULL DEFAULT 0,
+                listing_done INTEGER NOT NULL DEFAULT 0,
+                pending TEXT NOT NULL DEFAULT '[]',
+                saved TEXT NOT NULL DEFAULT '[]',
+                updated_at TEXT
+            )
+        ''')
+        
+        # DB에 반영한 변경 기록 파일 (changelog/*.jsonl.gz, 같은 파일을 두 번 적용하지 않음)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS changelog_applied (
+                file TEXT PRIMARY KEY,
+                records INTEGER NOT NULL DEFAULT 0,
+                applied_at TEXT
+            )
+        ''')
+        
+        # 테이블별 데이터 버전 (크롤러가 바꾸면 증가, 웹 프로세스가 주기적으로 확인해 캐시 갱신)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS data_version (
+                name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT
+            )
+        ''')
+        
+        # OpenAI 답변 캐시 (정규화 질문 + 데이터 버전 기준, llm_cache.py에서 사용)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                question_key TEXT NOT NULL,
+                dataset_version TEXT NOT NULL,
+                question TEXT,
+                answer TEXT NOT NULL,
+                tokens INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                last_hit_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (question_key, dataset_version)
+            )
+        ''')
+        
         conn.commit()
         conn.close()
     
+    def _init_notice_fts(self, cursor) -> bool:
+        """notices_fts 가상 테이블과 동기화 트리거 생성 (처음 생성 시 기존 공지 색인)"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'notices_fts'")
+        exists = cursor.fetchone() is not None
+        try:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS notices_fts USING fts5(
+                    title, content,
+                    content='notices', content_rowid='id',
+                    tokenize='trigram'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            print(f"FTS5 trigram 사용 불가, LIKE 검색으로 대체: {e}")
+            return False
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS notices_fts_ai AFTER INSERT ON notices BEGIN
+                INSERT INTO notices_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS notices_fts_ad AFTER DELETE ON notices BEGIN
+                INSERT INTO notices_fts(notices_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS notices_fts_au AFTER UPDATE ON notices BEGIN
+                INSERT INTO notices_fts(notices_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+                INSERT INTO notices_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+            END
+        ''')
+        
+        if not exists:
+            cursor.execute("INSERT INTO notices_fts(notices_fts) VALUES ('rebuild')")
+            print("공지사항 검색 인덱스 생성 완료")
+        return True
+    
+    def _ensure_unique_keys(self, cursor):
+        """nttSn 채우기, 중복 행 정리 후 고유 인덱스 생성 (최초 1회)"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_notices_ntt_sn'")
+        if cursor.fetchone() is None:
+            cursor.execute('SELECT id, url FROM notices WHERE ntt_sn IS NULL')
+            updates = [(parse_ntt_sn(url), notice_id) for notice_id, url in cursor.fetchall()]
+            cursor.executemany('UPDATE notices SET ntt_sn = ? WHERE id = ?', [u for u in updates if u[0]])
+            
+            # 같은 nttSn이 여러 번 저장된 경우 본문이 있는 최신 행만 남김
+            cursor.execute('''
+                DELETE FROM notices WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (
+                            PARTITION BY ntt_sn
+                            ORDER BY (content IS NOT NULL AND content != '') DESC, id DESC
+                        ) AS rn
+                        FROM notices WHERE ntt_sn IS NOT NULL
+                    ) WHERE rn > 1
+                )
+            ''')
+            if cursor.rowcount:
+                print(f"중복 공지사항 {cursor.rowcount}건 정리")
+            cursor.execute('CREATE UNIQUE INDEX idx_notices_ntt_sn ON notices(ntt_sn)')
+        
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_meals_date_type'")
+        if cursor.fetchone() is None:
+            cursor.execute('''
+                DELETE FROM meals WHERE id NOT IN (
+                    SELECT MAX(id) FROM meals GROUP BY date, meal_type
+                )
+            ''')
+            cursor.execute('CREATE UNIQUE INDEX idx_meals_date_type ON meals(date, meal_type)')
+    
+    def _ensure_columns(self, cursor, table: str, columns: Dict[str, str]):
+        """테이블에 없는 컬럼 추가 (간단한 마이그레이션)"""
+        cursor.execute(f'PRAGMA table_info({table})')
+        existing = {row[1] for row in cursor.fetchall()}
+        for name, col_type in columns.items():
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {col_type}')
+    
     def get_qa_data(self, category: Optional[str] = None) -> List[Dict]:
         """QA 데이터 조회"""
+        if self.use_snapshot:
+            return get_snapshot(self.db_path).get_qa_data(category)
+        
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
@@ -95,11 +493,9 @@ class DatabaseManager:
             for row in results
         ]
     
-    def save_conversation(self, user_id: str, message: str, response):
-        """대화 히스토리 저장"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+    def save_conversation(self, user_id: str, message: str, response,
+                          intent: Optional[str] = None, qa_id: Optional[int] = None):
+        """대화 히스토리 저장 (write-behind 큐에 추가, 요청 지연 없음)"""
         # response가 dict인 경우 텍스트로 변환
         if isinstance(response, dict):
             if response.get("type") == "image":
@@ -109,13 +505,11 @@ class DatabaseManager:
         else:
             response_text = str(response)
         
-        cursor.execute(
-            'INSERT INTO conversation_history (user_id, message, response) VALUES (?, ?, ?)',
-            (user_id, message, response_text)
-        )
-        
-        conn.commit()
-        conn.close()
+        get_conversation_logger(self.db_path).log(user_id, message, response_text, intent, qa_id)
+    
+    def flush_conversations(self):
+        """대기 중인 대화 기록을 즉시 저장"""
+        get_conversation_logger(self.db_path).flush()
     
     def get_conversation_history(self, user_id: str, limit: int = 5) -> List[Dict]:
         """사용자별 대화 히스토리 조회"""
@@ -143,6 +537,9 @@ class DatabaseManager:
     
     def get_meal_info(self, date: str) -> Optional[str]:
         """특정 날짜의 식단 정보 조회"""
+        if self.use_snapshot:
+            return get_snapshot(self.db_path).get_meal_info(date)
+        
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
@@ -155,23 +552,193 @@ class DatabaseManager:
     
     def get_latest_notices(self, limit: int = 5) -> List[Dict]:
         """최신 공지사항 조회"""
+        if self.use_snapshot:
+            return get_snapshot(self.db_path).get_latest_notices(limit)
+        
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        cursor.execute('SELECT * FROM notices ORDER BY created_at DESC LIMIT ?', (limit,))
+        cursor.execute('SELECT id, title, content, url, created_at, tags, category FROM notices ORDER BY created_at DESC LIMIT ?', (limit,))
         results = cursor.fetchall()
         
         conn.close()
         
-        return [
-            {
-                'id': row[0],
-                'title': row[1],
-                'content': row[2],
-                'url': row[3],
-                'created_at': row[4],
-                'tags': row[5],
-                'category': row[6]
-            }
-            for row in results
-        ] 
\ No newline at end of file
+        return [notice_row_to_dict(row) for row in results]
+    
+    def search_notices(self, query: str, limit: int = 5) -> List[Dict]:
+        """공지사항 검색 (FTS5 BM25 순위, 제목 가중치 높음)"""
+        if self.use_snapshot:
+            return get_snapshot(self.db_path).search_notices(query, limit)
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return query_notice_search(conn.cursor(), query, limit, self.fts_enabled)
+        finally:
+            conn.close()
+    
+    def refresh_snapshot(self):
+        """DB 변경 후 스냅샷 다시 만들기"""
+        if self.use_snapshot:
+            refresh_snapshot(self.db_path)
+    
+    def refresh_snapshot_in_background(self):
+        """DB 변경 후 스냅샷을 백그라운드에서 다시 만들기 (요청 처리 중 호출용)"""
+        if self.use_snapshot:
+            refresh_snapshot_in_background(self.db_path)
+    
+    def ingest_notices(self, notices: List[Dict], changes: Optional[List[Dict]] = None) -> Dict[str, int]:
+        """공지사항 일괄 UPSERT (nttSn 기준, 단일 트랜잭션)
+        
+        반환: {'inserted': 새로 추가, 'updated': 내용이 바뀐 기존 공지, 'skipped': nttSn 없음}
+        changes 목록이 주어지면 실제로 추가/변경된 행을 {'op', 'row'} 형태로 덧붙인다.
+        """
+        rows = {}
+        skipped = 0
+        for notice in notices:
+            ntt_sn = notice.get('ntt_sn') or parse_ntt_sn(notice.get('url'))
+            if not ntt_sn:
+                skipped += 1
+                continue
+            rows[int(ntt_sn)] = (
+                int(ntt_sn),
+                notice['title'],
+                notice.get('content'),
+                notice.get('url'),
+                notice.get('created_at'),
+                notice.get('tags'),
+                notice.get('category')
+            )
+        
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                cursor = conn.cursor()
+                cursor.execute('BEGIN IMMEDIATE')
+                existing = {}
+                for chunk in _chunks(list(rows), 500):
+                    cursor.execute(
+                        f'SELECT ntt_sn, title, content, url, created_at FROM notices '
+                        f'WHERE ntt_sn IN ({",".join("?" * len(chunk))})',
+                        chunk
+                    )
+                    existing.update({row[0]: row[1:] for row in cursor.fetchall()})
+                
+                new_rows = [row for key, row in rows.items() if key not in existing]
+                changed_rows = [row for key, row in rows.items() if key in existing and existing[key] != row[1:5]]
+                cursor.executemany('''
+                    INSERT INTO notices (ntt_sn, title, content, url, created_at, tags, category)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(ntt_sn) DO UPDATE SET
+                        title = excluded.title,
+                        content = excluded.content,
+                        url = excluded.url,
+                        created_at = excluded.created_at,
+                        tags = excluded.tags,
+                        category = COALESCE(excluded.category, notices.category)
+                ''', new_rows + changed_rows)
+                if new_rows or changed_rows:
+                    bump_data_version(cursor, 'notices')
+        finally:
+            conn.close()
+        
+        if changes is not None:
+            columns = ('ntt_sn', 'title', 'content', 'url', 'created_at', 'tags', 'category')
+            changes.extend({'op': 'insert', 'row': dict(zip(columns, row))} for row in new_rows)
+            changes.extend({'op': 'update', 'row': dict(zip(columns, row))} for row in changed_rows)
+        return {'inserted': len(new_rows), 'updated': len(changed_rows), 'skipped': skipped}
+    
+    def get_known_ntt_sns(self, ntt_sns: List[int]) -> set:
+        """이미 저장된 공지 번호 (ntt_sn 유니크 인덱스로 조회)"""
+        known = set()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            for chunk in _chunks(list(set(ntt_sns)), 500):
+                cursor.execute(
+                    f'SELECT ntt_sn FROM notices WHERE ntt_sn IN ({",".join("?" * len(chunk))})',
+                    chunk
+                )
+                known.update(row[0] for row in cursor.fetchall())
+        finally:
+            conn.close()
+        return known
+    
+    def get_max_ntt_sn(self) -> int:
+        """가장 최근 공지 번호 (없으면 0)"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute('SELECT COALESCE(MAX(ntt_sn), 0) FROM notices').fetchone()[0]
+        finally:
+            conn.close()
+    
+    def ingest_meals(self, meals: List[Dict], changes: Optional[List[Dict]] = None) -> Dict[str, int]:
+        """급식 일괄 UPSERT ((date, meal_type) 기준, 단일 트랜잭션)
+        
+        반환: {'inserted': 새로 추가, 'updated': 메뉴/이미지/알레르기 정보가 바뀐 기존 급식}
+        changes 목록이 주어지면 실제로 추가/변경된 행을 {'op', 'row'} 형태로 덧붙인다.
+        """
+        rows = {}
+        for meal in meals:
+            key = (meal['date'], meal.get('meal_type') or '중식')
+            allergens = meal.get('allergens')
+            rows[key] = key + (
+                meal.get('menu'),
+                meal.get('image_url') or None,
+                json.dumps(allergens, ensure_ascii=False) if allergens else None
+            )
+        
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                cursor = conn.cursor()
+                cursor.execute('BEGIN IMMEDIATE')
+                dates = sorted({key[0] for key in rows})
+                existing = {}
+                for chunk in _chunks(dates, 500):
+                    cursor.execute(
+                        f'SELECT date, meal_type, menu, image_url, allergens FROM meals '
+                        f'WHERE date IN ({",".join("?" * len(chunk))})',
+                        chunk
+                    )
+                    existing.update({(row[0], row[1]): row[2:] for row in cursor.fetchall()})
+                
+                new_rows = [row for key, row in rows.items() if key not in existing]
+                # 새 이미지/알레르기 정보가 비어 있으면 기존 값을 유지하므로 변경으로 보지 않음
+                changed_rows = [
+                    row for key, row in rows.items()
+                    if key in existing and (
+                        existing[key][0] != row[2]
+                        or (row[3] and existing[key][1] != row[3])
+                        or (row[4] and existing[key][2] != row[4])
+                    )
+                ]
+                cursor.executemany('''
+                    INSERT INTO meals (date, meal_type, menu, image_url, allergens)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(date, meal_type) DO UPDATE SET
+                        menu = excluded.menu,
+                        image_url = COALESCE(excluded.image_url, meals.image_url),
+                        allergens = COALESCE(excluded.allergens, meals.allergens)
+                ''', new_rows + changed_rows)
+                if new_rows or changed_rows:
+                    bump_data_version(cursor, 'meals')
+        finally:
+            conn.close()
+        
+        if changes is not None:
+            for op, op_rows in (('insert', new_rows), ('update', changed_rows)):
+                changes.extend({'op': op, 'row': {
+                    'date': row[0], 'meal_type': row[1], 'menu': row[2], 'image_url': row[3],
+                    'allergens': json.loads(row[4]) if row[4] else None
+                }} for row in op_rows)
+        return {'inserted': len(new_rows), 'updated': len(changed_rows)}
+    
+    def get_qa_count(self) -> int:
+        """QA 데이터 개수 (목록을 만들지 않고 조회)"""
+        if self.use_snapshot:
+            return len(get_snapshot(self.db_path).qa_data)
+        
+        conn = sqlite3.connect(self.db_path)
+        count = conn.execute('SELECT COUNT(*) FROM qa_data').fetchone()[0]
+        conn.close()
+        return count
@@ -1,16 +1,11 @@
-import sqlite3
-import time
-import json
-import re
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, NoSuchElementException
+import argparse
 from datetime import datetime, timezone, timedelta
-import os
+import requests
+from database import DatabaseManager
+from school_crawler import SchoolCrawler, CrawlState, CrawlCheckpoint
+from config import CRAWL_BATCH_SIZE
+from stats import record_crawl_result
+from changelog import ChangelogWriter
 
 # 한국 시간대 설정 (UTC+9) - 표시용만
 KST = timezone(timedelta(hours=9))
@@ -19,359 +14,336 @@ def get_kst_now():
     """현재 한국 시간 반환 (표시용)"""
     return datetime.now(KST)
 
-def get_latest_notice_date():
-    """DB에서 최신 공지사항 날짜 조회"""
-    try:
-        conn = sqlite3.connect('school_data.db')
-        cursor = conn.cursor()
-        cursor.execute("SELECT MAX(created_at) FROM notices")
-        latest_date = cursor.fetchone()[0]
-        conn.close()
-        return latest_date
-    except Exception as e:
-        print(f"DB 조회 오류: {e}")
-        return None
+_db = None
+
+def get_db():
+    """크롤러용 DB 인스턴스 (스냅샷 없이 디스크에 직접 기록)"""
+    global _db
+    if _db is None:
+        _db = DatabaseManager('school_data.db', use_snapshot=False)
+    return _db
+
+def use_database(db_path):
+    """크롤러가 기록할 DB 파일 변경 (벤치마크/테스트용)"""
+    global _db
+    _db = DatabaseManager(db_path, use_snapshot=False)
+    return _db
+
+_changelog = None
+
+def start_changelog():
+    """이번 크롤링의 변경 기록 파일 시작 (실행마다 새 파일)"""
+    global _changelog
+    _changelog = ChangelogWriter(get_db().db_path)
+    return _changelog
+
+def get_changelog():
+    """현재 변경 기록 (없거나 다른 DB용이면 새로 시작)"""
+    if _changelog is None or _changelog.db_path != get_db().db_path:
+        return start_changelog()
+    return _changelog
+
+def new_crawler():
+    """crawl_state를 사용하는 크롤러 (변경 없는 페이지는 건너뜀)"""
+    return SchoolCrawler(state=CrawlState(get_db().db_path))
+
+def finish_crawl_state(crawler, saved_ok=True):
+    """DB 저장이 끝난 뒤 페이지 검증값을 기록하고 요청/건너뛴 페이지 수를 통계에 누적"""
+    state = crawler.state
+    if state is None:
+        return
+    if saved_ok:
+        state.save()
+    else:
+        # 저장하지 못한 페이지를 다음 실행에서 다시 받도록 이번 검증값은 버림
+        state.rollback()
+    counts = state.pop_counts()
+    record_crawl_result(get_db().db_path, counts)
+    print(f"페이지 요청 결과: 새로 받음 {counts['pages_fetched']}개, "
+          f"304 {counts['pages_not_modified']}개, 내용 동일 {counts['pages_unchanged']}개")
 
 def save_notices_to_db(notices_data):
-    """공지사항 데이터를 DB에 저장"""
+    """공지사항 데이터를 DB에 저장 (nttSn 기준 일괄 UPSERT, 실패 시 None)"""
     try:
-        conn = sqlite3.connect('school_data.db')
-        cursor = conn.cursor()
-        
-        # 기존 제목 목록 (중복 방지)
-        cursor.execute("SELECT title FROM notices")
-        existing_titles = {row[0] for row in cursor.fetchall()}
-        
-        new_count = 0
-        for notice in notices_data:
-            if notice['title'] not in existing_titles:
-                cursor.execute("""
-                    INSERT INTO notices (title, content, url, created_at, tags, category)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    notice['title'],
-                    notice['content'],
-                    notice['url'],
-                    notice['created_at'],
-                    notice['tags'],
-                    notice['category']
-                ))
-                new_count += 1
-                print(f"새 공지사항 추가: {notice['title']}")
-        
-        conn.commit()
-        conn.close()
-        print(f"총 {new_count}개의 새로운 공지사항이 저장되었습니다.")
-        return new_count
+        changes = []
+        result = get_db().ingest_notices(notices_data, changes=changes)
+        get_changelog().append('notices', changes)
+        record_crawl_result(get_db().db_path, {
+            'notices_inserted': result['inserted'],
+            'notices_updated': result['updated']
+        })
+        print(f"공지사항 저장 완료: 신규 {result['inserted']}개, 변경 {result['updated']}개"
+              f" (nttSn 없음 {result['skipped']}개)")
+        return result['inserted']
         
     except Exception as e:
         print(f"DB 저장 오류: {e}")
-        return 0
+        record_crawl_result(get_db().db_path, {'failures': 1})
+        return None
 
-def setup_driver():
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")  # 백그라운드 실행
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-web-security")
-    chrome_options.add_argument("--allow-running-insecure-content")
-    chrome_options.add_argument("--disable-extensions")
-    chrome_options.add_argument("--disable-plugins")
-    chrome_options.add_argument("--disable-images")
-    chrome_options.add_argument("--disable-javascript")
-    
-    # Render 환경에서 ChromeDriver 경로 설정
-    if os.path.exists('/usr/local/bin/chromedriver'):
-        service = Service('/usr/local/bin/chromedriver')
-    else:
-    service = Service()
-    
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    driver.implicitly_wait(3)
-    return driver
+def collect_new_notice_items(crawler, checkpoint, max_new_notices=50, max_pages=20, backfill=False):
+    """목록 페이지만 훑어 DB에 없는 공지 항목(nttSn/제목/날짜)을 체크포인트에 모음
 
-def extract_notice_content(driver):
-    """공지사항 본문 추출"""
-    try:
-        el = driver.find_element(By.CSS_SELECTOR, "div.bbsV_cont")
-        return el.text.strip()
-    except Exception:
-        return ""
+    증분 모드는 저장된 번호만 있는 페이지를 만나면 종료하고,
+    백필 모드는 max_pages까지 모든 페이지를 확인한다.
+    """
+    for page in range(checkpoint.pages_visited + 1, max_pages + 1):
+        if len(checkpoint.pending) >= max_new_notices:
+            break
+        print(f"\n=== 페이지 {page} 확인 중 ===")
+        try:
+            page_items = crawler.fetch_notice_list(page, conditional=not backfill)
+        except requests.RequestException as e:
+            print(f"목록 페이지 요청 오류: {e}")
+            break
+        if page_items is None:
+            # 목록이 지난번과 같으면 이후 페이지도 밀려나지 않았으므로 종료
+            print("목록 페이지 변경 없음")
+            break
+        if not page_items:
+            print("마지막 페이지입니다.")
+            break
+        print(f"현재 페이지 공지 수: {len(page_items)}")
+        
+        for item in page_items:
+            if item['ntt_sn'] is None:
+                print(f"게시물 번호를 찾을 수 없습니다: {item['title']}")
+        ntt_sns = [item['ntt_sn'] for item in page_items if item['ntt_sn'] is not None]
+        known = get_db().get_known_ntt_sns(ntt_sns)
+        new_items = [item for item in page_items
+                     if item['ntt_sn'] is not None and item['ntt_sn'] not in known]
+        for item in new_items:
+            print(f"새 공지사항 발견: {item['title']} ({item['created_at']})")
+        checkpoint.visit_page(page, new_items[:max(0, max_new_notices - len(checkpoint.pending))])
+        
+        # 같은 날 나중에 올라온 공지도 번호로 구분되므로 날짜 대신 번호로 판단
+        if not new_items and not backfill:
+            print("이 페이지의 공지는 모두 저장되어 있습니다.")
+            break
+    checkpoint.finish_listing()
+    return checkpoint.pending_items()
 
-def parse_date(date_str):
-    """날짜 문자열을 표준 형식으로 변환"""
-    try:
-        # "2025.07.07" -> "2025-07-07"
-        if '.' in date_str:
-            return date_str.replace('.', '-')
-        return date_str
-    except:
-        return date_str
+def crawl_incremental_notices(max_new_notices=50, max_pages=20, crawler=None,
+                              batch_size=CRAWL_BATCH_SIZE, backfill=False):
+    """증분 업데이트 방식으로 공지사항 크롤링
 
-def crawl_incremental_notices(max_new_notices=50):
-    """증분 업데이트 방식으로 공지사항 크롤링"""
-    latest_date = get_latest_notice_date()
-    print(f"DB 최신 공지사항 날짜: {latest_date}")
-    
-    if not latest_date:
-        print("DB에서 최신 날짜를 가져올 수 없습니다.")
-        return
+    목록 페이지에서 DB에 없는 공지 번호(nttSn)를 먼저 모은 뒤 상세 페이지를 동시에
+    요청하고, 완료되는 대로 batch_size개씩 DB에 저장한다. 진행 위치는 체크포인트에
+    기록되어 중간에 중단되면 다음 실행이 남은 항목부터 이어간다.
+    """
+    checkpoint = CrawlCheckpoint(get_db().db_path, 'notices_backfill' if backfill else 'notices')
+    if checkpoint.resumed:
+        print(f"이전 크롤링 이어서 진행: 페이지 {checkpoint.pages_visited}까지 확인, "
+              f"대기 {len(checkpoint.pending)}개, 저장 {len(checkpoint.saved)}개")
     
-    url = "https://pajuwaseok-e.goepj.kr/pajuwaseok-e/na/ntt/selectNttList.do?mi=8476&bbsId=5794"
-    driver = setup_driver()
+    crawler = crawler or new_crawler()
     new_notices = []
+    saved_ok = True
+    
+    def flush(batch, done_ids):
+        nonlocal saved_ok
+        if batch and save_notices_to_db(batch) is None:
+            saved_ok = False
+            return
+        checkpoint.mark_saved(done_ids)
     
     try:
-        print("공지사항 페이지 접속 중...")
-        driver.get(url)
-        time.sleep(2)
-        
-        page = 1
-        while len(new_notices) < max_new_notices:
-            print(f"\n=== 페이지 {page} 확인 중 ===")
-            
-            if page > 1:
-                try:
-                    btn = driver.find_element(By.CSS_SELECTOR, f"a[onclick*='goPaging({page})']")
-                    btn.click()
-                    time.sleep(2)
-                except Exception as e:
-                    print(f"페이지 이동 오류: {e}")
-                    break
-            
-            # 현재 페이지의 모든 링크 가져오기
-            links = driver.find_elements(By.CSS_SELECTOR, "table tbody tr td.ta_l > a")
-            print(f"현재 페이지 링크 수: {len(links)}")
-            
-            page_has_new = False
-            for i in range(len(links)):
-                if len(new_notices) >= max_new_notices:
-                    break
-                    
-                try:
-                    # 매 반복마다 links 재조회
-                    links = driver.find_elements(By.CSS_SELECTOR, "table tbody tr td.ta_l > a")
-                    a = links[i]
-                    title = a.text.strip()
-                    
-                    if not title:
-                        continue
-                    
-                    row = a.find_element(By.XPATH, "./ancestor::tr")
-                    
-                    try:
-                        created_at = row.find_element(By.CSS_SELECTOR, "td:nth-child(4)").text.strip()
-                        created_at = parse_date(created_at)
-                    except Exception:
-                        created_at = ""
-                    
-                    # 최신 날짜 이후 데이터만 처리
-                    if created_at and created_at <= latest_date:
-                        print(f"이미 처리된 공지사항: {title} ({created_at})")
-                        continue
-                    
-                    print(f"새 공지사항 발견: {title} ({created_at})")
-                    
-                    # 상세 페이지로 이동
-                    a.click()
-                    time.sleep(1)
-                    
-                    detail_url = driver.current_url
-                    content = extract_notice_content(driver)
-                    
-                    driver.back()
-                    time.sleep(1)
-                    
-                    new_notice = {
-                        "title": title,
-                        "url": detail_url,
-                        "content": content,
-                        "created_at": created_at,
-                        "tags": title,
-                        "category": None
-                    }
-                    
-                    new_notices.append(new_notice)
-                    page_has_new = True
-                    
-                except StaleElementReferenceException:
-                    continue
-                except Exception as e:
-                    print(f"공지사항 처리 중 오류: {str(e)}")
-                    continue
-            
-            # 현재 페이지에 새로운 공지사항이 없으면 종료
-            if not page_has_new:
-                print("더 이상 새로운 공지사항이 없습니다.")
-                break
-                
-            page += 1
-        
-        # 새로운 데이터를 DB에 저장
-        if new_notices:
-            save_notices_to_db(new_notices)
+        if checkpoint.listing_done:
+            items = checkpoint.pending_items()
         else:
+            items = collect_new_notice_items(crawler, checkpoint, max_new_notices, max_pages, backfill)
+        if items:
+            print(f"상세 페이지 {len(items)}개 요청 중 (동시 {crawler.concurrency}개)...")
+            batch, done_ids = [], []
+            for item, notice in crawler.fetch_notices(items):
+                done_ids.append(item['ntt_sn'])
+                if notice is not None:
+                    new_notices.append(notice)
+                    batch.append(notice)
+                if len(done_ids) >= batch_size:
+                    flush(batch, done_ids)
+                    batch, done_ids = [], []
+            flush(batch, done_ids)
+        
+        if not new_notices:
             print("새로운 공지사항이 없습니다.")
+        if crawler.error_count:
+            record_crawl_result(get_db().db_path, {'detail_failures': crawler.error_count})
+        checkpoint.complete()
             
     except Exception as e:
-        print(f"크롤링 중 오류 발생: {e}")
-    finally:
-        driver.quit()
+        print(f"크롤링 중 오류 발생: {e} (다음 실행에서 이어서 진행)")
+        record_crawl_result(get_db().db_path, {'failures': 1})
+        saved_ok = False
+    
+    finish_crawl_state(crawler, saved_ok)
+    return new_notices
 
-def get_latest_meal_date():
-    """DB에서 최신 급식 날짜 조회"""
-    try:
-        conn = sqlite3.connect('school_data.db')
-        cursor = conn.cursor()
-        cursor.execute("SELECT MAX(date) FROM meals")
-        latest_date = cursor.fetchone()[0]
-        conn.close()
-        return latest_date
-    except Exception as e:
-        print(f"DB 조회 오류: {e}")
-        return None
+def refresh_notices(ntt_sns, crawler=None):
+    """지정한 번호의 공지만 다시 수집해 저장 (수정된 공지 갱신용)"""
+    crawler = crawler or new_crawler()
+    notices = []
+    for ntt_sn in ntt_sns:
+        try:
+            notice = crawler.fetch_notice_by_id(int(ntt_sn))
+        except requests.RequestException as e:
+            print(f"공지사항 {ntt_sn} 요청 오류: {e}")
+            continue
+        if not notice['title']:
+            print(f"공지사항 {ntt_sn}을(를) 찾을 수 없습니다.")
+            continue
+        print(f"공지사항 갱신: {notice['title']} ({notice['created_at']})")
+        notices.append(notice)
+    if notices:
+        save_notices_to_db(notices)
+    return notices
 
 def save_meals_to_db(meals_data):
-    """급식 데이터를 DB에 저장"""
+    """급식 데이터를 DB에 저장 (날짜+식사 종류 기준 일괄 UPSERT, 실패 시 None)"""
     try:
-        conn = sqlite3.connect('school_data.db')
-        cursor = conn.cursor()
-        
-        # 기존 데이터 확인을 위한 날짜 목록
-        cursor.execute("SELECT date FROM meals")
-        existing_dates = {row[0] for row in cursor.fetchall()}
-        
-        new_count = 0
-        for meal in meals_data:
-            if meal['date'] not in existing_dates:
-                cursor.execute("""
-                    INSERT INTO meals (date, meal_type, menu, image_url)
-                    VALUES (?, ?, ?, ?)
-                """, (meal['date'], meal['meal_type'], meal['menu'], meal['image_url']))
-                new_count += 1
-                print(f"새 급식 추가: {meal['date']}")
-        
-        conn.commit()
-        conn.close()
-        print(f"총 {new_count}개의 새로운 급식 데이터가 저장되었습니다.")
-        return new_count
+        changes = []
+        result = get_db().ingest_meals(meals_data, changes=changes)
+        get_changelog().append('meals', changes)
+        record_crawl_result(get_db().db_path, {
+            'meals_inserted': result['inserted'],
+            'meals_updated': result['updated']
+        })
+        print(f"급식 저장 완료: 신규 {result['inserted']}개, 변경 {result['updated']}개")
+        return result['inserted']
         
     except Exception as e:
         print(f"DB 저장 오류: {e}")
-        return 0
+        record_crawl_result(get_db().db_path, {'failures': 1})
+        return None
 
-def extract_weekday_lunch(driver):
-    """현재 페이지의 월~금 중식 데이터 추출"""
-    results = []
-    try:
-        date_els = driver.find_elements(By.CSS_SELECTOR, 'thead tr th')[1:]
-        dates = [el.text.split('\n')[1] for el in date_els]
-        
-        for i in range(1, 6):
-            menu = ''
-            img_url = ''
-            try:
-                xpath = f'//*[@id="detailForm"]/div/table/tbody/tr[2]/td[{i+1}]/p[4]'
-                menu = driver.find_element(By.XPATH, xpath).text.strip()
-            except Exception:
-                continue
-                
-            try:
-                td_xpath = f'//*[@id="detailForm"]/div/table/tbody/tr[2]/td[{i+1}]'
-                td_html = driver.find_element(By.XPATH, td_xpath).get_attribute('innerHTML')
-                img_match = re.search(r'<img[^>]+src=["\"]([^"\"]+)["\"]', td_html)
-                if img_match:
-                    img_url = img_match.group(1)
-            except Exception:
-                pass
-                
-            if menu:  # 메뉴가 있는 경우만 추가
-                results.append({
-                    'date': dates[i],
-                    'meal_type': '중식',
-                    'menu': menu,
-                    'image_url': img_url
-                })
-    except Exception as e:
-        print(f"데이터 추출 오류: {e}")
-    
-    return results
+def week_start(date_str):
+    """date_str이 속한 주의 일요일 (식단표가 일~토 단위)"""
+    day = datetime.strptime(date_str, '%Y-%m-%d')
+    return (day - timedelta(days=(day.weekday() + 1) % 7)).strftime('%Y-%m-%d')
 
-def crawl_incremental_meals():
-    """증분 업데이트 방식으로 급식 크롤링"""
-    latest_date = get_latest_meal_date()
-    print(f"DB 최신 급식 날짜: {latest_date}")
-    
-    if not latest_date:
-        print("DB에 급식 데이터가 없습니다. 전체 크롤링을 시작합니다.")
-        latest_date = "1900-01-01"  # 모든 데이터를 가져오기 위한 초기 날짜
+def week_starts(date_from, date_to):
+    """기간에 걸친 주의 시작일(일요일) 목록"""
+    week = datetime.strptime(week_start(date_from), '%Y-%m-%d')
+    end = datetime.strptime(date_to, '%Y-%m-%d')
+    weeks = []
+    while week <= end:
+        weeks.append(week.strftime('%Y-%m-%d'))
+        week += timedelta(days=7)
+    return weeks
+
+def crawl_meals_range(date_from, date_to, crawler=None):
+    """기간의 식단을 주 단위로 동시에 요청해 모든 식사 종류를 한 번에 저장
+
+    같은 주는 항상 같은 주소(일요일 날짜)로 요청하므로 지난번과 같은 주는 건너뛴다.
+    """
+    weeks = week_starts(date_from, date_to)
+    print(f"식단 수집 기간: {date_from} ~ {date_to} ({len(weeks)}주)")
     
-    driver = setup_driver()
-    new_meals = []
+    crawler = crawler or new_crawler()
+    meals = []
+    saved_ok = True
     
     try:
-        print("급식 페이지 접속 중...")
-        driver.get('https://pajuwaseok-e.goepj.kr/pajuwaseok-e/ad/fm/foodmenu/selectFoodMenuView.do?mi=8432')
-        time.sleep(2)
-        
-        week_count = 0
-        max_weeks = 10  # 최대 10주까지만 확인 (안전장치)
-        
-        while week_count < max_weeks:
-            print(f"\n=== {week_count + 1}번째 주 확인 중 ===")
-            
-            # 현재 페이지의 급식 데이터 추출
-            week_data = extract_weekday_lunch(driver)
-            
-            if not week_data:
-                print("더 이상 급식 데이터가 없습니다.")
-                break
-            
-            # 최신 날짜 이후 데이터만 필터링
-            filtered_data = []
-            for meal in week_data:
-                if meal['date'] > latest_date:
-                    filtered_data.append(meal)
-                    print(f"새 급식 발견: {meal['date']}")
-            
-            new_meals.extend(filtered_data)
-            
-            # 다음 주로 이동
-            try:
-                prev_btn = driver.find_element(By.CSS_SELECTOR, 'a:has(i.xi-angle-right)')
-                prev_btn.click()
-                time.sleep(1)
-                week_count += 1
-            except NoSuchElementException:
-                print("더 이상 이전 주 버튼이 없습니다.")
-                break
-            except Exception as e:
-                print(f"페이지 이동 오류: {e}")
-                break
+        unchanged = 0
+        for week_date, week_meals in crawler.fetch_meal_weeks(weeks):
+            if week_meals is None:
+                unchanged += 1
+                continue
+            week_meals = [meal for meal in week_meals if date_from <= meal['date'] <= date_to]
+            print(f"{week_date} 주 식단 {len(week_meals)}개")
+            meals.extend(week_meals)
+        if unchanged:
+            print(f"지난 수집 이후 변경 없는 주: {unchanged}개")
         
-        # 새로운 데이터를 DB에 저장
-        if new_meals:
-            save_meals_to_db(new_meals)
+        # 새로운 데이터를 DB에 저장 (이미 있는 급식은 바뀐 경우에만 갱신)
+        if meals:
+            meals.sort(key=lambda meal: (meal['date'], meal['meal_type']))
+            saved_ok = save_meals_to_db(meals) is not None
         else:
             print("새로운 급식 데이터가 없습니다.")
             
     except Exception as e:
         print(f"크롤링 중 오류 발생: {e}")
-    finally:
-        driver.quit()
+        record_crawl_result(get_db().db_path, {'failures': 1})
+        saved_ok = False
+    
+    finish_crawl_state(crawler, saved_ok)
+    return meals
+
+def crawl_incremental_meals(max_weeks=4, crawler=None, start_date=None):
+    """이번 주부터 max_weeks주 동안의 급식 크롤링"""
+    start = start_date or get_kst_now().strftime('%Y-%m-%d')
+    date_from = week_start(start)
+    date_to = (datetime.strptime(date_from, '%Y-%m-%d') + timedelta(days=7 * max_weeks - 1)).strftime('%Y-%m-%d')
+    return crawl_meals_range(date_from, date_to, crawler)
 
-def main():
-    """공지사항 크롤링 후 급식 크롤링 실행"""
+def run_crawl(progress=None, crawler=None):
+    """공지사항 크롤링 후 급식 크롤링 실행 (다른 모듈에서 호출하는 작업 API)
+
+    progress(stage, **info)가 주어지면 단계별 진행 상황을 알리고, 결과 요약 dict를 반환한다.
+    두 단계가 같은 크롤러를 쓰므로 요청 속도 조절과 전체 제한 시간(CRAWL_DEADLINE_SECONDS)이 함께 적용된다.
+    """
+    progress = progress or (lambda stage, **info: None)
+    started = datetime.now(timezone.utc)
+    record_crawl_result(get_db().db_path, {'runs': 1})
+    changelog = start_changelog()
+    crawler = crawler or new_crawler()
+    
+    progress('notices')
     print("🚀 공지사항 크롤링 시작...")
-    crawl_incremental_notices()
+    notices = crawl_incremental_notices(crawler=crawler)
     
+    progress('meals', notices=len(notices))
     print("\n" + "="*50)
     print("🍽️  급식 크롤링 시작...")
     print("="*50)
-    crawl_incremental_meals()
+    meals = crawl_incremental_meals(crawler=crawler)
     
+    scheduler_stats = crawler.scheduler.stats()
+    record_crawl_result(get_db().db_path, {'retries': scheduler_stats['retries']})
+    result = {
+        'notices': len(notices),
+        'meals': len(meals),
+        'requests': crawler.request_count,
+        'retries': scheduler_stats['retries'],
+        'rates': scheduler_stats['rates'],
+        'changes': changelog.records,
+        'changelog': changelog.path if changelog.records else None,
+        'elapsed_seconds': round((datetime.now(timezone.utc) - started).total_seconds(), 2),
+    }
+    progress('done', **result)
     print("\n🎉 모든 크롤링 완료!")
+    return result
+
+def main(argv=None):
+    """명령행 실행
+
+    기본: 공지사항 증분 크롤링 후 급식 크롤링
+    --backfill [--pages N --limit N]: 목록 N페이지까지 빠진 공지를 모두 수집
+    --id NTTSN [NTTSN ...]: 지정한 공지만 다시 수집
+    --from YYYY-MM-DD --to YYYY-MM-DD: 기간의 급식만 수집
+    """
+    parser = argparse.ArgumentParser(description="와석초 공지사항/급식 크롤러")
+    parser.add_argument('--backfill', action='store_true', help="저장된 공지를 만나도 멈추지 않고 끝까지 수집")
+    parser.add_argument('--pages', type=int, default=100, help="백필 시 확인할 최대 목록 페이지 수")
+    parser.add_argument('--limit', type=int, default=2000, help="백필 시 수집할 최대 공지 수")
+    parser.add_argument('--id', dest='ids', type=int, nargs='+', help="다시 수집할 공지 번호(nttSn)")
+    parser.add_argument('--from', dest='date_from', help="급식 수집 시작일 (YYYY-MM-DD)")
+    parser.add_argument('--to', dest='date_to', help="급식 수집 종료일 (YYYY-MM-DD, 기본: 시작일 기준 4주)")
+    args = parser.parse_args(argv)
+    
+    start_changelog()
+    if args.date_from:
+        date_to = args.date_to or (datetime.strptime(args.date_from, '%Y-%m-%d') + timedelta(days=27)).strftime('%Y-%m-%d')
+        meals = crawl_meals_range(args.date_from, date_to)
+        print(f"\n🎉 급식 수집 완료: {len(meals)}개")
+    elif args.ids:
+        refresh_notices(args.ids)
+    elif args.backfill:
+        notices = crawl_incremental_notices(max_new_notices=args.limit, max_pages=args.pages, backfill=True)
+        print(f"\n🎉 백필 완료: {len(notices)}개")
+    else:
+        run_crawl()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from config import (
+    LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_SIMILARITY, DATA_VERSION_POLL_SECONDS
+)
+from data_version import get_data_versions
+from qa_artifact import ARTIFACT_PATH, DATASET_PATH
+from qa_index import char_ngrams, normalize_question
+
+# 이보다 짧은 질문은 글자 몇 개 차이로 뜻이 달라지므로 정확히 같을 때만 사용
+MIN_NEAR_DUPLICATE_LENGTH = 10
+
+_DIGITS = re.compile(r'\d+')
+
+
+def dataset_version(db_path: str) -> str:
+    """답변 근거 데이터(급식/공지/QA 파일)의 버전 해시 (하나라도 바뀌면 달라짐)"""
+    versions = get_data_versions(db_path)
+    for path in (DATASET_PATH, ARTIFACT_PATH):
+        versions[f"file:{path}"] = os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+    return hashlib.sha1(json.dumps(versions, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+class _Entry:
+    __slots__ = ("answer", "grams", "created_at", "last_hit_at", "tokens")
+
+    def __init__(self, answer: str, grams: Set[str], created_at: float, last_hit_at: float, tokens: int):
+        self.answer = answer
+        self.grams = grams
+        self.created_at = created_at
+        self.last_hit_at = last_hit_at
+        self.tokens = tokens
+
+
+class LLMCache:
+    """OpenAI 답변 캐시 (정규화 질문 + 데이터 버전 기준, SQLite에 보관)
+
+    현재 데이터 버전의 항목은 메모리에도 올려 두고 문자 n-gram 역색인으로
+    표현만 조금 다른 질문(Dice 유사도 ≥ similarity)도 찾는다. 조회는 메모리에서만
+    처리하고, 적중 시각은 모아 두었다가 다음 저장 때 함께 기록한다.
+    """
+
+    def __init__(self, db_path: str, version_func: Optional[Callable[[], str]] = None,
+                 ttl_seconds: float = LLM_CACHE_TTL_SECONDS, max_entries: int = LLM_CACHE_MAX_ENTRIES,
+                 similarity: float = LLM_CACHE_SIMILARITY, version_ttl: float = DATA_VERSION_POLL_SECONDS):
+        self.db_path = db_path
+        self.version_func = version_func or (lambda: dataset_version(db_path))
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self.version_ttl = version_ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._dirty_hits: Dict[str, float] = {}
+        self._version: Optional[str] = None
+        self._version_checked = 0.0
+        self.counts = {"hits": 0, "near_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "tokens_saved": 0}
+
+    def _current_version(self) -> str:
+        """데이터 버전 (최대 version_ttl초마다 확인, 바뀌면 그 버전의 항목을 다시 적재)"""
+        now = time.monotonic()
+        if self._version is not None and now < self._version_checked + self.version_ttl:
+            return self._version
+        version = self.version_func()
+        self._version_checked = now
+        if version != self._version:
+            self._load(version)
+        return version
+
+    def _load(self, version: str):
+        self._flush_hits()
+        self._version = version
+        self._entries, self._postings = {}, {}
+        cutoff = time.time() - self.ttl_seconds
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                # 이전 데이터 버전의 답변은 다시 쓰이지 않으므로 정리
+                removed = conn.execute("DELETE FROM llm_cache WHERE dataset_version != ? OR created_at < ?",
+                                       (version, cutoff)).rowcount
+            rows = conn.execute("""
+                SELECT question_key, answer, created_at, last_hit_at, tokens FROM llm_cache
+                WHERE dataset_version = ? ORDER BY last_hit_at DESC LIMIT ?
+            """, (version, self.max_entries)).fetchall()
+        finally:
+            conn.close()
+        for key, answer, created_at, last_hit_at, tokens in rows:
+            self._add(key, _Entry(answer, set(char_ngrams(key)), created_at, last_hit_at, tokens))
+        self.counts["evictions"] += max(removed, 0)
+
+    def _add(self, key: str, entry: _Entry):
+        self._entries[key] = entry
+        for gram in entry.grams:
+            self._postings.setdefault(gram, set()).add(key)
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for gram in entry.grams:
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+        self._dirty_hits.pop(key, None)
+
+    def _find_similar(self, key: str) -> Optional[str]:
+        grams = set(char_ngrams(key))
+        if len(key) < MIN_NEAR_DUPLICATE_LENGTH or not grams:
+            return None
+        overlap: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self._postings.get(gram, ()):
+                overlap[candidate] = overlap.get(candidate, 0) + 1
+        # "1학년"/"2학년", "3반"/"4반"처럼 숫자만 다른 질문은 유사도가 높아도 답이 다르므로
+        # 숫자가 모두 같은 질문만 후보로 봄
+        digits = _DIGITS.findall(key)
+        best_key, best_score = None, 0.0
+        for candidate, shared in overlap.items():
+            if _DIGITS.findall(candidate) != digits:
+                continue
+            score = 2 * shared / (len(grams) + len(self._entries[candidate].grams))
+            if score > best_score:
+                best_key, best_score = candidate, score
+        return best_key if best_score >= self.similarity else None
+
+    def get(self, question: str) -> Optional[str]:
+        """캐시된 답변 (같은 질문 → 비슷한 질문 순으로 확인, 없거나 만료되면 None)"""
+        key = normalize_question(question)
+        if not key:
+            return None
+        with self._lock:
+            self._current_version()
+            now = time.time()
+            found = key if key in self._entries else self._find_similar(key)
+            entry = self._entries.get(found) if found else None
+            if entry is not None and entry.created_at < now - self.ttl_seconds:
+                self._remove(found)
+                self.counts["evictions"] += 1
+                entry = None
+            if entry is None:
+                self.counts["misses"] += 1
+                return None
+            self.counts["hits" if found == key else "near_hits"] += 1
+            self.counts["tokens_saved"] += entry.tokens
+            entry.last_hit_at = now
+            self._dirty_hits[found] = now
+            return entry.answer
+
+    def put(self, question: str, answer: str, tokens: int = 0):
+        """답변 저장 (항목 수가 max_entries를 넘으면 가장 오래 안 쓰인 것부터 제거)"""
+        key = normalize_question(question)
+        if not key or not answer:
+            return
+        with self._lock:
+            version = self._current_version()
+            now = time.time()
+            self._remove(key)
+            self._add(key, _Entry(answer, set(char_ngrams(key)), now, now, tokens))
+            overflow = []
+            if len(self._entries) > self.max_entries:
+                by_last_hit = sorted(self._entries, key=lambda k: self._entries[k].last_hit_at)
+                overflow = by_last_hit[:len(self._entries) - self.max_entries]
+            for old_key in overflow:
+                self._remove(old_key)
+            self.counts["stores"] += 1
+            self.counts["evictions"] += len(overflow)
+            hits = self._take_hits()
+
+        # 조회가 디스크 쓰기를 기다리지 않도록 메모리 갱신 후 잠금 밖에서 저장
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                conn.execute("""
+                    INSERT INTO llm_cache (question_key, dataset_version, question, answer, tokens, created_at, last_hit_at, hits)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+                    ON CONFLICT(question_key, dataset_version) DO UPDATE SET
+                        question = excluded.question, answer = excluded.answer, tokens = excluded.tokens,
+                        created_at = excluded.created_at, last_hit_at = excluded.last_hit_at
+                """, (key, version, question, answer, tokens, now, now))
+                conn.executemany("DELETE FROM llm_cache WHERE question_key = ? AND dataset_version = ?",
+                                 [(old_key, version) for old_key in overflow])
+                self._write_hits(conn, hits)
+        finally:
+            conn.close()
+
+    def _take_hits(self) -> List[Tuple[float, str, str]]:
+        """모아 둔 적중 시각을 꺼냄 (잠금 안에서 호출)"""
+        if not self._dirty_hits or self._version is None:
+            return []
+        rows = [(hit_at, key, self._version) for key, hit_at in self._dirty_hits.items()]
+        self._dirty_hits = {}
+        return rows
+
+    @staticmethod
+    def _write_hits(conn: sqlite3.Connection, rows: List[Tuple[float, str, str]]):
+        """적중 시각/횟수 기록 (LRU 정리와 재시작 후 적재 순서에 사용)"""
+        if rows:
+            conn.executemany("UPDATE llm_cache SET last_hit_at = ?, hits = hits + 1 "
+                             "WHERE question_key = ? AND dataset_version = ?", rows)
+
+    def _flush_hits(self):
+        """모아 둔 적중 시각 바로 기록 (데이터 버전이 바뀌기 전에 호출)"""
+        rows = self._take_hits()
+        if not rows:
+            return
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                self._write_hits(conn, rows)
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict:
+        """적중/미적중/절약 토큰 등 카운터"""
+        with self._lock:
+            lookups = self.counts["hits"] + self.counts["near_hits"] + self.counts["misses"]
+            hit_rate = (self.counts["hits"] + self.counts["near_hits"]) / lookups if lookups else 0.0
+            return dict(self.counts, entries=len(self._entries), hit_rate=round(hit_rate, 3),
+                        dataset_version=self._version)
+
+
+_caches: Dict[str, LLMCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_llm_cache(db_path: str = "school_data.db") -> LLMCache:
+    """DB 파일별 공유 답변 캐시 반환"""
+    with _caches_lock:
+        cache = _caches.get(db_path)
+        if cache is None:
+            cache = LLMCache(db_path)
+            _caches[db_path] = cache
+        return cache
@@ -0,0 +1,238 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Tuple
+
+from openai import APITimeoutError, AsyncOpenAI
+
+from config import (
+    OPENAI_API_KEY, OPENAI_MODEL, OPENAI_BASE_URL,
+    LLM_MAX_CONCURRENCY, LLM_TIMEOUT, LLM_QUEUE_TIMEOUT, LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_SECONDS
+)
+from llm_stream import StreamCollector, chunk_text
+
+# 최근 응답 시간 통계에 쓰는 표본 수
+LATENCY_SAMPLES = 200
+
+
+class LLMUnavailable(Exception):
+    """OpenAI를 호출하지 않고 바로 실패 (차단기 열림 / 동시 요청 초과) → 로컬 기본 답변 사용"""
+
+
+class CircuitBreaker:
+    """연속 실패가 failure_threshold번이면 reset_seconds 동안 호출을 막음 (closed → open → half_open)
+
+    open 시간이 지나면 한 번만 시험 호출을 허용하고, 성공하면 닫히고 실패하면 다시 열린다.
+    """
+
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES,
+                 reset_seconds: float = LLM_BREAKER_RESET_SECONDS):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.open_count = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def release_trial(self):
+        """시험 호출이 OpenAI까지 가지 못했을 때 (다음 요청이 다시 시험할 수 있게)"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.open_count += 1
+                    print(f"⚠️ OpenAI 차단기 열림: 연속 실패 {self.failures}회, {self.reset_seconds:.0f}초 동안 기본 답변 사용")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class LLMGateway:
+    """OpenAI 호출 전용 게이트웨이
+
+    전용 스레드의 이벤트 루프에서 AsyncOpenAI 클라이언트 하나를 공유해 연결을 재사용하고,
+    세마포어로 동시 호출 수를 제한한다. 웹 요청 스레드는 complete()로 결과를 기다리며,
+    차단기가 열려 있거나 대기열이 가득 차면 OpenAI를 기다리지 않고 바로 LLMUnavailable을 받는다.
+    """
+
+    def __init__(self, client_factory: Optional[Callable] = None, max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 timeout: float = LLM_TIMEOUT, queue_timeout: float = LLM_QUEUE_TIMEOUT,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.client_factory = client_factory or self._default_client
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-gateway", daemon=True)
+        self._thread.start()
+        self._client = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.in_flight = 0
+        self.counts = {"calls": 0, "succeeded": 0, "failed": 0, "timeouts": 0,
+                       "rejected_open": 0, "rejected_busy": 0, "deadline_cuts": 0}
+
+    @staticmethod
+    def _default_client():
+        # 재시도는 차단기가 판단하므로 클라이언트 자체 재시도는 끔
+        # 로컬 재현 서버(OPENAI_BASE_URL)는 API 키를 확인하지 않으므로 키가 없어도 동작
+        api_key = OPENAI_API_KEY or ("local-stub" if OPENAI_BASE_URL else None)
+        return AsyncOpenAI(api_key=api_key, base_url=OPENAI_BASE_URL, max_retries=0)
+
+    def _count(self, key: str):
+        with self._lock:
+            self.counts[key] += 1
+
+    async def _stream_completion(self, messages: List[Dict], params: Dict) -> Tuple[str, str]:
+        # 대기열 대기부터 스트리밍까지 전체 제한 시간 (넘으면 받은 데까지 사용)
+        collector = StreamCollector(time_budget=self.timeout)
+        if self._client is None:
+            # 클라이언트/세마포어는 게이트웨이 루프에서 만들어야 같은 루프에 묶임
+            self._client = self.client_factory()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise LLMUnavailable("OpenAI 동시 요청 한도 초과") from None
+        with self._lock:
+            self.in_flight += 1
+        try:
+            stream = await asyncio.wait_for(self._client.chat.completions.create(
+                model=OPENAI_MODEL, messages=messages, stream=True, **params
+            ), collector.remaining())
+            try:
+                chunks = stream.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), collector.remaining())
+                    except StopAsyncIteration:
+                        return collector.finish()
+                    except asyncio.TimeoutError:
+                        # 느리게라도 받은 내용이 있으면 버리지 않고 사용 (없으면 실패로 처리)
+                        result = collector.expire()
+                        if result is None:
+                            raise
+                        return result
+                    result = collector.feed(chunk_text(chunk))
+                    if result is not None:
+                        return result
+            finally:
+                # 필요한 만큼 받았으면 남은 생성은 받지 않도록 연결 종료
+                await stream.close()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._semaphore.release()
+
+    def complete(self, messages: List[Dict], **params) -> Tuple[str, str]:
+        """스트리밍 답변 (답변, 멈춘 이유) 반환 (실패 시 예외 → 호출한 쪽에서 기본 답변 사용)"""
+        self._count("calls")
+        if not self.breaker.allow():
+            self._count("rejected_open")
+            raise LLMUnavailable("OpenAI 차단기 열림")
+
+        started = time.monotonic()
+        future = asyncio.run_coroutine_threadsafe(self._stream_completion(messages, params), self._loop)
+        try:
+            # 게이트웨이 쪽 제한 시간이 먼저 걸리므로 여기서는 여유를 둠
+            result = future.result(self.timeout + self.queue_timeout + 1)
+        except LLMUnavailable:
+            self._count("rejected_busy")
+            self.breaker.release_trial()
+            raise
+        except (asyncio.TimeoutError, FutureTimeoutError, APITimeoutError):
+            future.cancel()
+            self._count("timeouts")
+            self._count("failed")
+            self.breaker.record_failure()
+            raise
+        except Exception:
+            self._count("failed")
+            self.breaker.record_failure()
+            raise
+
+        self.breaker.record_success()
+        self._count("succeeded")
+        if result[1] == "deadline":
+            self._count("deadline_cuts")
+        with self._lock:
+            self._latencies.append(time.monotonic() - started)
+        return result
+
+    def stats(self) -> Dict:
+        """호출 수/실패/차단 횟수, 차단기 상태, 최근 응답 시간"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = dict(self.counts, in_flight=self.in_flight)
+        stats.update({
+            "breaker_state": self.breaker.state,
+            "breaker_opened": self.breaker.open_count,
+            "latency_avg_ms": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+            "latency_p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1)
+            if latencies else None,
+        })
+        return stats
+
+    async def _shutdown(self):
+        # 진행 중인 호출을 취소하고 스트림 제너레이터까지 정리해야 루프 종료 시 경고가 남지 않음
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._client is not None and hasattr(self._client, "close"):
+            try:
+                await self._client.close()
+            except Exception as e:
+                print(f"OpenAI 클라이언트 종료 오류: {e}")
+        await self._loop.shutdown_asyncgens()
+
+    def close(self):
+        """진행 중인 호출 취소, 클라이언트 연결 정리 후 루프/스레드 종료"""
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(5)
+        except Exception as e:
+            print(f"OpenAI 게이트웨이 종료 오류: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+        if not self._thread.is_alive():
+            self._loop.close()
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """프로세스 공유 게이트웨이 (처음 사용할 때 생성)"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
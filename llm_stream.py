@@ -0,0 +1,81 @@
+import re
+import time
+from typing import Optional, Tuple
+
+from config import LLM_STREAM_MIN_CHARS
+
+# 카카오톡 텍스트 말풍선 최대 글자 수
+KAKAO_TEXT_LIMIT = 1000
+
+# 문장 끝: 마침표/물음표/느낌표 뒤에 공백이 오거나 줄바꿈 (소수점 "3.5" 등은 제외)
+_SENTENCE_END = re.compile(r'[.!?。！？](?=\s)|\n')
+
+
+def chunk_text(chunk) -> str:
+    """OpenAI 스트리밍 조각의 텍스트 (없으면 빈 문자열)"""
+    if not chunk.choices:
+        return ''
+    return chunk.choices[0].delta.content or ''
+
+
+def _last_sentence_end(text: str, start: int = 0) -> int:
+    """start 이후 마지막 문장 끝 위치 (없으면 -1)"""
+    end = -1
+    for match in _SENTENCE_END.finditer(text, max(start, 0)):
+        end = match.end()
+    return end
+
+
+class StreamCollector:
+    """스트리밍 조각을 모으다가 필요한 만큼 받으면 멈출 시점을 알려 줌
+
+    - min_chars 이상 모인 뒤 문장이 끝나면 그 문장까지 사용 ('sentence')
+    - max_chars에 닿으면 그 안의 마지막 문장까지, 문장 끝이 없으면 잘라서 사용 ('limit')
+    - 그 전에 응답이 끝나면 전체 사용 ('complete')
+    - time_budget초가 지나면 받은 데까지 마지막 문장 끝에서 잘라 사용 ('deadline')
+    """
+
+    def __init__(self, max_chars: int = KAKAO_TEXT_LIMIT, min_chars: int = LLM_STREAM_MIN_CHARS,
+                 time_budget: Optional[float] = None):
+        self.max_chars = max_chars
+        self.min_chars = min_chars
+        self.deadline = time.monotonic() + time_budget if time_budget is not None else None
+        self.text = ''
+
+    def remaining(self) -> Optional[float]:
+        """남은 시간 (초, 제한이 없으면 None)"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def feed(self, delta: str) -> Optional[Tuple[str, str]]:
+        """조각 추가 (멈춰야 하면 (답변, 멈춘 이유), 계속 받아야 하면 None)"""
+        text = self.text
+        # 앞 조각 끝의 문장 부호가 이번 조각의 공백과 만나 문장 끝이 될 수 있으므로 한 글자 앞부터 확인
+        checked = max(len(text) - 1, 0)
+        text = self.text = text + delta
+        if len(text) >= self.max_chars:
+            end = _last_sentence_end(text[:self.max_chars])
+            if end > 0:
+                return text[:end].strip(), 'limit'
+            return text[:self.max_chars - 3].rstrip() + '...', 'limit'
+        if len(text) >= self.min_chars:
+            end = _last_sentence_end(text, max(checked, self.min_chars - 1))
+            if end > 0:
+                return text[:end].strip(), 'sentence'
+        return None
+
+    def expire(self) -> Optional[Tuple[str, str]]:
+        """시간이 다 됨: 받은 내용을 마지막 문장 끝까지 사용 (받은 내용이 없으면 None)"""
+        text = self.text[:self.max_chars]
+        if not text.strip():
+            return None
+        end = _last_sentence_end(text)
+        if end > 0:
+            return text[:end].strip(), 'deadline'
+        return text.rstrip() + '...', 'deadline'
+
+    def finish(self) -> Tuple[str, str]:
+        """응답이 끝까지 온 경우"""
+        return self.text.strip(), 'complete'
+
@@ -0,0 +1,252 @@
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_ANSWER = ("와석초등학교 안내입니다. 자세한 내용은 학교 홈페이지 공지사항을 확인해 주세요. "
+                  "추가로 궁금한 점은 교무실로 문의해 주시기 바랍니다.")
+
+
+class LatencyModel:
+    """응답 지연 분포 (ms)
+
+    "fixed:200", "uniform:100,300", "normal:200,50", "exp:150" 형식으로 지정한다.
+    """
+
+    def __init__(self, spec: str = "fixed:0"):
+        kind, _, args = (spec or "fixed:0").partition(":")
+        self.kind = kind
+        self.args = [float(value) for value in args.split(",") if value] or [0.0]
+        if kind not in ("fixed", "uniform", "normal", "exp"):
+            raise ValueError(f"알 수 없는 지연 분포: {spec}")
+        self.spec = spec
+
+    def sample(self, rng: random.Random) -> float:
+        """지연 시간 하나 (초)"""
+        if self.kind == "uniform":
+            value = rng.uniform(self.args[0], self.args[-1])
+        elif self.kind == "normal":
+            value = rng.gauss(self.args[0], self.args[1] if len(self.args) > 1 else 0.0)
+        elif self.kind == "exp":
+            value = rng.expovariate(1.0 / self.args[0]) if self.args[0] > 0 else 0.0
+        else:
+            value = self.args[0]
+        return max(0.0, value) / 1000.0
+
+
+class StubServer(ThreadingHTTPServer):
+    """OpenAI 호환 chat.completions 재현 서버 (지연/오류/응답 없음 주입)
+
+    mode='canned'이면 answers의 키워드가 질문에 있으면 그 답을, 없으면 기본 답변을 돌려주고,
+    mode='echo'이면 마지막 사용자 메시지를 그대로 돌려준다.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], latency: str = "fixed:0", chunk_delay_ms: float = 0,
+                 chunk_chars: int = 8, error_rate: float = 0.0, error_status: int = 503,
+                 timeout_rate: float = 0.0, hang_seconds: float = 30.0, mode: str = "canned",
+                 answers: Optional[Dict[str, str]] = None, default_answer: str = DEFAULT_ANSWER,
+                 seed: Optional[int] = None):
+        super().__init__(address, StubHandler)
+        self.latency = LatencyModel(latency)
+        self.chunk_delay_ms = chunk_delay_ms
+        self.chunk_chars = max(1, chunk_chars)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.mode = mode
+        self.answers = answers or {}
+        self.default_answer = default_answer
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.counts = {"requests": 0, "streamed": 0, "errors_injected": 0, "timeouts_injected": 0,
+                       "client_closed": 0, "completion_chars": 0}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def count(self, key: str, value: int = 1):
+        with self.lock:
+            self.counts[key] += value
+
+    def draw(self) -> Tuple[float, bool, bool]:
+        """이번 요청의 (지연, 오류 여부, 응답 없음 여부) - seed가 같으면 같은 순서"""
+        with self.lock:
+            delay = self.latency.sample(self.random)
+            roll = self.random.random()
+        return delay, roll < self.error_rate, self.error_rate <= roll < self.error_rate + self.timeout_rate
+
+    def answer_for(self, messages: List[Dict]) -> str:
+        question = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+        if self.mode == "echo":
+            return question
+        for keyword, answer in self.answers.items():
+            if keyword in question:
+                return answer
+        return self.default_answer
+
+    def start(self) -> threading.Thread:
+        """백그라운드 스레드에서 실행"""
+        thread = threading.Thread(target=self.serve_forever, name="openai-stub", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        """응답 없음 주입으로 멈춰 있는 요청도 풀고 종료"""
+        self.stopping.set()
+        self.shutdown()
+        self.server_close()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server: StubServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "stub-model", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        server.count("requests")
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "invalid json", "type": "invalid_request_error"}})
+            return
+
+        delay, inject_error, inject_timeout = server.draw()
+        if inject_timeout:
+            # 응답하지 않고 붙잡고 있어 클라이언트 제한 시간을 시험
+            server.count("timeouts_injected")
+            server.stopping.wait(server.hang_seconds)
+            self.close_connection = True
+            return
+        if delay:
+            time.sleep(delay)
+        if inject_error:
+            server.count("errors_injected")
+            self._send_json(server.error_status, {"error": {"message": "injected error", "type": "server_error"}})
+            return
+
+        answer = server.answer_for(payload.get("messages") or [])
+        max_tokens = payload.get("max_tokens")
+        if max_tokens:
+            # 한글 기준 대략 1글자 = 1토큰으로 잘라 finish_reason=length 재현
+            answer = answer[:int(max_tokens)]
+        model = payload.get("model") or "stub-model"
+        if payload.get("stream"):
+            self._stream(answer, model)
+        else:
+            server.count("completion_chars", len(answer))
+            self._send_json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": answer},
+                             "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(answer), "total_tokens": len(answer)},
+            })
+
+    def _stream(self, answer: str, model: str):
+        server = self.server
+        server.count("streamed")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        pieces = [answer[i:i + server.chunk_chars] for i in range(0, len(answer), server.chunk_chars)]
+        try:
+            self._event(completion_id, model, {"role": "assistant", "content": ""})
+            for piece in pieces:
+                if server.chunk_delay_ms:
+                    time.sleep(server.chunk_delay_ms / 1000.0)
+                self._event(completion_id, model, {"content": piece})
+                server.count("completion_chars", len(piece))
+            self._event(completion_id, model, {}, finish_reason="stop")
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 필요한 만큼 받고 스트림을 닫은 경우
+            server.count("client_closed")
+
+    def _event(self, completion_id: str, model: str, delta: Dict, finish_reason: Optional[str] = None):
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        self.wfile.write(b"data: " + json.dumps(chunk, ensure_ascii=False).encode("utf-8") + b"\n\n")
+        self.wfile.flush()
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 벤치마크 출력이 묻히지 않도록 요청 로그는 생략
+        pass
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, **options) -> StubServer:
+    """재현 서버를 백그라운드로 시작 (port=0이면 빈 포트 자동 선택)"""
+    server = StubServer((host, port), **options)
+    server.start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI 호환 재현 서버 (OPENAI_BASE_URL로 지정해 테스트/벤치마크)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", default="fixed:0", help="첫 응답 지연 분포 (fixed:ms, uniform:lo,hi, normal:mean,sd, exp:mean)")
+    parser.add_argument("--chunk-delay-ms", type=float, default=0, help="스트리밍 조각 사이 지연 (ms)")
+    parser.add_argument("--chunk-chars", type=int, default=8, help="스트리밍 조각 크기 (글자)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="오류로 응답할 비율 (0~1)")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="응답하지 않을 비율 (0~1)")
+    parser.add_argument("--hang-seconds", type=float, default=30.0)
+    parser.add_argument("--mode", choices=("canned", "echo"), default="canned")
+    parser.add_argument("--answers", help="키워드 → 답변 JSON 파일")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    answers = None
+    if args.answers:
+        with open(args.answers, "r", encoding="utf-8") as f:
+            answers = json.load(f)
+    server = StubServer((args.host, args.port), latency=args.latency, chunk_delay_ms=args.chunk_delay_ms,
+                        chunk_chars=args.chunk_chars, error_rate=args.error_rate, error_status=args.error_status,
+                        timeout_rate=args.timeout_rate, hang_seconds=args.hang_seconds, mode=args.mode,
+                        answers=answers, seed=args.seed)
+    print(f"OpenAI 재현 서버 시작: {server.base_url} (OPENAI_BASE_URL로 지정)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
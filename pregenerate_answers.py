@@ -0,0 +1,282 @@
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from ai_logic import AILogic, RELATIVE_DATE_WORDS
+from config import TEMPERATURE, MAX_TOKENS, TOP_P
+from llm_gateway import get_llm_gateway
+from qa_artifact import ARTIFACT_PATH, DATASET_PATH, build_artifact
+from qa_index import QAIndex, normalize_question
+from retention import rollup_conversations
+
+REVIEW_PATH = 'unmatched_review.json'
+
+# 같은 묶음으로 볼 최소 유사도 (QA 색인과 같은 n-gram 코사인 유사도)
+CLUSTER_SIMILARITY = 0.6
+# 검토 파일에 남길 표현 수 (묶음별, 많이 나온 순)
+MAX_VARIANTS = 10
+# 기존 QA 중 가장 비슷한 질문의 분류를 제안할 최소 유사도
+CATEGORY_MIN_SCORE = 0.3
+DEFAULT_CATEGORY = '미분류'
+
+
+def load_unmatched(db_path: str = "school_data.db", days: int = 90) -> List[Tuple[str, int]]:
+    """최근 days일 동안 QA 매칭에 실패한 질문과 횟수 (많은 순)
+
+    일별 집계(daily_stats)를 읽으므로 보관 기간이 지나 아카이브된 대화도 포함된다.
+    """
+    rollup_conversations(db_path)
+    since = (datetime.now(timezone(timedelta(hours=9))) - timedelta(days=days)).strftime("%Y-%m-%d")
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        rows = conn.execute("""
+            SELECT key, SUM(count) FROM daily_stats
+            WHERE metric = 'unmatched' AND day >= ?
+            GROUP BY key ORDER BY 2 DESC
+        """, (since,)).fetchall()
+    finally:
+        conn.close()
+    return [(message, count) for message, count in rows if message and message.strip()]
+
+
+def cluster_utterances(utterances: List[Tuple[str, int]],
+                       similarity: float = CLUSTER_SIMILARITY) -> List[Dict]:
+    """비슷한 질문끼리 묶어 전체 횟수 순으로 정렬
+
+    정규화 결과가 같은 질문을 먼저 합치고, 많이 나온 질문부터 차례로
+    아직 묶이지 않은 비슷한 질문(유사도 ≥ similarity)을 같은 묶음에 넣는다.
+    """
+    groups: Dict[str, Dict] = {}
+    for message, count in utterances:
+        key = normalize_question(message)
+        if not key:
+            continue
+        group = groups.setdefault(key, {"variants": {}, "count": 0})
+        group["variants"][message.strip()] = group["variants"].get(message.strip(), 0) + count
+        group["count"] += count
+    if not groups:
+        return []
+
+    keys = sorted(groups, key=lambda k: groups[k]["count"], reverse=True)
+    # 대표 표현: 정규화 결과가 같은 표현 중 가장 많이 나온 것
+    texts = [max(groups[k]["variants"].items(), key=lambda item: item[1])[0] for k in keys]
+    index = QAIndex.build(texts)
+
+    assigned = [False] * len(keys)
+    clusters = []
+    for i, key in enumerate(keys):
+        if assigned[i]:
+            continue
+        assigned[i] = True
+        members = [i]
+        for j, _score in index.search(texts[i], k=len(keys), min_score=similarity):
+            if not assigned[j]:
+                assigned[j] = True
+                members.append(j)
+
+        variants: Dict[str, int] = {}
+        for j in members:
+            for text, count in groups[keys[j]]["variants"].items():
+                variants[text] = variants.get(text, 0) + count
+        clusters.append({
+            "question": texts[i],
+            "count": sum(groups[keys[j]]["count"] for j in members),
+            "variants": sorted(variants.items(), key=lambda item: item[1], reverse=True),
+        })
+
+    clusters.sort(key=lambda cluster: cluster["count"], reverse=True)
+    return clusters
+
+
+def _last_llm_answer(db_path: str, questions: List[str]) -> Optional[str]:
+    """묶음의 질문에 실제로 나갔던 가장 최근 OpenAI 답변 (초안으로 사용)"""
+    if not questions:
+        return None
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        row = conn.execute(f"""
+            SELECT response FROM conversation_history
+            WHERE intent IN ('openai', 'openai_cache', 'openai_shared') AND message IN ({','.join('?' * len(questions))})
+            ORDER BY id DESC LIMIT 1
+        """, questions).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+def build_review(db_path: str = "school_data.db", days: int = 90, min_count: int = 2, limit: int = 50,
+                 similarity: float = CLUSTER_SIMILARITY, qa_data: Optional[List[Dict]] = None) -> Dict:
+    """자주 놓친 질문 묶음으로 검토용 QA 초안 목록 생성
+
+    이미 QA에 같은 질문이 있으면 제외하고, 가장 비슷한 기존 QA의 분류를 제안한다.
+    """
+    if qa_data is None:
+        with open(DATASET_PATH, 'r', encoding='utf-8') as f:
+            qa_data = json.load(f)
+    qa_index = QAIndex.build([qa['question'] for qa in qa_data])
+
+    utterances = load_unmatched(db_path, days)
+    clusters = cluster_utterances(
+        [(message, count) for message, count in utterances if qa_index.find_exact(message) is None],
+        similarity
+    )
+
+    entries = []
+    for cluster in clusters:
+        if cluster["count"] < min_count or len(entries) >= limit:
+            break
+        variants = cluster["variants"][:MAX_VARIANTS]
+        # 날짜에 따라 답이 달라지는 질문은 고정 답변으로 만들지 않도록 표시
+        time_sensitive = any(word in text for text, _count in variants for word in RELATIVE_DATE_WORDS)
+        nearest = qa_index.search(cluster["question"], k=1)
+        category = DEFAULT_CATEGORY
+        similar_qa = None
+        if nearest:
+            qa, score = qa_data[nearest[0][0]], nearest[0][1]
+            similar_qa = {"question": qa["question"], "score": round(score, 3)}
+            if score >= CATEGORY_MIN_SCORE:
+                category = qa.get("category", DEFAULT_CATEGORY)
+
+        answer = None if time_sensitive else _last_llm_answer(db_path, [text for text, _count in variants])
+        entries.append({
+            "id": len(entries) + 1,
+            "approved": False,
+            "question": cluster["question"],
+            "answer": answer or "",
+            "answer_source": "history" if answer else "",
+            "category": category,
+            "count": cluster["count"],
+            "time_sensitive": time_sensitive,
+            "similar_qa": similar_qa,
+            "variants": [{"text": text, "count": count} for text, count in variants
+                         if text != cluster["question"]],
+        })
+
+    return {
+        "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "days": days,
+        "unmatched_questions": len(utterances),
+        "unmatched_total": sum(count for _message, count in utterances),
+        "entries": entries,
+    }
+
+
+def draft_answers(review: Dict, ai=None, gateway=None, overwrite: bool = False) -> Dict[str, int]:
+    """답변이 없는 항목의 초안을 OpenAI로 한꺼번에 작성
+
+    실제 답변과 같은 참고 자료(로컬 QA/공지 검색)로 메시지를 만들고, 공유 게이트웨이의
+    동시 호출 한도만큼 병렬로 요청한다. 실패한 항목은 비워 두고 다음 실행에서 다시 시도한다.
+    """
+    ai = ai or AILogic()
+    gateway = gateway or get_llm_gateway()
+
+    targets = [entry for entry in review["entries"]
+               if not entry.get("time_sensitive") and (overwrite or not entry.get("answer"))]
+
+    def draft(entry: Dict) -> bool:
+        try:
+            messages, _count = ai.build_rag_messages(entry["question"])
+            answer, _reason = gateway.complete(messages, temperature=TEMPERATURE, max_tokens=MAX_TOKENS, top_p=TOP_P)
+        except Exception as e:
+            print(f"⚠️ 초안 작성 실패 ({entry['question']}): {e}")
+            return False
+        if not answer:
+            return False
+        entry["answer"] = answer
+        entry["answer_source"] = "llm"
+        return True
+
+    if not targets:
+        return {"requested": 0, "drafted": 0, "failed": 0}
+    with ThreadPoolExecutor(max_workers=max(1, getattr(gateway, "max_concurrency", 1))) as executor:
+        results = list(executor.map(draft, targets))
+    drafted = sum(results)
+    return {"requested": len(targets), "drafted": drafted, "failed": len(targets) - drafted}
+
+
+def save_review(review: Dict, review_path: str = REVIEW_PATH):
+    with open(review_path, 'w', encoding='utf-8') as f:
+        json.dump(review, f, ensure_ascii=False, indent=2)
+
+
+def merge_review(review_path: str = REVIEW_PATH, dataset_path: str = DATASET_PATH,
+                 artifact_path: str = ARTIFACT_PATH) -> Dict:
+    """검토 파일에서 승인된(approved) 항목을 school_dataset.json에 추가
+
+    대표 질문과 남겨 둔 표현을 각각 QA로 추가하고, 이미 있는 질문은 건너뛴다.
+    원본은 백업해 두며, 컴파일된 QA 파일이 있으면 다시 빌드한다.
+    """
+    with open(review_path, 'r', encoding='utf-8') as f:
+        review = json.load(f)
+    with open(dataset_path, 'r', encoding='utf-8') as f:
+        qa_data = json.load(f)
+
+    known = {normalize_question(qa['question']) for qa in qa_data}
+    approved = [entry for entry in review.get("entries", [])
+                if entry.get("approved") and (entry.get("answer") or "").strip()]
+    added, skipped = [], 0
+    for entry in approved:
+        questions = [entry["question"]] + [variant["text"] for variant in entry.get("variants", [])]
+        for question in questions:
+            key = normalize_question(question)
+            if not key or key in known:
+                skipped += 1
+                continue
+            known.add(key)
+            added.append({
+                "question": question.strip(),
+                "answer": entry["answer"].strip(),
+                "category": entry.get("category") or DEFAULT_CATEGORY,
+            })
+
+    result = {"approved": len(approved), "added": len(added), "skipped": skipped, "backup": None}
+    if not added:
+        return result
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    backup_path = os.path.join(os.path.dirname(dataset_path), f"school_dataset_backup_{timestamp}.json")
+    shutil.copy(dataset_path, backup_path)
+    result["backup"] = backup_path
+
+    # 실행 중인 서버가 쓰는 도중의 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = dataset_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(qa_data + added, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, dataset_path)
+
+    if os.path.exists(artifact_path):
+        build_artifact(dataset_path, artifact_path)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="자주 놓친 질문을 묶어 QA 초안 검토 파일 생성 / 승인된 항목 병합")
+    parser.add_argument("--db", default="school_data.db")
+    parser.add_argument("--days", type=int, default=90, help="최근 며칠의 대화를 볼지")
+    parser.add_argument("--min-count", type=int, default=2, help="묶음의 최소 질문 횟수")
+    parser.add_argument("--limit", type=int, default=50, help="검토 파일에 넣을 최대 묶음 수")
+    parser.add_argument("--similarity", type=float, default=CLUSTER_SIMILARITY, help="같은 묶음으로 볼 최소 유사도")
+    parser.add_argument("--llm", action="store_true", help="답변이 없는 항목을 OpenAI로 초안 작성")
+    parser.add_argument("--output", default=REVIEW_PATH, help="검토 파일 경로")
+    parser.add_argument("--merge", metavar="REVIEW", help="검토 파일의 승인된 항목을 school_dataset.json에 병합")
+    args = parser.parse_args()
+
+    if args.merge:
+        merged = merge_review(args.merge)
+        print(f"✅ QA 병합 결과: 승인 {merged['approved']}개, 추가 {merged['added']}개, "
+              f"중복 제외 {merged['skipped']}개 (백업: {merged['backup']})")
+    else:
+        review = build_review(args.db, days=args.days, min_count=args.min_count, limit=args.limit,
+                              similarity=args.similarity)
+        if args.llm:
+            print(f"🤖 OpenAI 초안 작성 결과: {draft_answers(review, ai=AILogic(args.db))}")
+        save_review(review, args.output)
+        print(f"📝 검토 파일 생성: {args.output} (묶음 {len(review['entries'])}개, "
+              f"놓친 질문 {review['unmatched_questions']}종/{review['unmatched_total']}회)")
+        for entry in review["entries"][:10]:
+            print(f"  {entry['count']:>4}회  {entry['question']}  (+표현 {len(entry['variants'])}개)")
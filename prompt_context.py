@@ -0,0 +1,59 @@
+import math
+import re
+from typing import List, Tuple
+
+# 한글/한자 음절은 대체로 1토큰 이상, 영문/숫자는 약 4글자당 1토큰, 기호는 1토큰으로 어림
+_TOKEN_PATTERN = re.compile(r'[가-힣㄰-㆏一-鿿]|[A-Za-z0-9]+|[^\sA-Za-z0-9]')
+_WIDE_CHAR = re.compile(r'[가-힣㄰-㆏一-鿿]')
+
+# 자르고 남은 공간이 이보다 작으면 항목을 억지로 넣지 않음
+MIN_PARTIAL_TOKENS = 30
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 빠르게 토큰 수 추정 (실제보다 약간 많게 잡음)"""
+    tokens = 0
+    for piece in _TOKEN_PATTERN.findall(text or ''):
+        if len(piece) == 1 or _WIDE_CHAR.match(piece):
+            tokens += 1
+        else:
+            tokens += math.ceil(len(piece) / 4)
+    return tokens
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """추정 토큰 수가 max_tokens 이하가 되도록 뒤를 자름 (잘렸으면 '…' 추가)"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) + 1 <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low].rstrip() + '…' if low else ''
+
+
+def pack_context(items: List[str], budget: int, separator: str = '\n\n') -> Tuple[str, int]:
+    """우선순위 순서의 자료를 토큰 예산 안에 담기
+
+    예산을 넘는 항목은 남은 공간이 충분하면 잘라서 넣고, 아니면 건너뛴다.
+    반환: (합친 문자열, 담은 항목 수)
+    """
+    packed: List[str] = []
+    used = 0
+    separator_tokens = estimate_tokens(separator)
+    for item in items:
+        remaining = budget - used - (separator_tokens if packed else 0)
+        if remaining <= 0:
+            break
+        cost = estimate_tokens(item)
+        if cost > remaining:
+            if remaining < MIN_PARTIAL_TOKENS:
+                continue
+            item = truncate_to_tokens(item, remaining)
+            cost = estimate_tokens(item)
+        packed.append(item)
+        used += cost + (separator_tokens if len(packed) > 1 else 0)
+    return separator.join(packed), len(packed)
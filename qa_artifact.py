@@ -0,0 +1,100 @@
+import hashlib
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from qa_index import QAIndex, normalize_question
+
+# 파일 구조: [헤더][payload(marshal)]
+# 헤더: magic(4) 포맷버전(H) 파이썬 major(B) minor(B) marshal버전(H) payload길이(Q)
+#       원본 JSON sha256(32) payload sha256(32)
+MAGIC = b'WSQA'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHBBHQ32s32s')
+
+DATASET_PATH = 'school_dataset.json'
+ARTIFACT_PATH = 'school_dataset.qa.bin'
+
+
+def _sha256_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def build_artifact(dataset_path: str = DATASET_PATH, artifact_path: str = ARTIFACT_PATH) -> Dict:
+    """QA JSON을 정규화 질문/n-gram 색인과 함께 하나의 바이너리 파일로 컴파일"""
+    with open(dataset_path, 'rb') as f:
+        raw = f.read()
+    qa_data = json.loads(raw.decode('utf-8'))
+    # 런타임 JSON 로드와 같은 규칙으로 QA id 부여
+    for i, qa in enumerate(qa_data, 1):
+        qa.setdefault('id', i)
+
+    questions = [qa['question'] for qa in qa_data]
+    payload = marshal.dumps({
+        'qa_data': qa_data,
+        'normalized': [normalize_question(q) for q in questions],
+        'index': QAIndex.build(questions).to_payload(),
+    })
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, sys.version_info[0], sys.version_info[1], marshal.version,
+        len(payload), hashlib.sha256(raw).digest(), hashlib.sha256(payload).digest()
+    )
+
+    # 쓰는 도중 읽히지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = artifact_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(payload)
+    os.replace(tmp_path, artifact_path)
+    return {'entries': len(qa_data), 'bytes': HEADER.size + len(payload)}
+
+
+def load_artifact(artifact_path: str = ARTIFACT_PATH,
+                  dataset_path: Optional[str] = DATASET_PATH) -> Optional[Tuple[List[Dict], QAIndex]]:
+    """컴파일된 QA 파일 로드 (형식/버전/체크섬이 맞지 않으면 None → JSON으로 대체)"""
+    try:
+        with open(artifact_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if len(mm) < HEADER.size:
+                    return None
+                magic, version, py_major, py_minor, marshal_version, length, source_hash, payload_hash = \
+                    HEADER.unpack_from(mm, 0)
+                if magic != MAGIC or version != FORMAT_VERSION:
+                    print(f"QA 빌드 파일 형식 불일치: {artifact_path}")
+                    return None
+                # marshal 형식은 파이썬 버전마다 다를 수 있음
+                if (py_major, py_minor) != sys.version_info[:2] or marshal_version != marshal.version:
+                    print("QA 빌드 파일이 다른 파이썬 버전으로 만들어졌습니다.")
+                    return None
+                # 원본 JSON이 바뀌었으면 오래된 빌드
+                if dataset_path and os.path.exists(dataset_path) and _sha256_file(dataset_path) != source_hash:
+                    print("QA 빌드 파일이 school_dataset.json보다 오래되었습니다.")
+                    return None
+                payload = mm[HEADER.size:HEADER.size + length]
+    except (OSError, ValueError, struct.error) as e:
+        print(f"QA 빌드 파일 로드 실패: {e}")
+        return None
+
+    if len(payload) != length or hashlib.sha256(payload).digest() != payload_hash:
+        print("QA 빌드 파일 체크섬 오류")
+        return None
+
+    data = marshal.loads(payload)
+    return data['qa_data'], QAIndex.from_payload(data['index'])
+
+
+if __name__ == '__main__':
+    started = time.perf_counter()
+    result = build_artifact()
+    print(f"QA 빌드 완료: {result['entries']}개 항목, {result['bytes']} bytes "
+          f"({(time.perf_counter() - started) * 1000:.1f}ms) -> {ARTIFACT_PATH}")
+
+    started = time.perf_counter()
+    load_artifact()
+    print(f"로드 시간: {(time.perf_counter() - started) * 1000:.2f}ms")
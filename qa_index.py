@@ -0,0 +1,104 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+NGRAM_SIZE = 2
+
+
+def normalize_question(text: str) -> str:
+    """비교용 정규화: 소문자화, 공백/특수문자 제거"""
+    return re.sub(r'[^\w]', '', (text or '').lower())
+
+
+def char_ngrams(text: str, n: int = NGRAM_SIZE) -> List[str]:
+    """정규화된 문자열의 문자 n-gram (짧은 문자열은 그대로)"""
+    if len(text) <= n:
+        return [text] if text else []
+    return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+
+class QAIndex:
+    """QA 질문 문자 n-gram 역색인 (TF-IDF 코사인 유사도)
+
+    형태소 분석기 없이도 한국어 조사/띄어쓰기 차이에 강하고,
+    색인 자체가 dict/list라 그대로 직렬화해 빌드 산출물에 담을 수 있다.
+    """
+
+    def __init__(self, postings: Dict[str, List[Tuple[int, float]]], norms: List[float],
+                 exact: Dict[str, int], idf: Dict[str, float]):
+        self.postings = postings
+        self.norms = norms
+        self.exact = exact
+        self.idf = idf
+
+    @classmethod
+    def build(cls, questions: List[str]) -> 'QAIndex':
+        """질문 목록으로 색인 생성"""
+        normalized = [normalize_question(q) for q in questions]
+        doc_terms = [Counter(char_ngrams(q)) for q in normalized]
+
+        df = Counter()
+        for terms in doc_terms:
+            df.update(terms.keys())
+        total = max(len(doc_terms), 1)
+        idf = {term: math.log(1 + total / count) for term, count in df.items()}
+
+        postings: Dict[str, List[Tuple[int, float]]] = {}
+        norms = []
+        for doc_id, terms in enumerate(doc_terms):
+            norm = 0.0
+            for term, tf in terms.items():
+                weight = tf * idf[term]
+                postings.setdefault(term, []).append((doc_id, weight))
+                norm += weight * weight
+            norms.append(math.sqrt(norm) or 1.0)
+
+        exact = {}
+        for doc_id, q in enumerate(normalized):
+            exact.setdefault(q, doc_id)
+        return cls(postings, norms, exact, idf)
+
+    def find_exact(self, question: str) -> Optional[int]:
+        """정규화 기준으로 같은 질문의 위치"""
+        return self.exact.get(normalize_question(question))
+
+    def search(self, query: str, k: int = 5, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        """유사도 상위 k개 (위치, 점수)"""
+        terms = Counter(char_ngrams(normalize_question(query)))
+        if not terms:
+            return []
+
+        scores: Dict[int, float] = {}
+        query_norm = 0.0
+        for term, tf in terms.items():
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            q_weight = tf * idf
+            query_norm += q_weight * q_weight
+            for doc_id, d_weight in self.postings[term]:
+                scores[doc_id] = scores.get(doc_id, 0.0) + q_weight * d_weight
+        if not scores:
+            return []
+
+        query_norm = math.sqrt(query_norm)
+        ranked = sorted(
+            ((doc_id, score / (query_norm * self.norms[doc_id])) for doc_id, score in scores.items()),
+            key=lambda item: item[1],
+            reverse=True
+        )
+        return [(doc_id, score) for doc_id, score in ranked[:k] if score >= min_score]
+
+    def to_payload(self) -> Dict:
+        """직렬화용 dict (marshal 가능한 기본 타입만 사용)"""
+        return {
+            'postings': self.postings,
+            'norms': self.norms,
+            'exact': self.exact,
+            'idf': self.idf,
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Dict) -> 'QAIndex':
+        return cls(payload['postings'], payload['norms'], payload['exact'], payload['idf'])
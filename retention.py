@@ -0,0 +1,126 @@
+import gzip
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Optional
+
+from config import CONVERSATION_RETENTION_DAYS, ARCHIVE_DIR, VACUUM_PAGES
+from stats import get_state, rollup_pending
+
+ARCHIVE_CHUNK_SIZE = 1000
+
+
+def rollup_conversations(db_path: str = "school_data.db") -> int:
+    """아직 집계되지 않은 대화 기록을 daily_stats에 누적 (집계한 행 수 반환)
+
+    평소에는 write-behind 저장 시 함께 집계되므로, 이전 버전에서 쌓인 기록이나
+    다른 경로로 들어온 기록만 여기서 처리된다.
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        row_count = rollup_pending(cursor)
+        conn.commit()
+        if row_count:
+            print(f"대화 기록 롤업 완료: {row_count}건")
+        return row_count
+    finally:
+        conn.close()
+
+
+def archive_dir_for(db_path: str, archive_dir: str = ARCHIVE_DIR) -> str:
+    """DB 파일 기준 아카이브 폴더 (상대 경로면 DB 파일 옆)"""
+    if os.path.isabs(archive_dir):
+        return archive_dir
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), archive_dir)
+
+
+def archive_conversations(db_path: str = "school_data.db",
+                          archive_dir: Optional[str] = None,
+                          retention_days: int = CONVERSATION_RETENTION_DAYS) -> int:
+    """보관 기간이 지난 대화 원본을 월별 압축 파일(jsonl.gz)로 옮기고 DB에서 삭제
+
+    롤업이 끝난 행만 옮기므로 집계는 유지된다. 사용자 ID와 원문이 담기므로
+    폴더는 DB 파일 옆에 두고 저장소에는 올리지 않는다 (.gitignore).
+    """
+    archive_dir = archive_dir_for(db_path, archive_dir or ARCHIVE_DIR)
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=retention_days)).strftime("%Y-%m-%d %H:%M:%S")
+    os.makedirs(archive_dir, exist_ok=True)
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    archived = 0
+    try:
+        cursor = conn.cursor()
+        last_rolled_id = get_state(cursor, "conversation_last_id")
+
+        while True:
+            cursor.execute("""
+                SELECT id, user_id, message, response, timestamp, intent, qa_id
+                FROM conversation_history
+                WHERE timestamp < ? AND id <= ?
+                ORDER BY id LIMIT ?
+            """, (cutoff, last_rolled_id, ARCHIVE_CHUNK_SIZE))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            # 월별 파일에 이어 쓰기 (gzip 멤버 단위로 추가되어 gzip.open으로 그대로 읽힘)
+            by_month: Dict[str, list] = {}
+            for row in rows:
+                month = (row[4] or "unknown")[:7]
+                by_month.setdefault(month, []).append(row)
+            for month, month_rows in by_month.items():
+                path = os.path.join(archive_dir, f"conversation_history_{month}.jsonl.gz")
+                with gzip.open(path, "at", encoding="utf-8") as f:
+                    for row in month_rows:
+                        f.write(json.dumps({
+                            "id": row[0], "user_id": row[1], "message": row[2], "response": row[3],
+                            "timestamp": row[4], "intent": row[5], "qa_id": row[6]
+                        }, ensure_ascii=False) + "\n")
+
+            with conn:
+                conn.executemany("DELETE FROM conversation_history WHERE id = ?", [(row[0],) for row in rows])
+            archived += len(rows)
+
+        if archived:
+            print(f"대화 기록 아카이브 완료: {archived}건 -> {archive_dir}")
+        return archived
+    finally:
+        conn.close()
+
+
+def incremental_vacuum(db_path: str = "school_data.db", pages: int = VACUUM_PAGES) -> int:
+    """빈 페이지를 조금씩 반환 (처음 한 번만 auto_vacuum=INCREMENTAL 전환용 전체 VACUUM)"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        cursor = conn.cursor()
+        mode = cursor.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode != 2:
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            cursor.execute("VACUUM")
+            print("auto_vacuum 모드를 INCREMENTAL로 전환했습니다.")
+
+        before = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+        cursor.execute(f"PRAGMA incremental_vacuum({int(pages)})")
+        cursor.fetchall()
+        after = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+        return before - after
+    finally:
+        conn.close()
+
+
+def run_retention(db_path: str = "school_data.db") -> Dict:
+    """롤업 → 아카이브 → 점진적 VACUUM 순서로 실행"""
+    result = {
+        "rolled_up": rollup_conversations(db_path),
+        "archived": archive_conversations(db_path),
+        "vacuumed_pages": incremental_vacuum(db_path),
+    }
+    print(f"대화 기록 정리 결과: {result}")
+    return result
+
+
+if __name__ == "__main__":
+    run_retention()
@@ -0,0 +1,560 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from lxml import html as lxml_html
+
+from config import SCHOOL_BASE_URL, CRAWL_TIMEOUT, CRAWL_CONCURRENCY, CRAWL_RATE_PER_HOST
+from crawl_scheduler import CrawlScheduler
+from database import parse_ntt_sn
+
+# 학교 홈페이지 게시판/식단 주소 (SCHOOL_BASE_URL 기준 상대 경로)
+NOTICE_LIST_PATH = "/na/ntt/selectNttList.do"
+NOTICE_DETAIL_PATH = "/na/ntt/selectNttInfo.do"
+MEAL_PATH = "/ad/fm/foodmenu/selectFoodMenuView.do"
+
+NOTICE_PARAMS = {"mi": "8476", "bbsId": "5794"}
+MEAL_PARAMS = {"mi": "8432"}
+# 식단 페이지에서 주(week)를 지정하는 날짜 파라미터
+MEAL_DATE_PARAM = "schDt"
+
+USER_AGENT = "Mozilla/5.0 (compatible; WaseokChatbot/1.0)"
+
+DATE_PATTERN = re.compile(r"(\d{4})[.\-/]\s*(\d{1,2})[.\-/]\s*(\d{1,2})")
+NEW_BADGE = "새로운 글"
+BLOCK_TAGS = {"p", "div", "li", "tr", "h1", "h2", "h3", "h4", "table", "ul", "ol"}
+
+
+def parse_date(date_str: Optional[str]) -> str:
+    """날짜 문자열을 YYYY-MM-DD로 변환 ("등록일\\n2025.07.07" 같은 값도 처리)"""
+    if not date_str:
+        return ""
+    match = DATE_PATTERN.search(date_str)
+    if not match:
+        return date_str.strip()
+    year, month, day = match.groups()
+    return f"{year}-{int(month):02d}-{int(day):02d}"
+
+
+def element_text(el) -> str:
+    """요소의 화면 표시 텍스트 (<br>과 블록 요소는 줄바꿈으로)"""
+    parts = []
+
+    def walk(node):
+        if node.tag == "br":
+            parts.append("\n")
+        elif isinstance(node.tag, str) and node.tag not in ("script", "style"):
+            if node.text:
+                parts.append(node.text)
+            for child in node:
+                walk(child)
+            if node.tag in BLOCK_TAGS:
+                parts.append("\n")
+        if node.tail:
+            parts.append(node.tail)
+
+    if el.text:
+        parts.append(el.text)
+    for child in el:
+        walk(child)
+
+    lines = [line.replace("\xa0", " ").strip() for line in "".join(parts).split("\n")]
+    return "\n".join(line for line in lines if line)
+
+
+def clean_notice_title(title: str) -> str:
+    """목록 제목에서 '새로운 글' 표시와 줄바꿈 제거"""
+    title = title.replace(NEW_BADGE, "")
+    return " ".join(title.split())
+
+
+def _extract_ntt_sn(anchor) -> Optional[int]:
+    """목록 링크에서 nttSn 추출 (href, data-id, onclick 순서)"""
+    ntt_sn = parse_ntt_sn(anchor.get("href"))
+    if ntt_sn is not None:
+        return ntt_sn
+    data_id = anchor.get("data-id") or ""
+    if data_id.isdigit():
+        return int(data_id)
+    match = re.search(r"(\d{4,})", anchor.get("onclick") or "")
+    return int(match.group(1)) if match else None
+
+
+def parse_notice_list(page_html) -> List[Dict]:
+    """공지사항 목록 페이지 → [{ntt_sn, title, created_at}]"""
+    doc = lxml_html.fromstring(page_html)
+    notices = []
+    for row in doc.xpath("//table/tbody/tr"):
+        anchors = row.xpath("./td[contains(concat(' ', normalize-space(@class), ' '), ' ta_l ')]/a")
+        if not anchors:
+            continue
+        anchor = anchors[0]
+        title = clean_notice_title(anchor.text_content())
+        if not title:
+            continue
+        cells = row.xpath("./td")
+        created_at = parse_date(cells[3].text_content()) if len(cells) >= 4 else ""
+        notices.append({
+            "ntt_sn": _extract_ntt_sn(anchor),
+            "title": title,
+            "created_at": created_at,
+        })
+    return notices
+
+
+def _by_class(doc, tag: str, class_name: str):
+    return doc.xpath(f"//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]")
+
+
+def parse_notice_detail(page_html) -> str:
+    """공지사항 상세 페이지 → 본문 텍스트"""
+    content = _by_class(lxml_html.fromstring(page_html), "div", "bbsV_cont")
+    return element_text(content[0]) if content else ""
+
+
+def parse_notice_view(page_html) -> Dict:
+    """공지사항 상세 페이지 → {title, created_at, content} (목록 없이 번호만으로 수집할 때)"""
+    doc = lxml_html.fromstring(page_html)
+    title = _by_class(doc, "*", "bbsV_tit")
+    created_at = ""
+    for item in _by_class(doc, "ul", "bbsV_data")[:1]:
+        for li in item.xpath("./li"):
+            text = li.text_content()
+            if "등록일" in text:
+                created_at = parse_date(text)
+    content = _by_class(doc, "div", "bbsV_cont")
+    return {
+        "title": clean_notice_title(title[0].text_content()) if title else "",
+        "created_at": created_at,
+        "content": element_text(content[0]) if content else "",
+    }
+
+
+def _meal_menu(cell) -> str:
+    """식단 칸에서 메뉴 텍스트 추출 (제목/칼로리/사진 문단 제외)"""
+    menu = ""
+    for p in cell.xpath("./p"):
+        if (p.get("class") or "") in ("fm_tit_p", "fm_kcal"):
+            continue
+        text = element_text(p)
+        if text:
+            menu = text
+    return menu
+
+
+ALLERGEN_PATTERN = re.compile(r"^(.*?)\s*\(([\d.]+)\)\s*$")
+
+
+def parse_allergens(menu: str) -> List[Dict]:
+    """메뉴 줄별 알레르기 유발 식품 번호 ("맑은아귀탕 (5.6.9)" → {dish, codes})"""
+    dishes = []
+    for line in menu.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        match = ALLERGEN_PATTERN.match(line)
+        if match:
+            codes = sorted({int(code) for code in match.group(2).split(".") if code})
+            dishes.append({"dish": match.group(1), "codes": codes})
+        else:
+            dishes.append({"dish": line, "codes": []})
+    return dishes
+
+
+def parse_meal_week(page_html) -> Tuple[List[Dict], Optional[str]]:
+    """주간 식단 페이지 → ([{date, meal_type, menu, image_url, allergens}], 다음 주 날짜)"""
+    doc = lxml_html.fromstring(page_html)
+    tables = doc.xpath("//*[@id='detailForm']//table") or doc.xpath("//table")
+    if not tables:
+        return [], None
+    table = tables[0]
+
+    # 첫 열은 '구분', 나머지 열 머리글에 날짜가 들어 있음
+    dates = [parse_date(th.text_content()) for th in table.xpath("./thead/tr/th")[1:]]
+
+    meals = []
+    for row in table.xpath("./tbody/tr"):
+        header = row.xpath("./th")
+        if not header:
+            continue
+        meal_type = header[0].text_content().strip()
+        for date, cell in zip(dates, row.xpath("./td")):
+            menu = _meal_menu(cell)
+            if not date or not menu:
+                continue
+            images = cell.xpath(".//img/@src")
+            meals.append({
+                "date": date,
+                "meal_type": meal_type,
+                "menu": menu,
+                "image_url": images[0] if images else "",
+                "allergens": parse_allergens(menu),
+            })
+
+    next_week = None
+    for anchor in doc.xpath("//a[.//i[contains(@class, 'xi-angle-right')]]"):
+        next_week = parse_date(anchor.get("onclick") or anchor.get("href")) or None
+        break
+    return meals, next_week
+
+
+class CrawlState:
+    """페이지별 ETag/Last-Modified/내용 해시 (crawl_state 테이블)
+
+    실행 시작 시 한 번 읽어 메모리에서 갱신하고, DB 저장이 끝난 뒤 save()로 기록한다.
+    저장에 실패한 실행의 해시가 남으면 다음 실행에서 그 페이지를 건너뛰게 되기 때문이다.
+    """
+
+    def __init__(self, db_path: str = "school_data.db"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self._dirty = set()
+        self.counts = {"pages_fetched": 0, "pages_not_modified": 0, "pages_unchanged": 0}
+        self._load()
+
+    def _load(self):
+        entries = {}
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for url, etag, last_modified, content_hash, item_count in conn.execute(
+                    "SELECT url, etag, last_modified, content_hash, item_count FROM crawl_state"):
+                entries[url] = {"etag": etag, "last_modified": last_modified,
+                                "content_hash": content_hash, "item_count": item_count}
+        finally:
+            conn.close()
+        with self._lock:
+            self._entries = entries
+            self._dirty = set()
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        """조건부 요청 헤더 (If-None-Match / If-Modified-Since)"""
+        with self._lock:
+            entry = self._entries.get(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def is_changed(self, url: str, response) -> bool:
+        """응답이 지난번과 달라졌는지 (304 또는 같은 해시면 False) 판단하고 검증값 갱신"""
+        with self._lock:
+            entry = self._entries.setdefault(url, {})
+            if response.status_code == 304:
+                self.counts["pages_not_modified"] += 1
+                return False
+
+            headers = getattr(response, "headers", None) or {}
+            content_hash = hashlib.sha256(response.content).hexdigest()
+            changed = entry.get("content_hash") != content_hash
+            entry.update({
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "content_hash": content_hash,
+            })
+            self._dirty.add(url)
+            self.counts["pages_fetched" if changed else "pages_unchanged"] += 1
+            return changed
+
+    def item_count(self, url: str) -> Optional[int]:
+        with self._lock:
+            return (self._entries.get(url) or {}).get("item_count")
+
+    def set_item_count(self, url: str, count: int):
+        """페이지에서 파싱한 항목 수 (변경 없는 페이지가 빈 페이지였는지 판단용)"""
+        with self._lock:
+            self._entries.setdefault(url, {})["item_count"] = count
+            self._dirty.add(url)
+
+    def rollback(self):
+        """이번 실행에서 바뀐 검증값을 버림 (DB 저장 실패 시)"""
+        self._load()
+
+    def pop_counts(self) -> Dict[str, int]:
+        """요청/건너뛴 페이지 수를 반환하고 초기화"""
+        with self._lock:
+            counts = self.counts
+            self.counts = dict.fromkeys(counts, 0)
+        return counts
+
+    def save(self):
+        """변경된 검증값을 DB에 기록"""
+        with self._lock:
+            rows = [(url, e.get("etag"), e.get("last_modified"), e.get("content_hash"), e.get("item_count"))
+                    for url, e in self._entries.items() if url in self._dirty]
+            self._dirty = set()
+        if not rows:
+            return
+        checked_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                conn.executemany("""
+                    INSERT INTO crawl_state (url, etag, last_modified, content_hash, item_count, checked_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        etag = excluded.etag, last_modified = excluded.last_modified,
+                        content_hash = excluded.content_hash, item_count = excluded.item_count,
+                        checked_at = excluded.checked_at
+                """, [row + (checked_at,) for row in rows])
+        finally:
+            conn.close()
+
+
+class CrawlCheckpoint:
+    """크롤링 진행 위치 (crawl_checkpoint 테이블)
+
+    목록 페이지를 볼 때마다, 그리고 상세 페이지 배치를 저장할 때마다 기록해 두므로
+    실행이 중간에 죽어도 다음 실행이 본 페이지 다음부터, 남은 항목부터 이어간다.
+    """
+
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, db_path: str = "school_data.db", name: str = "notices"):
+        self.db_path = db_path
+        self.name = name
+        self.pages_visited = 0
+        self.listing_done = False
+        self.pending: Dict[int, Dict] = {}
+        self.saved: List[int] = []
+        self.resumed = False
+
+        conn = sqlite3.connect(db_path)
+        try:
+            row = conn.execute(
+                "SELECT pages_visited, listing_done, pending, saved FROM crawl_checkpoint WHERE name = ?",
+                (name,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row:
+            self.pages_visited, listing_done, pending, saved = row
+            self.listing_done = bool(listing_done)
+            self.pending = {item["ntt_sn"]: item for item in json.loads(pending)}
+            self.saved = json.loads(saved)
+            self.resumed = True
+
+    def save(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                conn.execute("""
+                    INSERT INTO crawl_checkpoint (name, pages_visited, listing_done, pending, saved, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(name) DO UPDATE SET
+                        pages_visited = excluded.pages_visited,
+                        listing_done = excluded.listing_done, pending = excluded.pending,
+                        saved = excluded.saved, updated_at = excluded.updated_at
+                """, (self.name, self.pages_visited, int(self.listing_done),
+                      json.dumps(list(self.pending.values()), ensure_ascii=False), json.dumps(self.saved),
+                      datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")))
+        finally:
+            conn.close()
+
+    def visit_page(self, page: int, items: List[Dict]):
+        """목록 페이지 하나를 본 결과 기록"""
+        saved = set(self.saved)
+        for item in items:
+            if item["ntt_sn"] not in saved:
+                self.pending.setdefault(item["ntt_sn"], dict(item))
+        self.pages_visited = page
+        self.save()
+
+    def finish_listing(self):
+        self.listing_done = True
+        self.save()
+
+    def pending_items(self) -> List[Dict]:
+        return list(self.pending.values())
+
+    def mark_saved(self, ntt_sns: List[int]):
+        """DB 저장이 끝난 항목을 대기 목록에서 제거"""
+        for ntt_sn in ntt_sns:
+            if self.pending.pop(ntt_sn, None) is not None:
+                self.saved.append(ntt_sn)
+        self.save()
+
+    def complete(self):
+        """실행이 끝까지 진행됨: 남은(실패한) 항목만 다음 실행으로 넘기고 진행 위치 초기화"""
+        carried = {}
+        for ntt_sn, item in self.pending.items():
+            attempts = item.get("attempts", 0) + 1
+            if attempts >= self.MAX_ATTEMPTS:
+                print(f"공지사항 {ntt_sn} 상세 수집을 {attempts}번 실패해 포기합니다.")
+                continue
+            carried[ntt_sn] = dict(item, attempts=attempts)
+
+        if not carried:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                with conn:
+                    conn.execute("DELETE FROM crawl_checkpoint WHERE name = ?", (self.name,))
+            finally:
+                conn.close()
+            return
+        self.pending = carried
+        self.pages_visited = 0
+        self.listing_done = False
+        self.saved = []
+        self.save()
+
+
+class SchoolCrawler:
+    """학교 홈페이지 HTTP 크롤러 (브라우저 없이 목록/상세/식단 페이지를 직접 요청)"""
+
+    def __init__(self, session=None, base_url: str = SCHOOL_BASE_URL, timeout: float = CRAWL_TIMEOUT,
+                 concurrency: int = CRAWL_CONCURRENCY, rate_per_host: float = CRAWL_RATE_PER_HOST,
+                 state: Optional[CrawlState] = None, scheduler: Optional[CrawlScheduler] = None):
+        self.base_url = base_url.rstrip("/")
+        self.state = state
+        self.timeout = timeout
+        self.concurrency = max(1, concurrency)
+        # 고정 sleep 대신 호스트별 토큰 버킷/재시도/제한 시간으로 요청 속도 조절
+        self.scheduler = scheduler or CrawlScheduler(rate=rate_per_host)
+        if session is None:
+            session = requests.Session()
+            # 동시 요청 수만큼 연결을 재사용할 수 있도록 풀 크기 지정
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.concurrency)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+        self.session = session
+        self._lock = threading.Lock()
+        self.request_count = 0
+        self.error_count = 0
+
+    def page_url(self, path: str, params: Dict) -> str:
+        """요청 주소 (crawl_state 키)"""
+        return f"{self.base_url}{path}?{urlencode(params)}"
+
+    def _get(self, path: str, params: Dict, conditional: bool = True) -> Optional[bytes]:
+        """GET 요청 후 본문 반환 (HTTP 오류는 예외)
+
+        crawl_state가 있으면 조건부 요청을 보내고, 304이거나 내용 해시가
+        지난번과 같으면 None을 반환한다. conditional=False면 항상 본문을 반환한다.
+        """
+        url = self.page_url(path, params)
+        state = self.state if conditional else None
+        headers = state.request_headers(url) if state else {}
+
+        def send():
+            with self._lock:
+                self.request_count += 1
+            return self.session.get(self.base_url + path, params=params, headers=headers, timeout=self.timeout)
+
+        response = self.scheduler.request(urlparse(url).netloc, send)
+        if state:
+            if response.status_code == 304:
+                state.is_changed(url, response)
+                return None
+            response.raise_for_status()
+            return response.content if state.is_changed(url, response) else None
+        response.raise_for_status()
+        return response.content
+
+    def notice_url(self, ntt_sn: int) -> str:
+        """공지사항 상세 페이지 주소 (DB에 저장되는 url)"""
+        return self.page_url(NOTICE_DETAIL_PATH, dict(NOTICE_PARAMS, nttSn=ntt_sn))
+
+    def fetch_notice_list(self, page: int = 1, conditional: bool = True) -> Optional[List[Dict]]:
+        """공지사항 목록 한 페이지 (지난번과 같으면 None)"""
+        content = self._get(NOTICE_LIST_PATH, dict(NOTICE_PARAMS, currPage=page), conditional)
+        return parse_notice_list(content) if content is not None else None
+
+    def fetch_notice_detail(self, ntt_sn: int) -> Optional[str]:
+        """공지사항 본문 (지난번과 같으면 None)"""
+        content = self._get(NOTICE_DETAIL_PATH, dict(NOTICE_PARAMS, nttSn=ntt_sn))
+        return parse_notice_detail(content) if content is not None else None
+
+    def fetch_notice(self, item: Dict) -> Optional[Dict]:
+        """목록 항목에 상세 본문을 붙여 DB 저장 형식으로 변환 (본문이 그대로면 None)"""
+        content = self.fetch_notice_detail(item["ntt_sn"])
+        if content is None:
+            return None
+        return {
+            "ntt_sn": item["ntt_sn"],
+            "title": item["title"],
+            "url": self.notice_url(item["ntt_sn"]),
+            "content": content,
+            "created_at": item["created_at"],
+            "tags": item["title"],
+            "category": None,
+        }
+
+    def fetch_notice_by_id(self, ntt_sn: int) -> Dict:
+        """번호만으로 공지 하나를 새로 수집 (검증값과 무관하게 항상 요청)"""
+        view = parse_notice_view(self._get(NOTICE_DETAIL_PATH, dict(NOTICE_PARAMS, nttSn=ntt_sn), conditional=False))
+        return {
+            "ntt_sn": ntt_sn,
+            "title": view["title"],
+            "url": self.notice_url(ntt_sn),
+            "content": view["content"],
+            "created_at": view["created_at"],
+            "tags": view["title"],
+            "category": None,
+        }
+
+    def _fetch_concurrent(self, func, items: Iterable, describe) -> Iterator[Tuple]:
+        """items마다 func를 동시에 실행해 끝나는 순서대로 (항목, 결과) 반환
+
+        동시에 진행 중인 요청은 concurrency개로 제한되고, 요청에 실패한 항목은 건너뛴다.
+        """
+        items = iter(items)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="crawler") as executor:
+            pending = {executor.submit(func, item): item for item in islice(items, self.concurrency)}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    for next_item in islice(items, 1):
+                        pending[executor.submit(func, next_item)] = next_item
+                    try:
+                        result = future.result()
+                    except requests.RequestException as e:
+                        with self._lock:
+                            self.error_count += 1
+                        print(f"{describe(item)} 요청 오류: {e}")
+                        continue
+                    yield item, result
+
+    def fetch_notices(self, items: Iterable[Dict]) -> Iterator[Tuple[Dict, Optional[Dict]]]:
+        """목록 항목들의 상세 페이지를 동시에 요청해 끝나는 순서대로 (항목, 공지) 반환
+
+        지난번과 내용이 같은 항목은 공지가 None이다.
+        """
+        return self._fetch_concurrent(self.fetch_notice, items,
+                                      lambda item: f"공지사항 상세 (nttSn={item['ntt_sn']})")
+
+    def fetch_meal_week(self, date: Optional[str] = None) -> Tuple[Optional[List[Dict]], Optional[str]]:
+        """date가 속한 주의 식단 (없으면 이번 주)
+
+        지난번과 같은 페이지면 (None, None), 지난번에도 비어 있던 페이지면 ([], None).
+        """
+        params = dict(MEAL_PARAMS)
+        if date:
+            params[MEAL_DATE_PARAM] = date
+        content = self._get(MEAL_PATH, params)
+        url = self.page_url(MEAL_PATH, params)
+        if content is None:
+            return ([] if self.state.item_count(url) == 0 else None), None
+        meals, next_week = parse_meal_week(content)
+        if self.state:
+            self.state.set_item_count(url, len(meals))
+        return meals, next_week
+
+    def fetch_meal_weeks(self, week_dates: Iterable[str]) -> Iterator[Tuple[str, Optional[List[Dict]]]]:
+        """여러 주의 식단을 동시에 요청해 끝나는 순서대로 (주 시작일, 식단) 반환"""
+        for week_date, (meals, _) in self._fetch_concurrent(self.fetch_meal_week, week_dates,
+                                                            lambda week_date: f"식단 ({week_date} 주)"):
+            yield week_date, meals
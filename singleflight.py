@@ -0,0 +1,87 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from config import LLM_COALESCE_MAX_WAITERS, LLM_COALESCE_TIMEOUT
+
+
+class SingleFlightBusy(Exception):
+    """같은 요청을 기다리는 수가 한도를 넘음"""
+
+
+class SingleFlightTimeout(Exception):
+    """먼저 시작된 같은 요청이 제한 시간 안에 끝나지 않음"""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """같은 키의 작업이 이미 실행 중이면 새로 실행하지 않고 그 결과를 함께 받음
+
+    처음 들어온 요청(leader)만 fn을 실행하고, 실행 중에 들어온 같은 키의 요청은
+    최대 max_waiters개까지 timeout초 동안 기다렸다가 같은 결과(또는 같은 예외)를 받는다.
+    실행이 끝나면 키를 지우므로 이후 요청은 다시 실행한다 (결과 보관은 캐시가 담당).
+    """
+
+    def __init__(self, max_waiters: int = LLM_COALESCE_MAX_WAITERS, timeout: float = LLM_COALESCE_TIMEOUT):
+        self.max_waiters = max_waiters
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.counts = {"executed": 0, "shared": 0, "rejected": 0, "timeouts": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """fn 실행 또는 실행 중인 같은 키의 결과 대기
+
+        반환: (결과, 다른 요청의 결과를 받았는지)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+                self.counts["executed"] += 1
+            elif call.waiters >= self.max_waiters:
+                self.counts["rejected"] += 1
+                raise SingleFlightBusy(f"같은 요청 대기 한도({self.max_waiters}) 초과")
+            else:
+                call.waiters += 1
+                leader = False
+
+        if leader:
+            try:
+                call.result = fn()
+                return call.result, False
+            except Exception as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        finished = call.done.wait(self.timeout)
+        with self._lock:
+            call.waiters -= 1
+        if not finished:
+            with self._lock:
+                self.counts["timeouts"] += 1
+            raise SingleFlightTimeout(f"같은 요청 대기 시간({self.timeout:.1f}초) 초과")
+        if call.error is not None:
+            raise call.error
+        with self._lock:
+            self.counts["shared"] += 1
+        return call.result, True
+
+    def stats(self) -> Dict:
+        """실행/공유/거절/시간 초과 횟수와 현재 실행 중인 키 수"""
+        with self._lock:
+            return dict(self.counts, in_flight=len(self._calls),
+                        waiting=sum(call.waiters for call in self._calls.values()))
@@ -0,0 +1,142 @@
+import sqlite3
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Optional
+
+# 일별 집계는 한국 날짜 기준 (timestamp는 UTC로 저장됨)
+KST = timezone(timedelta(hours=9))
+KST_DAY = "date(timestamp, '+9 hours')"
+
+# QA 매칭에 실패한 대화로 보는 intent
+UNMATCHED_INTENTS = ("openai", "openai_cache", "openai_shared", "fallback")
+
+_UPSERT = " ON CONFLICT(day, metric, key) DO UPDATE SET count = count + excluded.count"
+
+
+def get_state(cursor, name: str) -> int:
+    cursor.execute("SELECT value FROM rollup_state WHERE name = ?", (name,))
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def set_state(cursor, name: str, value: int):
+    cursor.execute(
+        "INSERT INTO rollup_state (name, value) VALUES (?, ?) "
+        "ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+        (name, value)
+    )
+
+
+def rollup_pending(cursor) -> int:
+    """마지막 집계 이후 저장된 대화를 daily_stats/daily_users에 누적 (열린 쓰기 트랜잭션 안에서 호출)
+
+    write-behind 저장 직후 같은 트랜잭션에서 호출되므로 평소에는 방금 저장한
+    배치만 집계한다. 집계 위치(id)를 함께 저장하므로 같은 행을 두 번 세지 않는다.
+    """
+    last_id = get_state(cursor, "conversation_last_id")
+    cursor.execute("SELECT COALESCE(MAX(id), 0), COUNT(*) FROM conversation_history WHERE id > ?", (last_id,))
+    max_id, row_count = cursor.fetchone()
+    if row_count == 0:
+        return 0
+
+    cursor.execute(f"""
+        INSERT INTO daily_stats (day, metric, key, count)
+        SELECT {KST_DAY}, 'intent', COALESCE(intent, 'unknown'), COUNT(*)
+        FROM conversation_history WHERE id > ? AND id <= ?
+        GROUP BY 1, 3
+    """ + _UPSERT, (last_id, max_id))
+    cursor.execute(f"""
+        INSERT INTO daily_stats (day, metric, key, count)
+        SELECT {KST_DAY}, 'qa', CAST(qa_id AS TEXT), COUNT(*)
+        FROM conversation_history WHERE id > ? AND id <= ? AND qa_id IS NOT NULL
+        GROUP BY 1, 3
+    """ + _UPSERT, (last_id, max_id))
+    cursor.execute(f"""
+        INSERT INTO daily_stats (day, metric, key, count)
+        SELECT {KST_DAY}, 'unmatched', substr(message, 1, 200), COUNT(*)
+        FROM conversation_history
+        WHERE id > ? AND id <= ? AND intent IN ({','.join('?' * len(UNMATCHED_INTENTS))})
+        GROUP BY 1, 3
+    """ + _UPSERT, (last_id, max_id, *UNMATCHED_INTENTS))
+
+    # 일별 사용자 수: 처음 본 (날짜, 사용자)만 추가하고 그 날짜의 수를 갱신
+    cursor.execute(f"""
+        INSERT OR IGNORE INTO daily_users (day, user_id)
+        SELECT DISTINCT {KST_DAY}, user_id FROM conversation_history WHERE id > ? AND id <= ?
+    """, (last_id, max_id))
+    cursor.execute(f"""
+        INSERT INTO daily_stats (day, metric, key, count)
+        SELECT d.day, 'users', '', (SELECT COUNT(*) FROM daily_users u WHERE u.day = d.day)
+        FROM (SELECT DISTINCT {KST_DAY} AS day FROM conversation_history WHERE id > ? AND id <= ?) d
+        WHERE true
+        ON CONFLICT(day, metric, key) DO UPDATE SET count = excluded.count
+    """, (last_id, max_id))
+
+    set_state(cursor, "conversation_last_id", max_id)
+    return row_count
+
+
+def record_crawl_result(db_path: str, counts: Dict[str, int], day: Optional[str] = None):
+    """크롤링 결과(신규/변경 건수, 실행/실패 횟수)를 일별 집계에 누적"""
+    day = day or datetime.now(KST).strftime("%Y-%m-%d")
+    rows = [(day, "crawl", key, int(value)) for key, value in counts.items() if value]
+    if not rows:
+        return
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT INTO daily_stats (day, metric, key, count) VALUES (?, ?, ?, ?)" + _UPSERT,
+                rows
+            )
+    finally:
+        conn.close()
+
+
+def get_stats(db_path: str, date_from: str, date_to: str, top_n: int = 10) -> Dict:
+    """기간별 통계 (daily_stats 집계만 읽으므로 대화 기록 크기와 무관)"""
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT metric, key, SUM(count) FROM daily_stats
+            WHERE day BETWEEN ? AND ? AND metric IN ('intent', 'crawl')
+            GROUP BY metric, key
+        """, (date_from, date_to))
+        by_intent, crawl = {}, {}
+        for metric, key, count in cursor.fetchall():
+            (by_intent if metric == "intent" else crawl)[key] = count
+
+        cursor.execute("""
+            SELECT key, SUM(count) AS total FROM daily_stats
+            WHERE day BETWEEN ? AND ? AND metric = 'qa'
+            GROUP BY key ORDER BY total DESC LIMIT ?
+        """, (date_from, date_to, top_n))
+        top_qa = [{"qa_id": int(key), "count": count} for key, count in cursor.fetchall()]
+
+        cursor.execute("""
+            SELECT key, SUM(count) AS total FROM daily_stats
+            WHERE day BETWEEN ? AND ? AND metric = 'unmatched'
+            GROUP BY key ORDER BY total DESC LIMIT ?
+        """, (date_from, date_to, top_n))
+        top_unmatched = [{"message": key, "count": count} for key, count in cursor.fetchall()]
+
+        cursor.execute("SELECT COUNT(DISTINCT user_id) FROM daily_users WHERE day BETWEEN ? AND ?",
+                       (date_from, date_to))
+        unique_users = cursor.fetchone()[0]
+    finally:
+        conn.close()
+
+    requests = sum(by_intent.values())
+    unmatched = sum(by_intent.get(intent, 0) for intent in UNMATCHED_INTENTS)
+    return {
+        "from": date_from,
+        "to": date_to,
+        "requests": requests,
+        "requests_by_intent": by_intent,
+        "unique_users": unique_users,
+        "qa_hits": sum(by_intent.get(intent, 0) for intent in ("qa", "menu")),
+        "top_qa": top_qa,
+        "fallback_rate": round(unmatched / requests, 4) if requests else 0.0,
+        "top_unmatched": top_unmatched,
+        "crawl": crawl,
+    }
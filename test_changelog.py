@@ -0,0 +1,79 @@
+import gzip
+import json
+import os
+import sqlite3
+
+from changelog import ChangelogWriter, apply_changelogs, changelog_files, write_baseline
+from database import DatabaseManager
+
+
+def _rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        notices = conn.execute("SELECT ntt_sn, title, content FROM notices ORDER BY ntt_sn").fetchall()
+        meals = conn.execute("SELECT date, meal_type, menu, allergens FROM meals ORDER BY date, meal_type").fetchall()
+        return notices, meals
+    finally:
+        conn.close()
+
+
+def test_changelog_records_only_changes_and_rebuilds_db(tmp_path):
+    source_path = str(tmp_path / "source" / "school.db")
+    os.makedirs(os.path.dirname(source_path))
+    db = DatabaseManager(source_path, use_snapshot=False)
+    writer = ChangelogWriter(source_path)
+
+    changes = []
+    db.ingest_notices([{"ntt_sn": 1, "title": "수련회 안내", "content": "본문"},
+                       {"ntt_sn": 2, "title": "방학 안내", "content": "방학"}], changes=changes)
+    writer.append("notices", changes)
+    changes = []
+    db.ingest_meals([{"date": "2025-07-07", "meal_type": "중식", "menu": "현미밥",
+                      "allergens": {"우유": ["현미밥"]}}], changes=changes)
+    writer.append("meals", changes)
+
+    # 바뀐 공지만 다시 기록됨
+    changes = []
+    db.ingest_notices([{"ntt_sn": 1, "title": "수련회 안내", "content": "수정된 본문"},
+                       {"ntt_sn": 2, "title": "방학 안내", "content": "방학"}], changes=changes)
+    assert [(c["op"], c["row"]["ntt_sn"]) for c in changes] == [("update", 1)]
+    writer.append("notices", changes)
+
+    with gzip.open(writer.path, "rt", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [(r["table"], r["op"]) for r in records] == [
+        ("notices", "insert"), ("notices", "insert"), ("meals", "insert"), ("notices", "update")]
+    # 크롤링한 DB에는 이미 반영된 파일이므로 다시 적용하지 않음
+    assert apply_changelogs(source_path)["files"] == 0
+
+    # 변경 기록만으로 새 DB를 만들면 같은 내용이 됨
+    target_path = str(tmp_path / "target.db")
+    changelog_dir = os.path.dirname(writer.path)
+    assert apply_changelogs(target_path, changelog_dir) == {"files": 1, "notices": 2, "meals": 1}
+    assert _rows(target_path) == _rows(source_path)
+    assert apply_changelogs(target_path, changelog_dir)["files"] == 0
+    assert apply_changelogs(target_path, changelog_dir, rebuild=True)["files"] == 1
+    assert _rows(target_path) == _rows(source_path)
+
+
+def test_baseline_and_truncated_file(tmp_path):
+    source_path = str(tmp_path / "school.db")
+    db = DatabaseManager(source_path, use_snapshot=False)
+    db.ingest_notices([{"ntt_sn": 10, "title": "기존 공지", "content": "본문"}])
+    baseline = write_baseline(source_path)
+    changelog_dir = os.path.dirname(baseline)
+
+    # 쓰는 도중 중단되어 끝이 잘린 파일도 온전한 부분까지 반영
+    writer = ChangelogWriter(source_path, kind="crawl")
+    writer.file_name = "29990101T000000Z_crawl.jsonl.gz"
+    writer.path = os.path.join(changelog_dir, writer.file_name)
+    changes = []
+    db.ingest_notices([{"ntt_sn": 11, "title": "새 공지", "content": "새 본문"}], changes=changes)
+    writer.append("notices", changes)
+    with open(writer.path, "ab") as f:
+        f.write(gzip.compress(b'{"table": "notices", "op": "insert", "row": {"ntt_sn": 12, "title": "x"}}\n')[:20])
+
+    assert changelog_files(changelog_dir) == [os.path.basename(baseline), writer.file_name]
+    target_path = str(tmp_path / "target.db")
+    assert apply_changelogs(target_path, changelog_dir)["notices"] == 2
+    assert _rows(target_path)[0] == [(10, "기존 공지", "본문"), (11, "새 공지", "새 본문")]
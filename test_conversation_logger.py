@@ -0,0 +1,42 @@
+import sqlite3
+import time
+
+from database import DatabaseManager
+from conversation_logger import ConversationLogger
+
+
+def test_write_behind_batches_and_drains(tmp_path):
+    """큐에 쌓인 대화 기록이 close 시 모두 저장되는지 확인"""
+    db_path = str(tmp_path / "test.db")
+    DatabaseManager(db_path)
+
+    logger = ConversationLogger(db_path, flush_size=1000, flush_interval_ms=60000)
+    for i in range(120):
+        logger.log("user", f"질문 {i}", "답변", intent="qa", qa_id=i)
+
+    # 아직 저장 전 (배치 크기/주기 미도달)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM conversation_history").fetchone()[0] == 0
+
+    logger.close()
+    assert conn.execute("SELECT COUNT(*) FROM conversation_history").fetchone()[0] == 120
+    assert conn.execute("SELECT intent, qa_id FROM conversation_history WHERE message = '질문 7'").fetchone() == ("qa", 7)
+    conn.close()
+    assert logger.stats() == {"pending": 0, "written": 120, "dropped": 0}
+
+
+def test_flush_size_triggers_background_write(tmp_path):
+    """배치 크기에 도달하면 백그라운드 스레드가 바로 저장"""
+    db_path = str(tmp_path / "test.db")
+    DatabaseManager(db_path)
+
+    logger = ConversationLogger(db_path, flush_size=10, flush_interval_ms=60000)
+    for i in range(10):
+        logger.log("user", f"질문 {i}", "답변")
+
+    deadline = time.time() + 5
+    while logger.written < 10 and time.time() < deadline:
+        time.sleep(0.01)
+    assert logger.written == 10
+    logger.close()
+
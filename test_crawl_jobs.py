@@ -0,0 +1,46 @@
+import threading
+
+from crawl_jobs import CrawlJobManager
+
+
+def test_job_reports_progress_and_result():
+    release = threading.Event()
+
+    def target(progress):
+        progress("notices")
+        release.wait(5)
+        progress("done", notices=3)
+        return {"notices": 3, "meals": 0}
+
+    manager = CrawlJobManager(target)
+    job = manager.submit("manual")
+    # 실행 중에 다시 요청하면 같은 작업을 돌려줌
+    assert manager.submit("manual") is job
+
+    release.set()
+    status = manager.wait(job.id, timeout=5)
+    assert status["status"] == "succeeded"
+    assert status["progress"] == {"stage": "done", "notices": 3}
+    assert status["result"] == {"notices": 3, "meals": 0}
+    assert status["started_at"] and status["finished_at"]
+
+    assert manager.submit("scheduled").id != job.id
+    manager.shutdown()
+
+
+def test_failed_job_keeps_error_and_history_is_bounded():
+    def target(progress):
+        raise RuntimeError("목록 페이지 요청 실패")
+
+    manager = CrawlJobManager(target, max_history=2)
+    job_ids = []
+    for _ in range(4):
+        job = manager.submit()
+        manager.wait(job.id, timeout=5)
+        job_ids.append(job.id)
+
+    assert manager.get(job_ids[-1])["status"] == "failed"
+    assert manager.get(job_ids[-1])["error"] == "목록 페이지 요청 실패"
+    assert manager.get("missing") is None
+    assert len(manager.list()) == 2
+    manager.shutdown()
@@ -0,0 +1,39 @@
+import requests
+
+import incremental_notice_crawler
+from crawl_benchmark import run_benchmark
+from crawl_replay_server import start_replay_server
+
+
+def test_replay_server_serves_fixture_pages_with_etag():
+    server = start_replay_server(synthetic=15)
+    try:
+        url = server.base_url + "/na/ntt/selectNttList.do"
+        first = requests.get(url, params={"mi": "8476", "bbsId": "5794", "currPage": 3}, timeout=5)
+        assert first.status_code == 200
+        assert "가상 공지사항 1호" in first.text
+
+        again = requests.get(url, params={"currPage": 3}, headers={"If-None-Match": first.headers["ETag"]}, timeout=5)
+        assert again.status_code == 304
+
+        missing = requests.get(server.base_url + "/na/ntt/selectNttInfo.do", params={"nttSn": "1"}, timeout=5)
+        assert missing.status_code == 404
+        assert server.counts["not_modified"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_benchmark_crawls_replay_server_end_to_end():
+    previous = (incremental_notice_crawler._db, incremental_notice_crawler._changelog)
+    result = run_benchmark(synthetic=25, latency_ms=0, jitter_ms=0, rate=0)
+    # 벤치마크가 끝나면 크롤러 모듈은 원래 DB를 다시 사용
+    assert (incremental_notice_crawler._db, incremental_notice_crawler._changelog) == previous
+
+    phases = {phase["phase"]: phase for phase in result["phases"]}
+    # 저장된 공지 5건 + 가상 공지 25건
+    assert phases["notices_backfill"]["rows_ingested"]["notices"] == 30
+    assert phases["incremental_noop"]["rows_ingested"] == {"notices": 0, "meals": 0}
+    assert phases["meals_range"]["rows_ingested"]["meals"] == 6
+    assert result["final_rows"] == {"notices": 30, "meals": 6}
+    assert all(phase["seconds"] > 0 for phase in result["phases"])
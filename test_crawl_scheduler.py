@@ -0,0 +1,61 @@
+import time
+
+import pytest
+import requests
+
+from crawl_scheduler import AdaptiveTokenBucket, CrawlDeadlineExceeded, CrawlScheduler
+
+
+class StubResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_token_bucket_limits_rate_and_adapts():
+    bucket = AdaptiveTokenBucket(rate=50, min_rate=1, max_rate=60, target_latency=0.5, burst=1)
+    started = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.monotonic() - started >= 5 / 50 * 0.9
+
+    # 빠른 응답이면 조금씩 올리고, 오류나 느린 응답이면 절반으로 줄임
+    bucket.record(0.1, ok=True)
+    assert bucket.rate == 51
+    bucket.record(0.1, ok=False)
+    assert bucket.rate == 25.5
+    bucket.record(2.0, ok=True)
+    assert bucket.rate == 12.75
+    for _ in range(10):
+        bucket.record(0.1, ok=False)
+    assert bucket.rate == 1
+
+
+def test_retries_server_errors_with_backoff():
+    scheduler = CrawlScheduler(rate=0, max_retries=3, backoff_base=0.01, deadline_seconds=None)
+    responses = [StubResponse(503), StubResponse(500), StubResponse(200)]
+    assert scheduler.request("school.example", lambda: responses.pop(0)).status_code == 200
+    assert scheduler.retries == 2
+
+    # 4xx는 재시도하지 않음
+    assert scheduler.request("school.example", lambda: StubResponse(404)).status_code == 404
+    assert scheduler.retries == 2
+
+    def timeout():
+        raise requests.Timeout("read timeout")
+
+    with pytest.raises(requests.Timeout):
+        scheduler.request("school.example", timeout)
+    assert scheduler.retries == 5
+
+
+def test_deadline_stops_crawl():
+    scheduler = CrawlScheduler(rate=0, max_retries=5, backoff_base=1.0, deadline_seconds=0.2)
+    started = time.monotonic()
+    # 남은 시간보다 긴 백오프는 기다리지 않고 마지막 응답 반환
+    assert scheduler.request("school.example", lambda: StubResponse(503)).status_code == 503
+    assert time.monotonic() - started < 0.2
+
+    time.sleep(0.2)
+    with pytest.raises(CrawlDeadlineExceeded):
+        scheduler.request("school.example", lambda: StubResponse(200))
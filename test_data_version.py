@@ -0,0 +1,95 @@
+import os
+import threading
+
+import database
+from data_version import DataVersionWatcher, get_data_versions
+from database import DatabaseManager, get_snapshot, refresh_snapshot_in_background
+
+
+def test_ingest_bumps_version_only_on_change(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    db = DatabaseManager(db_path, use_snapshot=False)
+    assert get_data_versions(db_path) == {}
+
+    meals = [{"date": "2025-07-07", "meal_type": "중식", "menu": "현미밥"}]
+    db.ingest_meals(meals)
+    db.ingest_meals(meals)
+    db.ingest_notices([{"ntt_sn": 1, "title": "수련회 안내"}])
+    assert get_data_versions(db_path) == {"meals": 1, "notices": 1}
+
+
+def test_watcher_refreshes_changed_caches_once_per_poll(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    dataset = tmp_path / "dataset.json"
+    dataset.write_text("[]", encoding="utf-8")
+    web_db = DatabaseManager(db_path, use_snapshot=True)
+    crawler_db = DatabaseManager(db_path, use_snapshot=False)
+
+    watcher = DataVersionWatcher(db_path, interval=3600, files={"qa": [str(dataset)]})
+    calls = []
+    watcher.subscribe(("meals", "notices", "qa"), web_db.refresh_snapshot)
+    watcher.subscribe(("meals", "notices", "qa"), lambda: calls.append("snapshot"))
+    watcher.subscribe(("qa",), lambda: calls.append("qa"))
+
+    crawler_db.ingest_meals([{"date": "2025-07-07", "meal_type": "중식", "menu": "현미밥"}])
+    crawler_db.ingest_notices([{"ntt_sn": 1, "title": "수련회 안내"}])
+    # 확인 주기 전에는 DB를 읽지 않음
+    assert watcher.poll() == []
+    assert web_db.get_meal_info("2025-07-07") is None
+
+    assert watcher.poll(force=True) == ["meals", "notices"]
+    assert calls == ["snapshot"]
+    assert web_db.get_meal_info("2025-07-07") == "현미밥"
+    assert get_snapshot(db_path).get_latest_notices()[0]["title"] == "수련회 안내"
+    assert watcher.poll(force=True) == []
+
+    stat = os.stat(dataset)
+    os.utime(dataset, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert watcher.poll(force=True) == ["qa"]
+    assert calls == ["snapshot", "snapshot", "qa"]
+
+
+def test_background_refresh_keeps_old_snapshot_until_swap(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "test.db")
+    DatabaseManager(db_path, use_snapshot=True)
+    old = get_snapshot(db_path)
+    DatabaseManager(db_path, use_snapshot=False).ingest_notices([{"ntt_sn": 1, "title": "수련회 안내"}])
+
+    release = threading.Event()
+    builds = []
+    original = database.ReferenceSnapshot
+
+    def slow_snapshot(*args, **kwargs):
+        builds.append(1)
+        release.wait(2)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(database, "ReferenceSnapshot", slow_snapshot)
+    thread = refresh_snapshot_in_background(db_path)
+    # 만드는 중에 온 요청은 새 스레드 없이 끝난 뒤 한 번 더 만들도록 예약
+    assert refresh_snapshot_in_background(db_path) is None
+    assert get_snapshot(db_path) is old
+
+    release.set()
+    thread.join(5)
+    assert len(builds) == 2
+    assert get_snapshot(db_path).get_latest_notices()[0]["title"] == "수련회 안내"
+
+
+def test_failed_refresh_is_retried(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    db = DatabaseManager(db_path, use_snapshot=False)
+    watcher = DataVersionWatcher(db_path, interval=0)
+    attempts = []
+
+    def flaky_refresh():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("일시 오류")
+
+    watcher.subscribe(("notices",), flaky_refresh)
+    db.ingest_notices([{"ntt_sn": 1, "title": "수련회 안내"}])
+    assert watcher.poll() == ["notices"]
+    assert watcher.poll() == ["notices"]
+    assert watcher.poll() == []
+    assert len(attempts) == 2
@@ -0,0 +1,40 @@
+import sqlite3
+
+from database import DatabaseManager
+
+
+def test_ingest_notices_upserts_by_ntt_sn(tmp_path):
+    db = DatabaseManager(str(tmp_path / "test.db"), use_snapshot=False)
+    url = "https://pajuwaseok-e.goepj.kr/pajuwaseok-e/na/ntt/selectNttInfo.do?mi=8476&bbsId=5794&nttSn={}"
+    notices = [
+        {"title": "수련회 안내", "content": "본문", "url": url.format(100), "created_at": "2025-05-01"},
+        # 매년 같은 제목으로 올라오는 공지도 nttSn이 다르면 별도 저장
+        {"title": "수련회 안내", "content": "올해 본문", "url": url.format(200), "created_at": "2026-05-01"},
+        {"title": "번호 없는 공지", "url": None},
+    ]
+    assert db.ingest_notices(notices) == {"inserted": 2, "updated": 0, "skipped": 1}
+
+    notices[0]["content"] = "수정된 본문"
+    assert db.ingest_notices(notices) == {"inserted": 0, "updated": 1, "skipped": 1}
+    assert db.ingest_notices(notices) == {"inserted": 0, "updated": 0, "skipped": 1}
+    assert sorted(r["content"] for r in db.search_notices("수련회")) == ["수정된 본문", "올해 본문"]
+
+
+def test_ingest_meals_keeps_every_meal_type(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    db = DatabaseManager(db_path, use_snapshot=False)
+    meals = [
+        {"date": "2025-07-07", "meal_type": "중식", "menu": "현미밥", "image_url": "/img/1.jpg"},
+        {"date": "2025-07-07", "meal_type": "석식", "menu": "비빔밥", "image_url": ""},
+    ]
+    assert db.ingest_meals(meals) == {"inserted": 2, "updated": 0}
+
+    # 빈 이미지로 다시 수집되어도 기존 이미지는 유지
+    meals[0]["image_url"] = ""
+    meals[1]["menu"] = "볶음밥"
+    assert db.ingest_meals(meals) == {"inserted": 0, "updated": 1}
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT meal_type, menu, image_url FROM meals ORDER BY meal_type").fetchall()
+    conn.close()
+    assert rows == [("석식", "볶음밥", None), ("중식", "현미밥", "/img/1.jpg")]
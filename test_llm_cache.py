@@ -0,0 +1,68 @@
+import time
+
+from database import DatabaseManager
+from llm_cache import LLMCache
+
+
+def _cache(tmp_path, version, **options):
+    db_path = str(tmp_path / "test.db")
+    DatabaseManager(db_path, use_snapshot=False)
+    return LLMCache(db_path, version_func=lambda: version[0], version_ttl=0, **options)
+
+
+def test_exact_and_near_duplicate_hits(tmp_path):
+    version = ["v1"]
+    cache = _cache(tmp_path, version)
+    assert cache.get("방과후 수업 신청은 어떻게 하나요?") is None
+    cache.put("방과후 수업 신청은 어떻게 하나요?", "학교 홈페이지에서 신청합니다.", tokens=300)
+
+    # 띄어쓰기/문장부호만 다른 질문
+    assert cache.get("방과후수업 신청은 어떻게 하나요") == "학교 홈페이지에서 신청합니다."
+    # 어미만 다른 질문
+    assert cache.get("방과후 수업 신청은 어떻게 하죠?") == "학교 홈페이지에서 신청합니다."
+    # 짧은 질문은 한 글자 차이로도 뜻이 달라지므로 정확히 같을 때만 사용
+    cache.put("1학년 급식 시간", "12시입니다.")
+    assert cache.get("2학년 급식 시간") is None
+    assert cache.get("수영장 이용 시간 알려줘") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["near_hits"], stats["misses"]) == (1, 1, 3)
+    assert stats["tokens_saved"] == 600
+
+    # 다른 프로세스에서도 SQLite에 저장된 답변 사용
+    other = LLMCache(cache.db_path, version_func=lambda: version[0])
+    assert other.get("방과후 수업 신청은 어떻게 하나요?") == "학교 홈페이지에서 신청합니다."
+
+    # 데이터 버전이 바뀌면 이전 답변은 쓰지 않음
+    version[0] = "v2"
+    assert cache.get("방과후 수업 신청은 어떻게 하나요?") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_questions_differing_only_in_numbers_are_not_near_duplicates(tmp_path):
+    cache = _cache(tmp_path, ["v1"])
+    cache.put("1학년 현장체험학습 날짜 알려줘", "1학년은 5월 3일입니다")
+    cache.put("3반 담임 선생님 연락처가 뭐예요", "3반 담임 선생님 번호는 031-000-0003입니다")
+
+    assert cache.get("2학년 현장체험학습 날짜 알려줘") is None
+    assert cache.get("4반 담임 선생님 연락처가 뭐예요") is None
+    # 숫자가 같으면 표현이 조금 달라도 같은 질문으로 봄
+    assert cache.get("1학년 현장체험학습 날짜 알려주세요") == "1학년은 5월 3일입니다"
+    assert cache.stats()["near_hits"] == 1
+
+
+def test_ttl_and_size_eviction(tmp_path):
+    version = ["v1"]
+    cache = _cache(tmp_path, version, max_entries=2, ttl_seconds=3600)
+    cache.put("급식 메뉴 알려줘", "답1")
+    cache.put("전학 서류 안내", "답2")
+    time.sleep(0.01)
+    assert cache.get("급식 메뉴 알려줘") == "답1"
+    cache.put("방과후 신청 방법", "답3")
+    # 가장 오래 쓰이지 않은 항목이 제거됨
+    assert cache.get("전학 서류 안내") is None
+    assert cache.get("급식 메뉴 알려줘") == "답1"
+    assert cache.stats()["evictions"] == 1
+
+    cache.ttl_seconds = 0
+    assert cache.get("방과후 신청 방법") is None
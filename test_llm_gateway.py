@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import llm_gateway
+from llm_gateway import CircuitBreaker, LLMGateway, LLMUnavailable
+
+
+def _chunk(content):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class FakeStream:
+    def __init__(self, contents, delay=0.0):
+        self.contents = contents
+        self.delay = delay
+        self.sent = 0
+        self.closed = False
+
+    async def _chunks(self):
+        for content in self.contents:
+            await asyncio.sleep(self.delay)
+            self.sent += 1
+            yield _chunk(content)
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    def __init__(self, make_stream):
+        self.make_stream = make_stream
+        self.requests = []
+        self.streams = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        stream = self.make_stream()
+        self.streams.append(stream)
+        return stream
+
+
+def _gateway(make_stream, **options):
+    client = FakeClient(make_stream)
+    return LLMGateway(client_factory=lambda: client, **options), client
+
+
+def test_streams_and_closes_early():
+    gateway, client = _gateway(lambda: FakeStream(["안녕하세요. " * 50] + ["남은 내용"] * 50))
+    try:
+        text, reason = gateway.complete([{"role": "user", "content": "질문"}], max_tokens=600)
+        assert text.startswith("안녕하세요.") and len(text) <= 1000
+        assert reason == "sentence"
+        assert client.requests[0]["stream"] is True and client.requests[0]["max_tokens"] == 600
+        assert client.streams[0].closed and client.streams[0].sent == 1
+        stats = gateway.stats()
+        assert (stats["calls"], stats["succeeded"], stats["breaker_state"]) == (1, 1, "closed")
+        assert stats["latency_p95_ms"] is not None
+    finally:
+        gateway.close()
+
+
+def test_breaker_opens_after_timeouts_and_recovers():
+    delay = [1.0]
+    gateway, client = _gateway(lambda: FakeStream(["답변입니다."], delay=delay[0]), timeout=0.05,
+                               breaker=CircuitBreaker(failure_threshold=2, reset_seconds=0.2))
+    try:
+        for _ in range(2):
+            with pytest.raises(TimeoutError):
+                gateway.complete([{"role": "user", "content": "질문"}])
+        # 차단기가 열리면 OpenAI를 부르지 않고 바로 실패
+        started = time.monotonic()
+        with pytest.raises(LLMUnavailable):
+            gateway.complete([{"role": "user", "content": "질문"}])
+        assert time.monotonic() - started < 0.05
+        assert len(client.requests) == 2
+
+        time.sleep(0.25)
+        delay[0] = 0.0
+        assert gateway.complete([{"role": "user", "content": "질문"}]) == ("답변입니다.", "complete")
+        stats = gateway.stats()
+        assert (stats["timeouts"], stats["rejected_open"], stats["breaker_opened"]) == (2, 1, 1)
+        assert stats["breaker_state"] == "closed"
+    finally:
+        gateway.close()
+
+
+def test_concurrency_limit_rejects_when_queue_is_full():
+    gateway, _ = _gateway(lambda: FakeStream(["천천히 오는 답변입니다."], delay=0.3),
+                          max_concurrency=1, queue_timeout=0.05)
+    try:
+        slow = threading.Thread(target=gateway.complete, args=([{"role": "user", "content": "질문"}],))
+        slow.start()
+        time.sleep(0.05)
+        with pytest.raises(LLMUnavailable):
+            gateway.complete([{"role": "user", "content": "다른 질문"}])
+        slow.join()
+        stats = gateway.stats()
+        assert (stats["succeeded"], stats["rejected_busy"], stats["in_flight"]) == (1, 1, 0)
+        assert stats["breaker_state"] == "closed"
+    finally:
+        gateway.close()
+
+
+def test_call_openai_api_falls_back_when_gateway_is_down(monkeypatch, tmp_path):
+    from ai_logic import AILogic
+
+    gateway, client = _gateway(lambda: FakeStream(["체육관은 평일 오후 6시까지 개방합니다. "]))
+    monkeypatch.setattr(llm_gateway, "_gateway", gateway)
+    try:
+        # 저장소의 school_data.db를 건드리지 않도록 임시 DB 사용
+        ai = AILogic(str(tmp_path / "test.db"))
+        ai.llm_cache = None
+        success, answer = ai.call_openai_api("와석초 체육관 개방 시간이 궁금해요", "gateway_test_user")
+        assert (success, answer) == (True, "체육관은 평일 오후 6시까지 개방합니다.")
+        assert client.requests[0]["messages"][0]["role"] == "system"
+
+        gateway.breaker.state, gateway.breaker.opened_at = "open", time.monotonic()
+        success, answer = ai.call_openai_api("와석초 체육관 개방 시간이 궁금해요", "gateway_test_user")
+        assert not success and answer.startswith("죄송합니다")
+        assert len(client.requests) == 1
+    finally:
+        gateway.close()
@@ -0,0 +1,49 @@
+from llm_stream import StreamCollector
+
+
+def collect(deltas, max_chars, min_chars):
+    """게이트웨이와 같은 방식으로 조각을 넣다가 멈출 시점이 오면 중단"""
+    collector = StreamCollector(max_chars, min_chars)
+    for delta in deltas:
+        result = collector.feed(delta)
+        if result is not None:
+            return result
+    return collector.finish()
+
+
+def test_stops_at_sentence_end_after_min_length():
+    deltas = ["방과후 신청은 ", "홈페이지에서 합니다.", " 기간은 3.", "5주입니다.", " 더 궁금한 점은", " 교무실로 문의하세요."]
+    text, reason = collect(iter(deltas), max_chars=1000, min_chars=20)
+    # 조각 경계에 걸친 문장 끝도 찾고, 소수점에서는 멈추지 않음
+    assert (text, reason) == ("방과후 신청은 홈페이지에서 합니다. 기간은 3.5주입니다.", "sentence")
+
+
+def test_stops_at_limit_and_complete():
+    consumed = []
+
+    def deltas():
+        for i in range(100):
+            consumed.append(i)
+            yield "가나다라마. " if i == 2 else "가나다라마"
+
+    text, reason = collect(deltas(), max_chars=30, min_chars=25)
+    assert (text, reason) == ("가나다라마" * 2 + "가나다라마.", "limit")
+    assert len(consumed) == 6
+
+    text, reason = collect(iter(["가" * 40]), max_chars=30, min_chars=10)
+    assert (text, reason) == ("가" * 27 + "...", "limit")
+    assert collect(iter(["짧은 답변입니다"]), max_chars=30, min_chars=20) == ("짧은 답변입니다", "complete")
+
+
+
+def test_expire_uses_text_received_before_deadline():
+    collector = StreamCollector(max_chars=1000, min_chars=300, time_budget=0)
+    assert collector.remaining() == 0
+    assert collector.expire() is None
+
+    collector.feed("급식은 12시에 시작합니다. 메뉴는 현미")
+    assert collector.expire() == ("급식은 12시에 시작합니다.", "deadline")
+
+    collector = StreamCollector(max_chars=1000, min_chars=300, time_budget=0)
+    collector.feed("문장이 끝나지 않은")
+    assert collector.expire() == ("문장이 끝나지 않은...", "deadline")
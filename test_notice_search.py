@@ -0,0 +1,75 @@
+import sqlite3
+
+from database import DatabaseManager, extract_notice_search_terms
+
+
+def test_search_terms_strip_stopwords_and_josa():
+    assert extract_notice_search_terms("수련회는 언제 안내해?") == ["수련회", "안내해"]
+    assert extract_notice_search_terms("현장체험학습 공지") == ["현장체험학습"]
+
+
+def test_fts_stays_in_sync_with_raw_inserts(tmp_path):
+    """크롤러가 sqlite3로 직접 INSERT/UPDATE 해도 검색 인덱스가 따라감"""
+    db_path = str(tmp_path / "test.db")
+    db = DatabaseManager(db_path, use_snapshot=False)
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO notices (title, content, url, created_at) VALUES (?, ?, ?, ?)",
+        [
+            ("6학년 수련회 안내", "수련회 일정과 준비물을 안내합니다.", "u1", "2025-05-01"),
+            ("현장체험학습 신청 안내", "본문에 수련회 언급", "u2", "2025-05-02"),
+            ("여름방학 안내", "방학 기간 안내", "u3", "2025-07-01"),
+        ]
+    )
+    conn.commit()
+
+    results = db.search_notices("수련회 안내")
+    assert [r["url"] for r in results] == ["u1", "u2"]  # 제목 일치가 본문 일치보다 우선
+
+    conn.execute("UPDATE notices SET title = '6학년 수학여행 안내', content = '' WHERE url = 'u1'")
+    conn.commit()
+    conn.close()
+    assert [r["url"] for r in db.search_notices("수련회")] == ["u2"]
+
+
+def test_snapshot_serves_reads_until_refreshed(tmp_path):
+    """스냅샷은 교체 전까지 이전 버전을 그대로 보여줌"""
+    db_path = str(tmp_path / "test.db")
+    db = DatabaseManager(db_path)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO notices (title, content, url, created_at) VALUES ('운동회 안내', '', 'u1', '2025-05-01')")
+    conn.execute("INSERT INTO meals (date, meal_type, menu) VALUES ('2025-05-01', '중식', '비빔밥')")
+    conn.commit()
+    conn.close()
+
+    assert db.search_notices("운동회") == []
+    assert db.get_meal_info("2025-05-01") is None
+
+    db.refresh_snapshot()
+    assert [r["url"] for r in db.search_notices("운동회")] == ["u1"]
+    assert db.get_meal_info("2025-05-01") == "비빔밥"
+    assert db.get_latest_notices(1)[0]["title"] == "운동회 안내"
+
+
+def test_unrelated_messages_pass_only_with_notice_hits(tmp_path):
+    """학교 키워드가 없는 질문은 공지 검색 결과가 있을 때만 답변 (OpenAI로 넘기지 않음)"""
+    from ai_logic import AILogic
+
+    db_path = str(tmp_path / "test.db")
+    DatabaseManager(db_path, use_snapshot=False).ingest_notices([
+        {"ntt_sn": 1, "title": "6학년 수련회 안내", "content": "수련회 준비물을 안내합니다.", "url": "u1"}
+    ])
+    ai = AILogic(db_path)
+
+    for message in ("비트코인 투자 안내해줘", "롤 공략 알림", "비트코인 소식"):
+        assert not ai.is_school_related(message)
+        success, response = ai.process_message(message, "search_test_user")
+        assert not success
+        assert response["text"] == "와석초등학교 관련 질문에만 답변할 수 있습니다."
+
+    success, response = ai.process_message("수련회 준비물", "search_test_user")
+    assert success
+    assert "6학년 수련회 안내" in response["text"]
+    assert response["link"] == "u1"
@@ -0,0 +1,91 @@
+import time
+
+import openai
+import pytest
+from openai import AsyncOpenAI
+
+from llm_gateway import CircuitBreaker, LLMGateway, LLMUnavailable
+from openai_stub_server import LatencyModel, start_stub_server
+
+
+def _gateway(server, **options):
+    return LLMGateway(client_factory=lambda: AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0),
+                      **options)
+
+
+def test_stub_serves_canned_and_echo_answers():
+    server = start_stub_server(answers={"급식": "급식은 12시에 시작합니다."}, mode="canned")
+    try:
+        client = openai.OpenAI(base_url=server.base_url, api_key="test", max_retries=0)
+        reply = client.chat.completions.create(model="stub", messages=[{"role": "user", "content": "급식 시간?"}])
+        assert reply.choices[0].message.content == "급식은 12시에 시작합니다."
+
+        server.mode = "echo"
+        chunks = client.chat.completions.create(model="stub", stream=True,
+                                                messages=[{"role": "user", "content": "따라 해 주세요"}])
+        assert "".join(chunk.choices[0].delta.content or "" for chunk in chunks) == "따라 해 주세요"
+        assert server.counts["requests"] == 2 and server.counts["streamed"] == 1
+    finally:
+        server.stop()
+
+
+def test_gateway_stops_stream_early_against_stub():
+    server = start_stub_server(default_answer="안녕하세요. " * 200, chunk_chars=20, chunk_delay_ms=1)
+    gateway = _gateway(server)
+    try:
+        text, reason = gateway.complete([{"role": "user", "content": "질문"}])
+        assert reason == "sentence" and text.startswith("안녕하세요.")
+        time.sleep(0.1)
+        # 필요한 만큼만 받고 연결을 닫아 나머지는 보내지 않음
+        assert server.counts["client_closed"] == 1
+        assert server.counts["completion_chars"] < 1400
+    finally:
+        gateway.close()
+        server.stop()
+
+
+def test_slow_stream_returns_received_text_at_deadline():
+    # 초당 약 100자로 꾸준히 오지만 제한 시간 안에 최소 길이(300자)에 못 미치는 응답
+    server = start_stub_server(default_answer="급식은 12시에 시작합니다. " * 30, chunk_chars=10, chunk_delay_ms=100)
+    gateway = _gateway(server, timeout=1.0, breaker=CircuitBreaker(failure_threshold=2, reset_seconds=60))
+    try:
+        for _ in range(2):
+            text, reason = gateway.complete([{"role": "user", "content": "질문"}])
+            assert reason == "deadline"
+            assert text.startswith("급식은 12시에") and text.endswith("시작합니다.")
+            assert 16 <= len(text) < 300
+        # 받은 내용이 있으면 실패로 세지 않으므로 차단기는 닫힌 채로 유지
+        stats = gateway.stats()
+        assert (stats["succeeded"], stats["failed"], stats["deadline_cuts"]) == (2, 0, 2)
+        assert stats["breaker_state"] == "closed"
+    finally:
+        gateway.close()
+        server.stop()
+
+
+def test_injected_errors_and_timeouts_open_breaker():
+    server = start_stub_server(error_rate=0.5, timeout_rate=0.5, hang_seconds=5, seed=1)
+    gateway = _gateway(server, timeout=0.3, breaker=CircuitBreaker(failure_threshold=3, reset_seconds=60))
+    try:
+        for _ in range(3):
+            with pytest.raises(Exception) as raised:
+                gateway.complete([{"role": "user", "content": "질문"}])
+            assert not isinstance(raised.value, LLMUnavailable)
+        with pytest.raises(LLMUnavailable):
+            gateway.complete([{"role": "user", "content": "질문"}])
+        injected = server.counts["errors_injected"] + server.counts["timeouts_injected"]
+        assert injected == server.counts["requests"] == 3
+        assert gateway.stats()["breaker_state"] == "open"
+    finally:
+        gateway.close()
+        server.stop()
+
+
+def test_latency_model_specs():
+    import random
+    rng = random.Random(0)
+    assert LatencyModel("fixed:200").sample(rng) == 0.2
+    assert 0.1 <= LatencyModel("uniform:100,300").sample(rng) <= 0.3
+    assert LatencyModel("normal:200,50").sample(rng) >= 0
+    with pytest.raises(ValueError):
+        LatencyModel("pareto:1")
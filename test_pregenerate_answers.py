@@ -0,0 +1,96 @@
+import json
+
+from openai import AsyncOpenAI
+
+from ai_logic import AILogic
+from conversation_logger import ConversationLogger
+from database import DatabaseManager
+from llm_gateway import LLMGateway
+from openai_stub_server import start_stub_server
+from pregenerate_answers import build_review, cluster_utterances, draft_answers, merge_review
+
+QA_DATA = [{"question": "방과후 신청 방법", "answer": "가정통신문을 확인해 주세요.", "category": "방과후_늘봄교실"}]
+
+
+def _review_db(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    DatabaseManager(db_path, use_snapshot=False)
+    logger = ConversationLogger(db_path, flush_size=1000, flush_interval_ms=60000)
+    for _ in range(3):
+        logger.log("u1", "수영장 있어요?", "모름", intent="fallback")
+    logger.log("u2", "수영장 있어?", "수영장은 없습니다.", intent="openai")
+    logger.log("u3", "수영장 있어요", "모름", intent="fallback")
+    logger.log("u4", "졸업식 언제예요?", "모름", intent="fallback")
+    logger.log("u4", "졸업식 언제예요", "모름", intent="fallback")
+    logger.log("u5", "방과후 신청 방법", "가정통신문을 확인해 주세요.", intent="fallback")
+    logger.log("u5", "급식", "메뉴", intent="meal")
+    logger.log("u6", "동아리 종류", "모름", intent="fallback")
+    logger.close()
+    return db_path
+
+
+def test_cluster_utterances_groups_similar_questions_by_frequency():
+    clusters = cluster_utterances([("졸업식 언제", 2), ("수영장 있어요?", 3), ("수영장 있어?", 1),
+                                   ("수영장 있어요", 1)])
+    assert [cluster["question"] for cluster in clusters] == ["수영장 있어요?", "졸업식 언제"]
+    assert clusters[0]["count"] == 5
+    assert clusters[0]["variants"][0] == ("수영장 있어요?", 3)
+
+
+def test_build_review_ranks_unmatched_clusters_and_skips_known_qa(tmp_path):
+    db_path = _review_db(tmp_path)
+    review = build_review(db_path, min_count=2, qa_data=QA_DATA)
+
+    entries = review["entries"]
+    assert [entry["question"] for entry in entries] == ["수영장 있어요?", "졸업식 언제예요?"]
+    assert entries[0]["count"] == 5
+    assert {variant["text"] for variant in entries[0]["variants"]} == {"수영장 있어?", "수영장 있어요"}
+    # 실제로 나갔던 OpenAI 답변을 초안으로 사용
+    assert entries[0]["answer"] == "수영장은 없습니다."
+    assert entries[0]["answer_source"] == "history"
+    assert entries[1]["answer"] == ""
+    assert not any(entry["approved"] for entry in entries)
+
+
+def test_draft_answers_fills_missing_answers_in_batch(tmp_path):
+    db_path = _review_db(tmp_path)
+    review = build_review(db_path, min_count=2, qa_data=QA_DATA)
+
+    server = start_stub_server(answers={"졸업식": "졸업식은 2월에 열립니다."})
+    gateway = LLMGateway(client_factory=lambda: AsyncOpenAI(api_key="test", base_url=server.base_url, max_retries=0),
+                         max_concurrency=2, timeout=5, queue_timeout=5)
+    try:
+        result = draft_answers(review, ai=AILogic(db_path), gateway=gateway)
+    finally:
+        gateway.close()
+        server.stop()
+
+    assert result == {"requested": 1, "drafted": 1, "failed": 0}
+    assert review["entries"][0]["answer"] == "수영장은 없습니다."
+    assert review["entries"][1]["answer"] == "졸업식은 2월에 열립니다."
+    assert review["entries"][1]["answer_source"] == "llm"
+
+
+def test_merge_review_appends_approved_entries_with_backup(tmp_path):
+    dataset_path = tmp_path / "school_dataset.json"
+    dataset_path.write_text(json.dumps(QA_DATA, ensure_ascii=False), encoding="utf-8")
+    review_path = tmp_path / "review.json"
+    review_path.write_text(json.dumps({"entries": [
+        {"approved": True, "question": "수영장 있어요?", "answer": "수영장은 없습니다.", "category": "초등학교_학교시설",
+         "variants": [{"text": "수영장 있어?", "count": 1}, {"text": "방과후 신청 방법", "count": 1}]},
+        {"approved": False, "question": "졸업식 언제예요?", "answer": "2월입니다.", "category": "미분류", "variants": []},
+        {"approved": True, "question": "동아리 종류", "answer": "", "category": "미분류", "variants": []},
+    ]}, ensure_ascii=False), encoding="utf-8")
+
+    result = merge_review(str(review_path), str(dataset_path), str(tmp_path / "school_dataset.qa.bin"))
+
+    assert result["approved"] == 1
+    assert result["added"] == 2
+    assert result["skipped"] == 1
+    merged = json.loads(dataset_path.read_text(encoding="utf-8"))
+    assert merged[0] == QA_DATA[0]
+    assert merged[1:] == [
+        {"question": "수영장 있어요?", "answer": "수영장은 없습니다.", "category": "초등학교_학교시설"},
+        {"question": "수영장 있어?", "answer": "수영장은 없습니다.", "category": "초등학교_학교시설"},
+    ]
+    assert json.loads(open(result["backup"], encoding="utf-8").read()) == QA_DATA
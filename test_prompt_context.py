@@ -0,0 +1,43 @@
+from prompt_context import estimate_tokens, pack_context, truncate_to_tokens
+
+
+def test_estimate_tokens_counts_hangul_per_syllable():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("급식 메뉴") == 4
+    assert estimate_tokens("menu") == 1
+    assert estimate_tokens("2025-07-07") == 5
+
+
+def test_pack_context_respects_budget_and_order():
+    items = ["가" * 30, "나" * 30, "다" * 100]
+    text, count = pack_context(items, budget=70)
+    assert count == 2
+    assert text == "가" * 30 + "\n\n" + "나" * 30
+    assert estimate_tokens(text) <= 70
+
+    # 남은 공간이 충분하면 긴 항목은 잘라서 담음
+    text, count = pack_context(items, budget=120)
+    assert count == 3
+    assert text.endswith("…")
+    assert estimate_tokens(text) <= 120
+
+    assert truncate_to_tokens("짧은 글", 10) == "짧은 글"
+
+
+def test_rag_messages_include_matching_qa_within_budget(tmp_path):
+    from ai_logic import AILogic
+    from config import RAG_CONTEXT_TOKENS
+
+    # 저장소의 school_data.db를 건드리지 않도록 임시 DB 사용
+    ai = AILogic(str(tmp_path / "test.db"))
+    ai._ensure_initialized()
+    question = ai.qa_data[0]["question"]
+
+    messages, count = ai.build_rag_messages(question)
+    assert count >= 1
+    assert messages[0]["role"] == "system"
+    assert messages[0]["content"].startswith(ai.get_system_prompt())
+    assert f"[자주 묻는 질문] {question}" in messages[0]["content"]
+    context = messages[0]["content"][len(ai.get_system_prompt()):]
+    assert estimate_tokens(context) <= RAG_CONTEXT_TOKENS + 20
+    assert messages[-1] == {"role": "user", "content": question}
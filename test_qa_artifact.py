@@ -0,0 +1,39 @@
+import json
+
+from qa_artifact import build_artifact, load_artifact
+
+
+def _write_dataset(path, questions):
+    data = [{"question": q, "answer": f"{q} 답변", "category": "초등"} for q in questions]
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+def test_artifact_roundtrip_and_index(tmp_path):
+    dataset = tmp_path / "dataset.json"
+    artifact = tmp_path / "dataset.qa.bin"
+    _write_dataset(dataset, ["방과후 신청 방법은?", "급식 메뉴 알려줘", "전학 절차가 궁금해요"])
+    build_artifact(str(dataset), str(artifact))
+
+    qa_data, index = load_artifact(str(artifact), str(dataset))
+    assert [qa["id"] for qa in qa_data] == [1, 2, 3]
+    assert index.find_exact("방과후 신청 방법은") == 0
+    assert index.search("전학 절차", k=1)[0][0] == 2
+
+
+def test_artifact_rejected_when_stale_or_corrupt(tmp_path):
+    dataset = tmp_path / "dataset.json"
+    artifact = tmp_path / "dataset.qa.bin"
+    _write_dataset(dataset, ["방과후 신청 방법은?"])
+    build_artifact(str(dataset), str(artifact))
+
+    # 원본 JSON이 바뀌면 JSON으로 대체
+    _write_dataset(dataset, ["방과후 신청 방법은?", "새 질문"])
+    assert load_artifact(str(artifact), str(dataset)) is None
+
+    # payload가 손상되면 체크섬 오류
+    build_artifact(str(dataset), str(artifact))
+    raw = bytearray(artifact.read_bytes())
+    raw[-1] ^= 0xFF
+    artifact.write_bytes(bytes(raw))
+    assert load_artifact(str(artifact), str(dataset)) is None
+    assert load_artifact(str(tmp_path / "missing.bin"), str(dataset)) is None
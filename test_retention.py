@@ -0,0 +1,60 @@
+import gzip
+import json
+import sqlite3
+
+from database import DatabaseManager
+from retention import rollup_conversations, archive_conversations, incremental_vacuum
+
+
+def _insert(conn, rows):
+    conn.executemany(
+        "INSERT INTO conversation_history (user_id, message, response, intent, qa_id, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+        rows
+    )
+    conn.commit()
+
+
+def test_rollup_is_incremental(tmp_path):
+    """롤업은 이미 집계한 행을 다시 세지 않음"""
+    db_path = str(tmp_path / "test.db")
+    DatabaseManager(db_path)
+    conn = sqlite3.connect(db_path)
+    _insert(conn, [
+        ("u1", "급식 알려줘", "메뉴", "meal", None, "2025-07-01 01:00:00"),
+        ("u2", "방과후 신청", "답변", "qa", 3, "2025-07-01 02:00:00"),
+        ("u3", "수영장 있어?", "모름", "fallback", None, "2025-07-01 03:00:00"),
+    ])
+    assert rollup_conversations(db_path) == 3
+    _insert(conn, [("u1", "방과후 신청", "답변", "qa", 3, "2025-07-01 04:00:00")])
+    assert rollup_conversations(db_path) == 1
+    assert rollup_conversations(db_path) == 0
+
+    stats = {(m, k): c for m, k, c in conn.execute(
+        "SELECT metric, key, count FROM daily_stats WHERE day = '2025-07-01'")}
+    assert stats[("intent", "qa")] == 2
+    assert stats[("qa", "3")] == 2
+    assert stats[("unmatched", "수영장 있어?")] == 1
+    conn.close()
+
+
+def test_archive_moves_only_rolled_up_old_rows(tmp_path):
+    """보관 기간이 지나고 롤업된 행만 월별 압축 파일로 이동"""
+    db_path = str(tmp_path / "test.db")
+    DatabaseManager(db_path)
+    conn = sqlite3.connect(db_path)
+    _insert(conn, [("u1", "오래된 질문", "답변", "qa", 1, "2020-01-15 00:00:00")])
+    rollup_conversations(db_path)
+    _insert(conn, [("u2", "롤업 전 질문", "답변", "qa", 1, "2020-01-16 00:00:00")])
+
+    # 아카이브 폴더는 작업 디렉터리가 아니라 DB 파일 옆에 생성
+    assert archive_conversations(db_path, retention_days=30) == 1
+    with gzip.open(tmp_path / "archive" / "conversation_history_2020-01.jsonl.gz", "rt", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [r["message"] for r in records] == ["오래된 질문"]
+    assert conn.execute("SELECT message FROM conversation_history").fetchall() == [("롤업 전 질문",)]
+    conn.close()
+
+    incremental_vacuum(db_path)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    conn.close()
@@ -0,0 +1,286 @@
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+import incremental_notice_crawler
+from crawl_scheduler import CrawlScheduler
+from database import DatabaseManager
+from school_crawler import CrawlCheckpoint, CrawlState, SchoolCrawler, parse_meal_week, parse_notice_detail, parse_notice_list
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "crawler")
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), "rb") as f:
+        return f.read()
+
+
+class FixtureResponse:
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error")
+
+
+class FixtureSession:
+    """저장된 HTML을 돌려주는 requests.Session 대용"""
+
+    def __init__(self):
+        self.headers = {}
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        params = params or {}
+        path = urlparse(url).path
+        self.requests.append((path, dict(params)))
+        if path.endswith("selectNttList.do"):
+            page = int(params.get("currPage", 1))
+            name = f"notice_list_page{page}.html" if page <= 2 else "notice_list_empty.html"
+        elif path.endswith("selectNttInfo.do"):
+            name = f"notice_detail_{params['nttSn']}.html"
+        elif path.endswith("selectFoodMenuView.do"):
+            name = "meal_week_2025-07-07.html" if params.get("schDt") == "2025-07-06" else "notice_list_empty.html"
+        else:
+            return FixtureResponse(b"", 404)
+        if not os.path.exists(os.path.join(FIXTURE_DIR, name)):
+            return FixtureResponse(b"", 404)
+        return FixtureResponse(read_fixture(name))
+
+
+def test_parse_notice_list_and_detail():
+    notices = parse_notice_list(read_fixture("notice_list_page1.html"))
+    # nttSn은 data-id, href, onclick 어느 형태로 있어도 추출
+    assert [(n["ntt_sn"], n["created_at"]) for n in notices] == [
+        (1287106, "2025-07-15"), (1286905, "2025-07-10"), (1286511, "2025-07-03")
+    ]
+    assert notices[0]["title"] == "2025년 1학기 선택형 프로그램 만족도 조사 결과 보고"
+    assert parse_notice_list(read_fixture("notice_list_empty.html")) == []
+
+    content = parse_notice_detail(read_fixture("notice_detail_1287106.html"))
+    assert content.splitlines()[1:3] == ["1. 조사 기간: 2025. 7. 1.(화) ~ 7. 8.(화)", "2. 조사 대상: 1~6학년 학부모"]
+    assert "만족도 조사 결과.hwp" not in content
+
+
+def test_parse_meal_week():
+    meals, next_week = parse_meal_week(read_fixture("meal_week_2025-07-07.html"))
+    assert meals[2]["allergens"][2] == {"dish": "멘보샤(칠리소스)", "codes": [1, 5, 6, 9, 13]}
+    assert meals[0]["allergens"][0] == {"dish": "현미밥", "codes": []}
+    assert next_week == "2025-07-14"
+    lunch = [m for m in meals if m["meal_type"] == "중식"]
+    assert [m["date"] for m in lunch] == ["2025-07-07", "2025-07-08", "2025-07-09", "2025-07-10", "2025-07-11"]
+    assert lunch[0]["menu"].splitlines()[:2] == ["현미밥", "맑은아귀탕 (5.6.9)"]
+    assert lunch[0]["image_url"].endswith("img_42474b3a.jpg")
+    assert lunch[2]["image_url"] == ""
+    assert [m["date"] for m in meals if m["meal_type"] == "석식"] == ["2025-07-07"]
+
+
+class SlowDetailSession(FixtureSession):
+    """상세 요청마다 지연을 주고 동시에 진행 중인 요청 수를 기록"""
+
+    def __init__(self, delay=0.05):
+        super().__init__()
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            if params and params.get("nttSn") == 13:
+                return FixtureResponse(b"", 500)
+            return FixtureResponse(read_fixture("notice_detail_1287106.html"))
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def test_fetch_notices_concurrency_is_bounded():
+    session = SlowDetailSession()
+    crawler = SchoolCrawler(session=session, base_url="https://school.example", concurrency=4,
+                            scheduler=CrawlScheduler(rate=0, max_retries=0))
+    items = [{"ntt_sn": i, "title": f"공지 {i}", "created_at": "2025-07-15"} for i in range(40)]
+
+    started = time.monotonic()
+    notices = [notice for _, notice in crawler.fetch_notices(items)]
+    elapsed = time.monotonic() - started
+
+    # 실패한 1건은 건너뛰고 나머지는 모두 반환
+    assert sorted(n["ntt_sn"] for n in notices) == [i for i in range(40) if i != 13]
+    assert crawler.error_count == 1
+    assert session.max_in_flight == 4
+    assert elapsed < 40 * session.delay / 2
+
+
+def use_test_db(tmp_path, monkeypatch):
+    """2페이지 공지(1285990, 1285871)는 이미 저장된 상태의 크롤러 DB"""
+    db_path = str(tmp_path / "test.db")
+    db = DatabaseManager(db_path, use_snapshot=False)
+    db.ingest_notices([{"ntt_sn": ntt_sn, "title": "수련회 참가 신청 안내", "created_at": "2025-06-27"}
+                       for ntt_sn in (1285990, 1285871)])
+    monkeypatch.setattr(incremental_notice_crawler, "_db", db)
+    return db_path
+
+
+def test_crawl_incremental_writes_db(tmp_path, monkeypatch):
+    db_path = use_test_db(tmp_path, monkeypatch)
+
+    session = FixtureSession()
+    crawler = SchoolCrawler(session=session, base_url="https://school.example/pajuwaseok-e")
+    notices = incremental_notice_crawler.crawl_incremental_notices(crawler=crawler)
+    # 2페이지에는 저장된 공지만 있으므로 목록 2번 + 상세 3번만 요청
+    assert sorted(n["ntt_sn"] for n in notices) == [1286511, 1286905, 1287106]
+    assert crawler.request_count == 5
+
+    meals = incremental_notice_crawler.crawl_incremental_meals(crawler=crawler, start_date="2025-07-07")
+    assert [(m["date"], m["meal_type"]) for m in meals][:3] == [
+        ("2025-07-07", "석식"), ("2025-07-07", "중식"), ("2025-07-08", "중식")
+    ]
+    assert len(meals) == 6
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT ntt_sn, url, created_at FROM notices WHERE ntt_sn > 1286000 ORDER BY ntt_sn").fetchall()
+    meal_types = conn.execute("SELECT DISTINCT meal_type FROM meals ORDER BY meal_type").fetchall()
+    conn.close()
+    assert rows[0] == (
+        1286511,
+        "https://school.example/pajuwaseok-e/na/ntt/selectNttInfo.do?mi=8476&bbsId=5794&nttSn=1286511",
+        "2025-07-03",
+    )
+    assert meal_types == [("석식",), ("중식",)]
+
+
+class CrashingSession(FixtureSession):
+    """특정 상세 페이지에서 프로세스가 죽은 것처럼 예외 발생"""
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        if (params or {}).get("nttSn") == 1286905:
+            raise RuntimeError("worker killed")
+        return super().get(url, params, headers, timeout)
+
+
+def test_interrupted_crawl_resumes_from_checkpoint(tmp_path, monkeypatch):
+    db_path = use_test_db(tmp_path, monkeypatch)
+
+    crawler = SchoolCrawler(session=CrashingSession(), base_url="https://school.example", concurrency=1)
+    notices = incremental_notice_crawler.crawl_incremental_notices(crawler=crawler, batch_size=1)
+    assert [n["ntt_sn"] for n in notices] == [1287106]
+
+    checkpoint = CrawlCheckpoint(db_path, "notices")
+    assert checkpoint.resumed and checkpoint.listing_done
+    assert checkpoint.saved == [1287106]
+    assert sorted(checkpoint.pending) == [1286511, 1286905]
+
+    # 이어서 실행하면 목록은 다시 보지 않고 남은 상세 페이지만 요청
+    session = FixtureSession()
+    crawler = SchoolCrawler(session=session, base_url="https://school.example")
+    notices = incremental_notice_crawler.crawl_incremental_notices(crawler=crawler)
+    assert sorted(n["ntt_sn"] for n in notices) == [1286511, 1286905]
+    assert all(path.endswith("selectNttInfo.do") for path, _ in session.requests)
+    assert not CrawlCheckpoint(db_path, "notices").resumed
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM notices").fetchone()[0] == 5
+    conn.close()
+
+
+class ETagResponse(FixtureResponse):
+    def __init__(self, content, status_code=200, headers=None):
+        super().__init__(content, status_code)
+        self.headers = headers or {}
+
+
+class ETagSession(FixtureSession):
+    """목록 페이지에 ETag를 붙이고 If-None-Match가 같으면 304로 응답"""
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        response = super().get(url, params, headers, timeout)
+        if not urlparse(url).path.endswith("selectNttList.do"):
+            return response
+        etag = f'"{len(response.content)}"'
+        if (headers or {}).get("If-None-Match") == etag:
+            return ETagResponse(b"", 304)
+        return ETagResponse(response.content, response.status_code, {"ETag": etag})
+
+
+def test_second_crawl_skips_unchanged_pages(tmp_path, monkeypatch):
+    db_path = use_test_db(tmp_path, monkeypatch)
+
+    def crawl():
+        session = ETagSession()
+        crawler = SchoolCrawler(session=session, base_url="https://school.example", state=CrawlState(db_path))
+        notices = incremental_notice_crawler.crawl_incremental_notices(crawler=crawler)
+        meals = incremental_notice_crawler.crawl_incremental_meals(crawler=crawler, start_date="2025-07-07")
+        return session, notices, meals
+
+    session, notices, meals = crawl()
+    assert len(notices) == 3 and len(meals) == 6
+
+    # 목록은 304, 식단 4주는 내용 해시가 같으므로 파싱/저장 없이 끝남
+    session, notices, meals = crawl()
+    assert (notices, meals) == ([], [])
+    assert len(session.requests) == 5
+
+    conn = sqlite3.connect(db_path)
+    crawl_counts = dict(conn.execute("SELECT key, SUM(count) FROM daily_stats WHERE metric = 'crawl' GROUP BY key"))
+    conn.close()
+    assert crawl_counts["pages_not_modified"] == 1
+    assert crawl_counts["pages_unchanged"] == 4
+
+
+def test_known_ids_stop_and_backfill_and_single_id(tmp_path, monkeypatch):
+    db_path = use_test_db(tmp_path, monkeypatch)
+    db = incremental_notice_crawler.get_db()
+    # 날짜가 아닌 번호로 판단하므로 저장된 1286905만 건너뜀
+    db.ingest_notices([{"ntt_sn": 1286905, "title": "6학년 현장체험학습 안내", "created_at": "2025-07-10"}])
+    assert db.get_known_ntt_sns([1287106, 1286905, 1285871]) == {1286905, 1285871}
+    assert db.get_max_ntt_sn() == 1286905
+
+    session = FixtureSession()
+    crawler = SchoolCrawler(session=session, base_url="https://school.example")
+    notices = incremental_notice_crawler.crawl_incremental_notices(crawler=crawler)
+    assert sorted(n["ntt_sn"] for n in notices) == [1286511, 1287106]
+
+    # 백필은 저장된 공지만 있는 페이지에서도 멈추지 않고 빈 페이지까지 확인
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("DELETE FROM notices WHERE ntt_sn = 1285871")
+    conn.close()
+    session = FixtureSession()
+    crawler = SchoolCrawler(session=session, base_url="https://school.example")
+    notices = incremental_notice_crawler.crawl_incremental_notices(crawler=crawler, backfill=True)
+    assert [n["ntt_sn"] for n in notices] == [1285871]
+    assert [p["currPage"] for path, p in session.requests if path.endswith("selectNttList.do")] == [1, 2, 3]
+
+    # 번호 지정 갱신은 상세 페이지에서 제목/등록일까지 읽어 저장
+    crawler = SchoolCrawler(session=FixtureSession(), base_url="https://school.example")
+    refreshed = incremental_notice_crawler.refresh_notices([1287106, 999], crawler=crawler)
+    assert [(n["ntt_sn"], n["created_at"]) for n in refreshed] == [(1287106, "2025-07-15")]
+    assert refreshed[0]["title"] == "2025년 1학기 선택형 프로그램 만족도 조사 결과 보고"
+
+
+def test_crawl_meals_range_fetches_weeks_concurrently(tmp_path, monkeypatch):
+    db_path = use_test_db(tmp_path, monkeypatch)
+    session = FixtureSession()
+    crawler = SchoolCrawler(session=session, base_url="https://school.example")
+
+    meals = incremental_notice_crawler.crawl_meals_range("2025-07-01", "2025-07-09", crawler=crawler)
+    assert sorted(p["schDt"] for _, p in session.requests) == ["2025-06-29", "2025-07-06"]
+    assert [m["date"] for m in meals] == ["2025-07-07", "2025-07-07", "2025-07-08", "2025-07-09"]
+
+    conn = sqlite3.connect(db_path)
+    allergens = conn.execute(
+        "SELECT allergens FROM meals WHERE date = '2025-07-07' AND meal_type = '석식'"
+    ).fetchone()[0]
+    conn.close()
+    assert '"dish": "제육볶음", "codes": [5, 6, 10, 13]' in allergens
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight, SingleFlightBusy, SingleFlightTimeout
+
+
+def _start_waiters(flight, key, fn, count):
+    results, errors = [], []
+
+    def run():
+        try:
+            results.append(flight.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def _wait_for_waiters(flight, count):
+    deadline = time.monotonic() + 2
+    while flight.stats()["waiting"] < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight(max_waiters=10, timeout=2)
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(2)
+        return "답변"
+
+    leader, leader_results, _ = _start_waiters(flight, "수영장있어요", fn, 1)
+    while not calls:
+        time.sleep(0.01)
+    threads, results, errors = _start_waiters(flight, "수영장있어요", fn, 5)
+    _wait_for_waiters(flight, 5)
+    release.set()
+    for thread in leader + threads:
+        thread.join(2)
+
+    assert len(calls) == 1
+    assert leader_results == [("답변", False)]
+    assert results == [("답변", True)] * 5
+    assert not errors
+    assert flight.stats() == {"executed": 1, "shared": 5, "rejected": 0, "timeouts": 0, "in_flight": 0, "waiting": 0}
+
+    # 끝난 뒤에 들어온 요청은 다시 실행
+    assert flight.do("수영장있어요", lambda: "새 답변") == ("새 답변", False)
+
+
+def test_waiters_are_bounded_and_time_out():
+    flight = SingleFlight(max_waiters=2, timeout=0.1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(2)
+        return "답변"
+
+    leader, _, _ = _start_waiters(flight, "key", fn, 1)
+    started.wait(2)
+    threads, results, errors = _start_waiters(flight, "key", fn, 2)
+    _wait_for_waiters(flight, 2)
+    with pytest.raises(SingleFlightBusy):
+        flight.do("key", fn)
+    for thread in threads:
+        thread.join(2)
+    release.set()
+    leader[0].join(2)
+
+    assert not results
+    assert [type(e) for e in errors] == [SingleFlightTimeout] * 2
+    assert flight.stats()["rejected"] == 1
+    assert flight.stats()["timeouts"] == 2
+
+
+def test_error_is_shared_with_waiters():
+    flight = SingleFlight(max_waiters=5, timeout=2)
+    release = threading.Event()
+    started = threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(2)
+        raise ValueError("빈 응답")
+
+    leader, _, leader_errors = _start_waiters(flight, "key", fn, 1)
+    started.wait(2)
+    threads, results, errors = _start_waiters(flight, "key", fn, 3)
+    _wait_for_waiters(flight, 3)
+    release.set()
+    for thread in leader + threads:
+        thread.join(2)
+
+    assert not results
+    assert [str(e) for e in leader_errors + errors] == ["빈 응답"] * 4
+    assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,30 @@
+from database import DatabaseManager
+from conversation_logger import ConversationLogger
+from stats import get_stats, record_crawl_result
+
+
+def test_write_behind_updates_daily_aggregates(tmp_path):
+    """대화 기록 저장과 함께 일별 집계가 갱신되고 /stats는 집계만 읽음"""
+    db_path = str(tmp_path / "test.db")
+    DatabaseManager(db_path, use_snapshot=False)
+
+    logger = ConversationLogger(db_path, flush_size=1000, flush_interval_ms=60000)
+    logger.log("u1", "방과후 신청", "답변", intent="qa", qa_id=3)
+    logger.log("u1", "급식", "메뉴", intent="meal")
+    logger.log("u2", "수영장 있어?", "모름", intent="fallback")
+    logger.flush()
+    logger.log("u2", "방과후 신청", "답변", intent="qa", qa_id=3)
+    logger.close()
+
+    record_crawl_result(db_path, {"notices_inserted": 4, "meals_inserted": 0})
+
+    stats = get_stats(db_path, "2000-01-01", "2999-12-31")
+    assert stats["requests"] == 4
+    assert stats["requests_by_intent"] == {"qa": 2, "meal": 1, "fallback": 1}
+    assert stats["unique_users"] == 2
+    assert stats["top_qa"] == [{"qa_id": 3, "count": 2}]
+    assert stats["fallback_rate"] == 0.25
+    assert stats["top_unmatched"] == [{"message": "수영장 있어?", "count": 1}]
+    assert stats["crawl"] == {"notices_inserted": 4}
+
+    assert get_stats(db_path, "2000-01-01", "2000-01-02")["requests"] == 0